@@ -45,6 +45,18 @@ export async function initDatabase() {
       );
     `);
 
+    // Segment membership for `segment` rules, stored once and shared by every
+    // flag that targets the segment. The primary key serves member lookups
+    // and keyset-paged downloads.
+    await pool.query(`
+      CREATE TABLE IF NOT EXISTS segment_members (
+        segment_id VARCHAR(255) NOT NULL,
+        member_id VARCHAR(255) NOT NULL,
+        PRIMARY KEY (segment_id, member_id),
+        FOREIGN KEY (segment_id) REFERENCES segments(id) ON DELETE CASCADE
+      );
+    `);
+
     await pool.query(`
       CREATE TABLE IF NOT EXISTS audit_logs (
         id SERIAL PRIMARY KEY,
@@ -58,31 +70,217 @@ export async function initDatabase() {
       );
     `);
 
+    await initEvaluationsTable();
+    await initEvaluationRollups();
+
     await pool.query(`
+      CREATE INDEX IF NOT EXISTS idx_flags_environment ON feature_flags(environment);
+      CREATE INDEX IF NOT EXISTS idx_flags_enabled ON feature_flags(enabled);
+      -- Keyset pagination of audit logs, overall and per flag
+      CREATE INDEX IF NOT EXISTS idx_audit_timestamp_id ON audit_logs(timestamp, id);
+      CREATE INDEX IF NOT EXISTS idx_audit_flag_timestamp_id ON audit_logs(flag_id, timestamp, id);
+      DROP INDEX IF EXISTS idx_audit_flag_id;
+      DROP INDEX IF EXISTS idx_audit_timestamp;
+      -- Rows are appended in time order, so a BRIN index serves time ranges
+      -- at a fraction of a btree's size and insert cost
+      CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp_brin ON evaluations USING BRIN (timestamp);
+    `);
+
+    console.log('Database tables initialized successfully');
+  } catch (error) {
+    console.error('Database initialization error:', error);
+    throw error;
+  }
+}
+
+// Raw evaluations, partitioned by day (see services/partition.service.js for
+// partition creation and retention). There is no foreign key to
+// feature_flags: deleting a flag must not cascade through every partition.
+// Rows of deleted flags age out with their partitions, and the batch insert
+// already skips events for unknown flags.
+export const LEGACY_EVALUATIONS_TABLE = 'evaluations_legacy';
+
+async function initEvaluationsTable() {
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    // Serialize nodes starting at the same time
+    await client.query("SELECT pg_advisory_xact_lock(hashtext('evaluations_partitioning'))");
+
+    const existing = await client.query(
+      "SELECT relkind FROM pg_class WHERE oid = to_regclass('evaluations')"
+    );
+
+    // Upgrade from the unpartitioned table: keep it aside, read-only, until
+    // its newest row falls out of retention and it is dropped like a
+    // partition. Its rows are already counted in the rollups.
+    if (existing.rows[0]?.relkind === 'r') {
+      await client.query(`
+        ALTER TABLE evaluations RENAME TO ${LEGACY_EVALUATIONS_TABLE};
+        ALTER TABLE ${LEGACY_EVALUATIONS_TABLE} DROP CONSTRAINT IF EXISTS evaluations_flag_id_fkey;
+        DROP TRIGGER IF EXISTS evaluations_rollup ON ${LEGACY_EVALUATIONS_TABLE};
+        DROP INDEX IF EXISTS idx_evaluations_flag_id;
+        ALTER INDEX IF EXISTS idx_evaluations_timestamp RENAME TO idx_evaluations_legacy_timestamp;
+      `);
+    }
+
+    await client.query(`
       CREATE TABLE IF NOT EXISTS evaluations (
-        id SERIAL PRIMARY KEY,
+        id BIGSERIAL,
         flag_id VARCHAR(255) NOT NULL,
         user_id VARCHAR(255),
         context JSONB,
         result BOOLEAN NOT NULL,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+      ) PARTITION BY RANGE (timestamp);
+    `);
+
+    await client.query('COMMIT');
+  } catch (error) {
+    await client.query('ROLLBACK');
+    throw error;
+  } finally {
+    client.release();
+  }
+}
+
+// Per-flag evaluation counts per minute, and per-hour HyperLogLog sketches
+// (1024 six-bit registers, ~3% error) of distinct users. They are maintained
+// by a statement-level trigger, so every batch inserted into evaluations
+// updates them incrementally, and analytics never scan raw evaluations.
+const HLL_SQL = `
+  CREATE OR REPLACE FUNCTION hll_add(registers SMALLINT[], user_id TEXT) RETURNS SMALLINT[] AS $$
+  DECLARE
+    hash BIGINT;
+    slot INT;
+    run_length SMALLINT;
+  BEGIN
+    IF registers IS NULL THEN
+      registers := array_fill(0::SMALLINT, ARRAY[1024]);
+    END IF;
+    IF user_id IS NULL THEN
+      RETURN registers;
+    END IF;
+
+    hash := hashtextextended(user_id, 0);
+    slot := (hash & 1023)::INT + 1;
+    -- Position of the first set bit in the remaining 54 hash bits
+    run_length := 55 - length(ltrim(((hash >> 10)::BIT(54))::TEXT, '0'));
+    IF registers[slot] < run_length THEN
+      registers[slot] := run_length;
+    END IF;
+    RETURN registers;
+  END
+  $$ LANGUAGE plpgsql IMMUTABLE;
+
+  CREATE OR REPLACE FUNCTION hll_union(a SMALLINT[], b SMALLINT[]) RETURNS SMALLINT[] AS $$
+    SELECT array_agg(GREATEST(x, y) ORDER BY i)
+    FROM unnest(a, b) WITH ORDINALITY AS registers(x, y, i)
+  $$ LANGUAGE SQL IMMUTABLE STRICT;
+
+  CREATE OR REPLACE FUNCTION hll_cardinality(registers SMALLINT[]) RETURNS BIGINT AS $$
+    SELECT round(CASE
+      WHEN estimate <= 2.5 * m AND zeros > 0 THEN m * ln(m / zeros)
+      ELSE estimate
+    END)::BIGINT
+    FROM (
+      SELECT m, zeros, (0.7213 / (1 + 1.079 / m)) * m * m / harmonic AS estimate
+      FROM (
+        SELECT COUNT(*)::FLOAT8 AS m,
+               COUNT(*) FILTER (WHERE r = 0) AS zeros,
+               SUM(power(2::FLOAT8, -r)) AS harmonic
+        FROM unnest(registers) AS r
+      ) sums
+    ) raw
+  $$ LANGUAGE SQL IMMUTABLE STRICT;
+
+  CREATE OR REPLACE AGGREGATE hll_add_agg(TEXT) (SFUNC = hll_add, STYPE = SMALLINT[]);
+  CREATE OR REPLACE AGGREGATE hll_union_agg(SMALLINT[]) (SFUNC = hll_union, STYPE = SMALLINT[]);
+`;
+
+function rollupSql(source) {
+  return `
+    INSERT INTO evaluation_rollups (flag_id, bucket, total, enabled)
+    SELECT flag_id, date_trunc('minute', timestamp), COUNT(*), COUNT(*) FILTER (WHERE result)
+    FROM ${source}
+    GROUP BY 1, 2
+    ON CONFLICT (flag_id, bucket) DO UPDATE
+      SET total = evaluation_rollups.total + EXCLUDED.total,
+          enabled = evaluation_rollups.enabled + EXCLUDED.enabled;
+
+    INSERT INTO evaluation_user_sketches (flag_id, bucket, registers)
+    SELECT flag_id, date_trunc('hour', timestamp), hll_add_agg(user_id)
+    FROM ${source}
+    WHERE user_id IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (flag_id, bucket) DO UPDATE
+      SET registers = hll_union(evaluation_user_sketches.registers, EXCLUDED.registers);
+  `;
+}
+
+async function initEvaluationRollups() {
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+
+    const existing = await client.query(
+      `SELECT to_regclass('evaluation_rollups') IS NOT NULL AS present,
+              to_regclass('${LEGACY_EVALUATIONS_TABLE}') IS NOT NULL AS legacy`
+    );
+
+    await client.query(`
+      CREATE TABLE IF NOT EXISTS evaluation_rollups (
+        flag_id VARCHAR(255) NOT NULL,
+        bucket TIMESTAMP NOT NULL,
+        total BIGINT NOT NULL DEFAULT 0,
+        enabled BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (flag_id, bucket),
         FOREIGN KEY (flag_id) REFERENCES feature_flags(id) ON DELETE CASCADE
       );
+
+      CREATE TABLE IF NOT EXISTS evaluation_user_sketches (
+        flag_id VARCHAR(255) NOT NULL,
+        bucket TIMESTAMP NOT NULL,
+        registers SMALLINT[] NOT NULL,
+        PRIMARY KEY (flag_id, bucket),
+        FOREIGN KEY (flag_id) REFERENCES feature_flags(id) ON DELETE CASCADE
+      );
+
+      CREATE INDEX IF NOT EXISTS idx_evaluation_rollups_bucket ON evaluation_rollups(bucket);
     `);
 
-    await pool.query(`
-      CREATE INDEX IF NOT EXISTS idx_flags_environment ON feature_flags(environment);
-      CREATE INDEX IF NOT EXISTS idx_flags_enabled ON feature_flags(enabled);
-      CREATE INDEX IF NOT EXISTS idx_audit_flag_id ON audit_logs(flag_id);
-      CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_logs(timestamp);
-      CREATE INDEX IF NOT EXISTS idx_evaluations_flag_id ON evaluations(flag_id);
-      CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations(timestamp);
+    await client.query(HLL_SQL);
+
+    await client.query(`
+      CREATE OR REPLACE FUNCTION rollup_evaluations() RETURNS TRIGGER AS $$
+      BEGIN
+        ${rollupSql('new_evaluations')}
+        RETURN NULL;
+      END
+      $$ LANGUAGE plpgsql;
+
+      CREATE OR REPLACE TRIGGER evaluations_rollup
+        AFTER INSERT ON evaluations
+        REFERENCING NEW TABLE AS new_evaluations
+        FOR EACH STATEMENT EXECUTE FUNCTION rollup_evaluations();
     `);
 
-    console.log('Database tables initialized successfully');
+    // First start with rollups: backfill from the raw table. Creating the
+    // trigger locked evaluations against inserts until this commits, so no
+    // row is counted twice or missed.
+    if (!existing.rows[0].present) {
+      await client.query(rollupSql('evaluations'));
+      if (existing.rows[0].legacy) {
+        await client.query(rollupSql(LEGACY_EVALUATIONS_TABLE));
+      }
+    }
+
+    await client.query('COMMIT');
   } catch (error) {
-    console.error('Database initialization error:', error);
+    await client.query('ROLLBACK');
     throw error;
+  } finally {
+    client.release();
   }
 }
 
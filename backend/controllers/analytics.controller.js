@@ -1,42 +1,82 @@
 import pool from '../config/database.js';
 
+const TIME_RANGES = {
+  '1h': '1 hour',
+  '24h': '24 hours',
+  '7d': '7 days',
+  '30d': '30 days'
+};
+
+const BUCKETS = {
+  '1m': '1 minute',
+  '5m': '5 minutes',
+  '15m': '15 minutes',
+  '1h': '1 hour',
+  '6h': '6 hours',
+  '1d': '1 day'
+};
+
+// Analytics read the per-minute rollups and hourly distinct-user sketches
+// maintained by the evaluations trigger (see config/database.js), never the
+// raw evaluations table. Unique users are approximate (HyperLogLog).
+const RANGE_CTE = `
+  WITH range AS (
+    SELECT COALESCE($2::timestamptz::timestamp, NOW()::timestamp - $3::interval) AS start_at,
+           COALESCE($4::timestamptz::timestamp, NOW()::timestamp) AS end_at
+  )
+`;
+
 export async function getFlagAnalytics(req, res, next) {
   try {
     const { flagId } = req.params;
-    const { timeRange = '24h' } = req.query;
+    const { timeRange = '24h', from, to, bucket = '1h' } = req.query;
 
-    const timeRangeMap = {
-      '1h': '1 hour',
-      '24h': '24 hours',
-      '7d': '7 days',
-      '30d': '30 days'
-    };
+    const interval = TIME_RANGES[timeRange] || '24 hours';
+    const bucketInterval = BUCKETS[bucket];
+    if (!bucketInterval) {
+      return res.status(400).json({ error: `bucket must be one of ${Object.keys(BUCKETS).join(', ')}` });
+    }
+    for (const value of [from, to]) {
+      if (value !== undefined && Number.isNaN(Date.parse(value))) {
+        return res.status(400).json({ error: 'from and to must be ISO 8601 timestamps' });
+      }
+    }
 
-    const interval = timeRangeMap[timeRange] || '24 hours';
+    const params = [flagId, from ?? null, interval, to ?? null];
 
     // Get evaluation stats
     const evaluations = await pool.query(
-      `SELECT 
-        COUNT(*) as total_evaluations,
-        COUNT(*) FILTER (WHERE result = true) as enabled_count,
-        COUNT(*) FILTER (WHERE result = false) as disabled_count,
-        COUNT(DISTINCT user_id) as unique_users
-       FROM evaluations 
-       WHERE flag_id = $1 AND timestamp > NOW() - INTERVAL '${interval}'`,
-      [flagId]
+      `${RANGE_CTE}
+       SELECT
+        COALESCE(SUM(r.total), 0)::bigint as total_evaluations,
+        COALESCE(SUM(r.enabled), 0)::bigint as enabled_count,
+        COALESCE(SUM(r.total - r.enabled), 0)::bigint as disabled_count,
+        (SELECT COALESCE(hll_cardinality(hll_union_agg(s.registers)), 0)::bigint
+         FROM evaluation_user_sketches s, range
+         WHERE s.flag_id = $1
+           AND s.bucket >= date_trunc('hour', range.start_at)
+           AND s.bucket < range.end_at) as unique_users
+       FROM evaluation_rollups r, range
+       WHERE r.flag_id = $1
+         AND r.bucket >= date_trunc('minute', range.start_at)
+         AND r.bucket < range.end_at`,
+      params
     );
 
     // Get evaluation timeline
     const timeline = await pool.query(
-      `SELECT 
-        DATE_TRUNC('hour', timestamp) as hour,
-        COUNT(*) as count,
-        COUNT(*) FILTER (WHERE result = true) as enabled
-       FROM evaluations 
-       WHERE flag_id = $1 AND timestamp > NOW() - INTERVAL '${interval}'
-       GROUP BY hour
-       ORDER BY hour`,
-      [flagId]
+      `${RANGE_CTE}
+       SELECT
+        date_bin($5::interval, r.bucket, TIMESTAMP '2000-01-01') as hour,
+        SUM(r.total)::bigint as count,
+        SUM(r.enabled)::bigint as enabled
+       FROM evaluation_rollups r, range
+       WHERE r.flag_id = $1
+         AND r.bucket >= date_trunc('minute', range.start_at)
+         AND r.bucket < range.end_at
+       GROUP BY 1
+       ORDER BY 1`,
+      [...params, bucketInterval]
     );
 
     res.json({
@@ -50,20 +90,27 @@ export async function getFlagAnalytics(req, res, next) {
 
 export async function getSystemMetrics(req, res, next) {
   try {
-    const flagsCount = await pool.query('SELECT COUNT(*) as count FROM feature_flags');
-    const enabledFlags = await pool.query('SELECT COUNT(*) as count FROM feature_flags WHERE enabled = true');
-    const segmentsCount = await pool.query('SELECT COUNT(*) as count FROM segments');
-    const recentEvaluations = await pool.query(
-      "SELECT COUNT(*) as count FROM evaluations WHERE timestamp > NOW() - INTERVAL '1 hour'"
+    const result = await pool.query(
+      `SELECT
+        flags.total as total_flags,
+        flags.enabled as enabled_flags,
+        (SELECT COUNT(*) FROM segments) as total_segments,
+        (SELECT COALESCE(SUM(total), 0) FROM evaluation_rollups
+         WHERE bucket >= date_trunc('minute', NOW() - INTERVAL '1 hour')) as evaluations_last_hour
+       FROM (
+        SELECT COUNT(*) as total, COUNT(*) FILTER (WHERE enabled = true) as enabled
+        FROM feature_flags
+       ) flags`
     );
+    const metrics = result.rows[0];
 
     res.json({
-      totalFlags: parseInt(flagsCount.rows[0].count),
-      enabledFlags: parseInt(enabledFlags.rows[0].count),
-      totalSegments: parseInt(segmentsCount.rows[0].count),
-      evaluationsLastHour: parseInt(recentEvaluations.rows[0].count)
+      totalFlags: parseInt(metrics.total_flags),
+      enabledFlags: parseInt(metrics.enabled_flags),
+      totalSegments: parseInt(metrics.total_segments),
+      evaluationsLastHour: parseInt(metrics.evaluations_last_hour)
     });
   } catch (error) {
     next(error);
   }
-}
\ No newline at end of file
+}
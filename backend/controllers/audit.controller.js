@@ -1,5 +1,8 @@
 import pool from '../config/database.js';
 
+const DEFAULT_PAGE_SIZE = 500;
+const MAX_PAGE_SIZE = 5000;
+
 export async function getAuditLogs(req, res, next) {
   try {
     const { limit = 100, offset = 0, action, userId } = req.query;
@@ -44,4 +47,89 @@ export async function getAuditLogsByFlag(req, res, next) {
   } catch (error) {
     next(error);
   }
-}
\ No newline at end of file
+}
+
+// Audit logs newest first, in pages keyed on (timestamp, id). Each page seeks
+// straight to its first row through idx_audit_timestamp_id, or
+// idx_audit_flag_timestamp_id when filtered by flag, however deep it is.
+// Pass nextCursor back as cursor for the next page; it is null on the last.
+export async function getAuditLogPage(req, res, next) {
+  try {
+    const { flagId, action, userId, from, to, cursor } = req.query;
+    const limit = Math.max(1, Math.min(parseInt(req.query.limit) || DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE));
+
+    for (const value of [from, to]) {
+      if (value !== undefined && !isTimestamp(value)) {
+        return res.status(400).json({ error: 'from and to must be ISO 8601 timestamps' });
+      }
+    }
+    const position = cursor === undefined ? [null, null] : decodeCursor(cursor);
+    if (!position) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
+
+    // The cursor keeps the timestamp as text: a JS Date would drop its
+    // microseconds and the next page would repeat rows.
+    const result = await pool.query(
+      `SELECT *, timestamp::text AS cursor_timestamp
+       FROM audit_logs
+       WHERE ($1::text IS NULL OR flag_id = $1)
+         AND ($2::text IS NULL OR action = $2)
+         AND ($3::text IS NULL OR user_id = $3)
+         AND ($4::timestamptz IS NULL OR timestamp >= $4::timestamptz::timestamp)
+         AND ($5::timestamptz IS NULL OR timestamp < $5::timestamptz::timestamp)
+         AND ($6::timestamp IS NULL OR (timestamp, id) < ($6::timestamp, $7::int))
+       ORDER BY timestamp DESC, id DESC
+       LIMIT $8`,
+      [flagId ?? null, action ?? null, userId ?? null, from ?? null, to ?? null, ...position, limit]
+    );
+
+    const items = result.rows.map(({ cursor_timestamp, ...row }) => row);
+    const last = result.rows[result.rows.length - 1];
+    res.json({
+      items,
+      nextCursor: result.rows.length === limit ? encodeCursor(last.cursor_timestamp, last.id) : null
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+function encodeCursor(timestamp, id) {
+  return Buffer.from(JSON.stringify([timestamp, id])).toString('base64url');
+}
+
+// [timestamp, id] of the last row of the previous page, or null if malformed
+function decodeCursor(cursor) {
+  try {
+    const position = JSON.parse(Buffer.from(String(cursor), 'base64url').toString());
+    if (Array.isArray(position)
+      && position.length === 2
+      && /^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?$/.test(position[0])
+      && isTimestamp(position[0])
+      && Number.isSafeInteger(position[1])) {
+      return position;
+    }
+  } catch {
+    // Not base64 JSON
+  }
+  return null;
+}
+
+// ISO 8601 date or date-time, with an optional UTC offset. Date.parse alone is
+// not enough: it accepts forms Postgres rejects (a bare year, "May 1 2024"),
+// so each field is checked here, including the day against its month.
+const ISO_TIMESTAMP = /^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?(?:Z|[+-]\d{2}(?::?\d{2})?)?)?$/i;
+
+function isTimestamp(value) {
+  const match = typeof value === 'string' && ISO_TIMESTAMP.exec(value);
+  if (!match) {
+    return false;
+  }
+  const [year, month, day, hour = 0, minute = 0, second = 0] = match.slice(1).map((field) => Number(field ?? 0));
+  const date = new Date(Date.UTC(year, month - 1, day));
+  return year >= 1
+    && date.getUTCMonth() === month - 1
+    && date.getUTCDate() === day
+    && hour < 24 && minute < 60 && second < 60;
+}
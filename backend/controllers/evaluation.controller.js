@@ -1,6 +1,9 @@
-import pool from '../config/database.js';
-import { evaluateRules } from '../services/rule-engine.service.js';
-import { getRedisClient } from '../config/redis.js';
+import { evaluateFlagRules, getRulePlan } from '../services/rule-engine.service.js';
+import { resolveContext } from '../services/context-resolver.service.js';
+import { loadFlag, loadFlags } from '../services/flag-loader.service.js';
+import { recordEvaluation, recordEvaluations } from '../services/evaluation-log.service.js';
+import { prepareSegments } from '../services/segment.service.js';
+import { evaluateAllFlags, getBootstrapTag } from '../services/bootstrap.service.js';
 
 export async function evaluateFlag(req, res, next) {
   try {
@@ -10,34 +13,23 @@ export async function evaluateFlag(req, res, next) {
       return res.status(400).json({ error: 'flagId is required' });
     }
 
-    const redis = getRedisClient();
-    const cacheKey = `flag:${flagId}`;
-
     // Get flag from cache or database
-    let flag;
-    const cached = await redis.get(cacheKey);
-    if (cached) {
-      flag = JSON.parse(cached);
-    } else {
-      const result = await pool.query('SELECT * FROM feature_flags WHERE id = $1', [flagId]);
-      if (result.rows.length === 0) {
-        return res.status(404).json({ error: 'Flag not found' });
-      }
-      flag = result.rows[0];
-      await redis.setEx(cacheKey, 300, JSON.stringify(flag));
+    const flag = await loadFlag(flagId);
+    if (!flag) {
+      return res.status(404).json({ error: 'Flag not found' });
     }
 
     // If flag is disabled, return false immediately
     if (!flag.enabled) {
-      await logEvaluation(flagId, userId, context, false);
+      recordEvaluation(flagId, userId, context, false);
       return res.json({ enabled: false, reason: 'Flag is disabled' });
     }
 
     // Evaluate rules
-    const result = await evaluateRules(flag.rules, context);
+    const result = await evaluateFlagRules(flag, context);
 
-    // Log evaluation
-    await logEvaluation(flagId, userId, context, result.enabled);
+    // Queue evaluation event
+    recordEvaluation(flagId, userId, context, result.enabled);
 
     res.json(result);
   } catch (error) {
@@ -53,57 +45,105 @@ export async function bulkEvaluate(req, res, next) {
       return res.status(400).json({ error: 'flagIds array is required' });
     }
 
+    // One MGET plus at most one query, whatever the number of flags
+    const flags = await loadFlags(flagIds);
+    await prepareSegments(flags.values());
+
+    // Geo and user agent lookups are shared by every flag
+    const resolved = resolveContext(context);
     const results = {};
+    const evaluated = [];
 
     for (const flagId of flagIds) {
+      const flag = flags.get(flagId);
+      if (!flag) {
+        results[flagId] = { enabled: false, reason: 'Flag not found' };
+        continue;
+      }
+
       try {
-        const redis = getRedisClient();
-        const cacheKey = `flag:${flagId}`;
-
-        let flag;
-        const cached = await redis.get(cacheKey);
-        if (cached) {
-          flag = JSON.parse(cached);
-        } else {
-          const result = await pool.query('SELECT * FROM feature_flags WHERE id = $1', [flagId]);
-          if (result.rows.length > 0) {
-            flag = result.rows[0];
-            await redis.setEx(cacheKey, 300, JSON.stringify(flag));
-          }
-        }
-
-        if (!flag) {
-          results[flagId] = { enabled: false, reason: 'Flag not found' };
-          continue;
-        }
-
-        if (!flag.enabled) {
-          results[flagId] = { enabled: false, reason: 'Flag is disabled' };
-          await logEvaluation(flagId, userId, context, false);
-          continue;
-        }
-
-        const evaluation = await evaluateRules(flag.rules, context);
-        results[flagId] = evaluation;
-        await logEvaluation(flagId, userId, context, evaluation.enabled);
+        results[flagId] = flag.enabled
+          ? getRulePlan(flag)(context, resolved)
+          : { enabled: false, reason: 'Flag is disabled' };
+        evaluated.push([flagId, results[flagId].enabled]);
       } catch (error) {
         results[flagId] = { enabled: false, reason: 'Evaluation error', error: error.message };
       }
     }
 
+    recordEvaluations(userId, context, evaluated);
+
     res.json(results);
   } catch (error) {
     next(error);
   }
 }
 
-async function logEvaluation(flagId, userId, context, result) {
+// Evaluate every flag of an environment for one user (SSR bootstrap). A
+// returning client sending the previous ETag gets a 304 without any flag
+// being loaded or evaluated.
+export async function evaluateAll(req, res, next) {
+  try {
+    const { environment = 'development', userId, context } = req.body;
+
+    if (typeof environment !== 'string') {
+      return res.status(400).json({ error: 'environment must be a string' });
+    }
+
+    const { version, etag } = await getBootstrapTag(environment, userId, context);
+    res.set({
+      ETag: etag,
+      'X-Flags-Version': version,
+      'Cache-Control': 'private, no-cache'
+    });
+
+    if (matchesETag(req.get('If-None-Match'), etag)) {
+      return res.status(304).end();
+    }
+
+    res.json(await evaluateAllFlags(environment, userId, context, version));
+  } catch (error) {
+    next(error);
+  }
+}
+
+function matchesETag(header, etag) {
+  if (!header) {
+    return false;
+  }
+  return header
+    .split(',')
+    .map((tag) => tag.trim().replace(/^W\//, ''))
+    .some((tag) => tag === etag || tag === '*');
+}
+
+const MAX_EVENTS_PER_REQUEST = 1000;
+
+// Ingest evaluations performed client-side (SDK exposure reports)
+export async function recordEvaluationEvents(req, res, next) {
   try {
-    await pool.query(
-      'INSERT INTO evaluations (flag_id, user_id, context, result) VALUES ($1, $2, $3, $4)',
-      [flagId, userId, JSON.stringify(context), result]
-    );
+    const { events } = req.body;
+
+    if (!Array.isArray(events) || events.length === 0) {
+      return res.status(400).json({ error: 'events array is required' });
+    }
+    if (events.length > MAX_EVENTS_PER_REQUEST) {
+      return res.status(413).json({ error: `At most ${MAX_EVENTS_PER_REQUEST} events per request` });
+    }
+
+    let accepted = 0;
+    for (const event of events) {
+      if (!event || typeof event.flagId !== 'string') {
+        continue;
+      }
+      const timestamp = Number.isFinite(event.timestamp) ? event.timestamp : Date.now();
+      if (recordEvaluation(event.flagId, event.userId, event.context, event.enabled, timestamp)) {
+        accepted++;
+      }
+    }
+
+    res.status(202).json({ accepted, dropped: events.length - accepted });
   } catch (error) {
-    console.error('Failed to log evaluation:', error);
+    next(error);
   }
-}
\ No newline at end of file
+}
@@ -3,30 +3,55 @@ import pool from '../config/database.js';
 import { getRedisClient, getRedisPubClient } from '../config/redis.js';
 import { logAudit } from '../services/audit.service.js';
 import { broadcastFlagUpdate } from '../services/websocket.service.js';
+import { invalidateRulePlan } from '../services/rule-engine.service.js';
+import { getFlagChanges, getFlagsVersion, recordFlagChange } from '../services/flag-version.service.js';
+import { loadEnvironmentFlags, loadFlags } from '../services/flag-loader.service.js';
 
 const CACHE_TTL = 300; // 5 minutes
 
+// Responses carry the environment's flag set version as ETag and
+// X-Flags-Version, so an unchanged set answers If-None-Match with a 304.
+// With ?since=<version> the body is a delta: the flags changed since that
+// version and the IDs of those deleted, or the full set (full: true) when the
+// change log does not reach back that far.
 export async function getAllFlags(req, res, next) {
   try {
-    const { environment = 'development' } = req.query;
-    const cacheKey = `flags:${environment}`;
-    const redis = getRedisClient();
+    const { environment = 'development', since } = req.query;
+
+    const changes = since === undefined
+      ? { version: await getFlagsVersion(environment), full: true }
+      : await getFlagChanges(environment, since);
+    const { version } = changes;
+    res.set({
+      ETag: `"${version}"`,
+      'X-Flags-Version': version,
+      'Cache-Control': 'no-cache'
+    });
 
-    // Try cache first
-    const cached = await redis.get(cacheKey);
-    if (cached) {
-      return res.json(JSON.parse(cached));
+    if (req.fresh) {
+      return res.status(304).end();
     }
 
-    const result = await pool.query(
-      'SELECT * FROM feature_flags WHERE environment = $1 ORDER BY created_at DESC',
-      [environment]
-    );
+    if (changes.full) {
+      const flags = await loadEnvironmentFlags(environment, version);
+      return res.json(since === undefined ? flags : { version, full: true, flags, deleted: [] });
+    }
 
-    // Cache the result
-    await redis.setEx(cacheKey, CACHE_TTL, JSON.stringify(result.rows));
+    // Read past the flag cache: a fill that raced a write may still hold the
+    // row from before it, which the client would then keep for good.
+    const loaded = await loadFlags(changes.flagIds, { fresh: true });
+    const flags = [];
+    const deleted = [];
+    for (const flagId of changes.flagIds) {
+      const flag = loaded.get(flagId);
+      if (flag && flag.environment === environment) {
+        flags.push(flag);
+      } else {
+        deleted.push(flagId);
+      }
+    }
 
-    res.json(result.rows);
+    res.json({ version, full: false, flags, deleted });
   } catch (error) {
     next(error);
   }
@@ -73,9 +98,8 @@ export async function createFlag(req, res, next) {
 
     const flag = result.rows[0];
 
-    // Invalidate cache
-    const redis = getRedisClient();
-    await redis.del(`flags:${flag.environment}`);
+    // Bumping the version retires the cached flag list, which is keyed by it
+    await recordFlagChange(flag.environment, flag.id);
 
     // Log audit
     await logAudit(flag.id, 'CREATE', userId, { flag });
@@ -113,7 +137,7 @@ export async function updateFlag(req, res, next) {
     // Invalidate cache
     const redis = getRedisClient();
     await redis.del(`flag:${id}`);
-    await redis.del(`flags:${flag.environment}`);
+    await recordFlagChange(flag.environment, flag.id);
 
     // Log audit
     await logAudit(flag.id, 'UPDATE', userId, {
@@ -146,7 +170,8 @@ export async function deleteFlag(req, res, next) {
     // Invalidate cache
     const redis = getRedisClient();
     await redis.del(`flag:${id}`);
-    await redis.del(`flags:${flag.environment}`);
+    await recordFlagChange(flag.environment, flag.id);
+    invalidateRulePlan(id);
 
     // Log audit
     await logAudit(flag.id, 'DELETE', userId, { flag });
@@ -181,7 +206,7 @@ export async function toggleFlag(req, res, next) {
     // Invalidate cache
     const redis = getRedisClient();
     await redis.del(`flag:${id}`);
-    await redis.del(`flags:${flag.environment}`);
+    await recordFlagChange(flag.environment, flag.id);
 
     // Publish to Redis for real-time updates
     const pubClient = getRedisPubClient();
@@ -221,7 +246,7 @@ export async function killSwitch(req, res, next) {
     // Invalidate cache immediately
     const redis = getRedisClient();
     await redis.del(`flag:${id}`);
-    await redis.del(`flags:${flag.environment}`);
+    await recordFlagChange(flag.environment, flag.id);
 
     // Publish emergency kill switch
     const pubClient = getRedisPubClient();
@@ -1,8 +1,14 @@
 import { v4 as uuidv4 } from 'uuid';
 import pool from '../config/database.js';
 import { getRedisClient } from '../config/redis.js';
+import { bumpSegmentVersion, forgetSegment, getSegmentVersion } from '../services/segment.service.js';
+import { recordFlagChange } from '../services/flag-version.service.js';
+import { broadcastFlagUpdate } from '../services/websocket.service.js';
 
 const CACHE_TTL = 300;
+const DEFAULT_PAGE_SIZE = 1000;
+const MAX_PAGE_SIZE = 10000;
+const MAX_MEMBER_LENGTH = 255;
 
 export async function getAllSegments(req, res, next) {
   try {
@@ -93,9 +99,172 @@ export async function deleteSegment(req, res, next) {
 
     const redis = getRedisClient();
     await redis.del('segments:all');
+    await bumpSegmentVersion(id);
+    forgetSegment(id);
+    await touchTargetingFlags(id);
 
     res.json({ message: 'Segment deleted successfully' });
   } catch (error) {
     next(error);
   }
-}
\ No newline at end of file
+}
+
+// Members in pages ordered by member ID. Pass nextCursor back as cursor for
+// the next page; it is null on the last one. version changes whenever the
+// members do, so a download spanning a change can be detected and restarted.
+export async function listSegmentMembers(req, res, next) {
+  try {
+    const { id } = req.params;
+    const { cursor } = req.query;
+    const limit = Math.max(1, Math.min(parseInt(req.query.limit) || DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE));
+
+    const segment = await pool.query('SELECT id FROM segments WHERE id = $1', [id]);
+    if (segment.rows.length === 0) {
+      return res.status(404).json({ error: 'Segment not found' });
+    }
+
+    const version = await getSegmentVersion(id);
+    const result = await pool.query(
+      `SELECT member_id FROM segment_members
+       WHERE segment_id = $1 AND ($2::text IS NULL OR member_id > $2)
+       ORDER BY member_id
+       LIMIT $3`,
+      [id, cursor ?? null, limit]
+    );
+    const members = result.rows.map((row) => row.member_id);
+
+    res.json({
+      segmentId: id,
+      version,
+      members,
+      nextCursor: members.length === limit ? members[members.length - 1] : null
+    });
+  } catch (error) {
+    next(error);
+  }
+}
+
+export async function addSegmentMembers(req, res, next) {
+  try {
+    const { id } = req.params;
+    const members = toMemberIds(req.body.members);
+    if (!members) {
+      return res.status(400).json({ error: 'members must be an array of non-empty strings' });
+    }
+
+    const segment = await pool.query('SELECT id FROM segments WHERE id = $1', [id]);
+    if (segment.rows.length === 0) {
+      return res.status(404).json({ error: 'Segment not found' });
+    }
+
+    const result = await pool.query(
+      `INSERT INTO segment_members (segment_id, member_id)
+       SELECT $1, member_id FROM unnest($2::text[]) AS member_id
+       ON CONFLICT DO NOTHING`,
+      [id, members]
+    );
+    if (result.rowCount > 0) {
+      await membersChanged(id);
+    }
+
+    res.json({ added: result.rowCount });
+  } catch (error) {
+    next(error);
+  }
+}
+
+export async function removeSegmentMembers(req, res, next) {
+  try {
+    const { id } = req.params;
+    const members = toMemberIds(req.body.members);
+    if (!members) {
+      return res.status(400).json({ error: 'members must be an array of non-empty strings' });
+    }
+
+    const result = await pool.query(
+      'DELETE FROM segment_members WHERE segment_id = $1 AND member_id = ANY($2::text[])',
+      [id, members]
+    );
+    if (result.rowCount > 0) {
+      await membersChanged(id);
+    }
+
+    res.json({ removed: result.rowCount });
+  } catch (error) {
+    next(error);
+  }
+}
+
+// Replace every member in one transaction, so evaluations never see a
+// partially uploaded list.
+export async function replaceSegmentMembers(req, res, next) {
+  const { id } = req.params;
+  const members = toMemberIds(req.body.members);
+  if (!members) {
+    return res.status(400).json({ error: 'members must be an array of non-empty strings' });
+  }
+
+  let client;
+  try {
+    client = await pool.connect();
+    await client.query('BEGIN');
+
+    const segment = await client.query('SELECT id FROM segments WHERE id = $1 FOR UPDATE', [id]);
+    if (segment.rows.length === 0) {
+      await client.query('ROLLBACK');
+      return res.status(404).json({ error: 'Segment not found' });
+    }
+
+    await client.query('DELETE FROM segment_members WHERE segment_id = $1', [id]);
+    const result = await client.query(
+      `INSERT INTO segment_members (segment_id, member_id)
+       SELECT $1, member_id FROM unnest($2::text[]) AS member_id
+       ON CONFLICT DO NOTHING`,
+      [id, members]
+    );
+    await client.query('COMMIT');
+
+    await membersChanged(id);
+    res.json({ total: result.rowCount });
+  } catch (error) {
+    await client?.query('ROLLBACK').catch(() => {});
+    next(error);
+  } finally {
+    client?.release();
+  }
+}
+
+function toMemberIds(members) {
+  if (!Array.isArray(members)) {
+    return null;
+  }
+  const valid = members.every(
+    (member) => typeof member === 'string' && member.length > 0 && member.length <= MAX_MEMBER_LENGTH
+  );
+  return valid ? members : null;
+}
+
+async function membersChanged(segmentId) {
+  await pool.query('UPDATE segments SET updated_at = CURRENT_TIMESTAMP WHERE id = $1', [segmentId]);
+  await getRedisClient().del('segments:all');
+  await bumpSegmentVersion(segmentId);
+  await touchTargetingFlags(segmentId);
+}
+
+// Evaluations of flags targeting a segment change with its members, so the
+// flags are recorded as changed: ETags, delta polling and WebSocket clients
+// (which reload the segment) all pick the change up.
+async function touchTargetingFlags(segmentId) {
+  const result = await pool.query(
+    'SELECT * FROM feature_flags WHERE rules @> $1::jsonb OR rules @> $2::jsonb',
+    [
+      JSON.stringify([{ type: 'segment', value: segmentId }]),
+      JSON.stringify([{ type: 'segment', value: [segmentId] }])
+    ]
+  );
+
+  for (const flag of result.rows) {
+    await recordFlagChange(flag.environment, flag.id);
+    broadcastFlagUpdate('update', flag);
+  }
+}
@@ -3,8 +3,13 @@ import protoLoader from '@grpc/proto-loader';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import pool from '../config/database.js';
-import { evaluateRules } from '../services/rule-engine.service.js';
-import { getRedisClient } from '../config/redis.js';
+import { getRulePlan } from '../services/rule-engine.service.js';
+import { resolveContext } from '../services/context-resolver.service.js';
+import { loadFlag, loadFlags } from '../services/flag-loader.service.js';
+import { prepareSegments } from '../services/segment.service.js';
+import { evaluateAllFlags, getBootstrapTag } from '../services/bootstrap.service.js';
+import { subscribeFlagUpdates } from '../services/websocket.service.js';
+import { recordEvaluation, recordEvaluations } from '../services/evaluation-log.service.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -21,43 +26,142 @@ const packageDefinition = protoLoader.loadSync(PROTO_PATH, {
 
 const featureFlagProto = grpc.loadPackageDefinition(packageDefinition).featureflag;
 
+function fromContextValue(value) {
+  switch (value.kind) {
+    case 'string_value':
+      return value.string_value;
+    case 'number_value':
+      return value.number_value;
+    case 'bool_value':
+      return value.bool_value;
+    case 'null_value':
+      return null;
+    case 'json_value':
+      return JSON.parse(value.json_value);
+    default:
+      return undefined;
+  }
+}
+
+// Build the rule engine context from the typed message, falling back to the
+// legacy JSON string for older clients.
+function toEvaluationContext(ctx, legacyContext) {
+  if (!ctx) {
+    return legacyContext ? JSON.parse(legacyContext) : {};
+  }
+
+  const context = {};
+  for (const [key, value] of Object.entries(ctx.attributes || {})) {
+    const converted = fromContextValue(value);
+    if (converted !== undefined) {
+      context[key] = converted;
+    }
+  }
+
+  if (ctx.user_id) context.userId = ctx.user_id;
+  if (ctx.session_id) context.sessionId = ctx.session_id;
+  if (ctx.ip) context.ip = ctx.ip;
+  if (ctx.user_agent) context.userAgent = ctx.user_agent;
+
+  return context;
+}
+
+function evaluateLoadedFlag(flag, context, resolved) {
+  if (!flag.enabled) {
+    return { enabled: false, reason: 'Flag is disabled' };
+  }
+
+  const evaluation = getRulePlan(flag)(context, resolved);
+  return { enabled: evaluation.enabled, reason: evaluation.reason };
+}
+
+function toFlagResponse(flag) {
+  return {
+    id: flag.id,
+    name: flag.name,
+    description: flag.description || '',
+    enabled: flag.enabled,
+    environment: flag.environment,
+    rules: JSON.stringify(flag.rules),
+    updated_at: flag.updated_at ? new Date(flag.updated_at).toISOString() : ''
+  };
+}
+
 async function EvaluateFlag(call, callback) {
   try {
-    const { flag_id, user_id, context } = call.request;
-
-    const redis = getRedisClient();
-    const cacheKey = `flag:${flag_id}`;
-
-    let flag;
-    const cached = await redis.get(cacheKey);
-    if (cached) {
-      flag = JSON.parse(cached);
-    } else {
-      const result = await pool.query('SELECT * FROM feature_flags WHERE id = $1', [flag_id]);
-      if (result.rows.length === 0) {
-        return callback({
-          code: grpc.status.NOT_FOUND,
-          message: 'Flag not found'
-        });
-      }
-      flag = result.rows[0];
-      await redis.setEx(cacheKey, 300, JSON.stringify(flag));
-    }
+    const { flag_id, user_id, context, ctx } = call.request;
 
-    if (!flag.enabled) {
-      return callback(null, {
-        enabled: false,
-        reason: 'Flag is disabled'
+    const flag = await loadFlag(flag_id);
+    if (!flag) {
+      return callback({
+        code: grpc.status.NOT_FOUND,
+        message: 'Flag not found'
       });
     }
 
-    const contextObj = context ? JSON.parse(context) : {};
-    const evaluation = await evaluateRules(flag.rules, contextObj);
+    await prepareSegments([flag]);
+    const evaluationContext = toEvaluationContext(ctx, context);
+    const evaluation = evaluateLoadedFlag(flag, evaluationContext);
+    recordEvaluation(flag.id, user_id || ctx?.user_id || null, evaluationContext, evaluation.enabled);
+    callback(null, evaluation);
+  } catch (error) {
+    callback({
+      code: grpc.status.INTERNAL,
+      message: error.message
+    });
+  }
+}
+
+async function BulkEvaluate(call, callback) {
+  try {
+    const { flag_ids, user_id, ctx } = call.request;
+    const context = toEvaluationContext(ctx);
+
+    const flags = await loadFlags(flag_ids);
+    await prepareSegments(flags.values());
+    const resolved = resolveContext(context);
+
+    const results = {};
+    const evaluated = [];
+    for (const flagId of flag_ids) {
+      const flag = flags.get(flagId);
+      if (!flag) {
+        results[flagId] = { enabled: false, reason: 'Flag not found' };
+        continue;
+      }
+      results[flagId] = evaluateLoadedFlag(flag, context, resolved);
+      evaluated.push([flagId, results[flagId].enabled]);
+    }
+    recordEvaluations(user_id || ctx?.user_id || null, context, evaluated);
 
-    callback(null, {
-      enabled: evaluation.enabled,
-      reason: evaluation.reason
+    callback(null, { results });
+  } catch (error) {
+    callback({
+      code: grpc.status.INTERNAL,
+      message: error.message
     });
+  }
+}
+
+async function EvaluateAll(call, callback) {
+  try {
+    const { environment, user_id, ctx, etag } = call.request;
+    const env = environment || 'development';
+    const userId = user_id || ctx?.user_id || null;
+    const context = toEvaluationContext(ctx);
+
+    const tag = await getBootstrapTag(env, userId, context);
+    if (etag && etag === tag.etag) {
+      return callback(null, { results: {}, etag: tag.etag, not_modified: true, version: tag.version });
+    }
+
+    const evaluations = await evaluateAllFlags(env, userId, context, tag.version);
+    const results = {};
+    for (const [flagId, evaluation] of Object.entries(evaluations)) {
+      results[flagId] = { enabled: evaluation.enabled, reason: evaluation.reason };
+    }
+
+    callback(null, { results, etag: tag.etag, not_modified: false, version: tag.version });
   } catch (error) {
     callback({
       code: grpc.status.INTERNAL,
@@ -66,6 +170,26 @@ async function EvaluateFlag(call, callback) {
   }
 }
 
+function WatchFlags(call) {
+  const environments = new Set(call.request.environments);
+  const flagIds = new Set(call.request.flag_ids);
+
+  const unsubscribe = subscribeFlagUpdates((action, flag, timestamp) => {
+    if (environments.size > 0 && !environments.has(flag.environment)) return;
+    if (flagIds.size > 0 && !flagIds.has(flag.id)) return;
+
+    call.write({
+      action,
+      flag: toFlagResponse(flag),
+      timestamp,
+      reason: flag.reason || ''
+    });
+  });
+
+  call.on('cancelled', unsubscribe);
+  call.on('error', unsubscribe);
+}
+
 async function GetFlag(call, callback) {
   try {
     const { flag_id } = call.request;
@@ -79,16 +203,7 @@ async function GetFlag(call, callback) {
       });
     }
 
-    const flag = result.rows[0];
-
-    callback(null, {
-      id: flag.id,
-      name: flag.name,
-      description: flag.description,
-      enabled: flag.enabled,
-      environment: flag.environment,
-      rules: JSON.stringify(flag.rules)
-    });
+    callback(null, toFlagResponse(result.rows[0]));
   } catch (error) {
     callback({
       code: grpc.status.INTERNAL,
@@ -102,7 +217,10 @@ export function startGrpcServer() {
 
   server.addService(featureFlagProto.FeatureFlagService.service, {
     EvaluateFlag,
-    GetFlag
+    GetFlag,
+    BulkEvaluate,
+    EvaluateAll,
+    WatchFlags
   });
 
   const port = process.env.GRPC_PORT || 50051;
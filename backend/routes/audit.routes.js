@@ -1,12 +1,14 @@
 import express from 'express';
 import {
   getAuditLogs,
+  getAuditLogPage,
   getAuditLogsByFlag
 } from '../controllers/audit.controller.js';
 
 const router = express.Router();
 
 router.get('/', getAuditLogs);
+router.get('/page', getAuditLogPage);
 router.get('/flag/:flagId', getAuditLogsByFlag);
 
 export default router;
\ No newline at end of file
@@ -1,9 +1,11 @@
 import express from 'express';
-import { evaluateFlag, bulkEvaluate } from '../controllers/evaluation.controller.js';
+import { evaluateFlag, bulkEvaluate, evaluateAll, recordEvaluationEvents } from '../controllers/evaluation.controller.js';
 
 const router = express.Router();
 
 router.post('/', evaluateFlag);
 router.post('/bulk', bulkEvaluate);
+router.post('/all', evaluateAll);
+router.post('/events', recordEvaluationEvents);
 
 export default router;
\ No newline at end of file
@@ -4,7 +4,11 @@ import {
   getSegmentById,
   createSegment,
   updateSegment,
-  deleteSegment
+  deleteSegment,
+  listSegmentMembers,
+  addSegmentMembers,
+  removeSegmentMembers,
+  replaceSegmentMembers
 } from '../controllers/segment.controller.js';
 
 const router = express.Router();
@@ -14,5 +18,9 @@ router.get('/:id', getSegmentById);
 router.post('/', createSegment);
 router.put('/:id', updateSegment);
 router.delete('/:id', deleteSegment);
+router.get('/:id/members', listSegmentMembers);
+router.post('/:id/members', addSegmentMembers);
+router.put('/:id/members', replaceSegmentMembers);
+router.delete('/:id/members', removeSegmentMembers);
 
 export default router;
\ No newline at end of file
@@ -16,7 +16,10 @@ import { errorHandler } from './middleware/error.middleware.js';
 import { initDatabase } from './config/database.js';
 import { initRedis } from './config/redis.js';
 import { startGrpcServer } from './grpc/server.js';
-import { setupWebSocket } from './services/websocket.service.js';
+import { setupWebSocket, startFlagUpdateRelay } from './services/websocket.service.js';
+import { startEvaluationLog, stopEvaluationLog, getEvaluationLogStats } from './services/evaluation-log.service.js';
+import { startPartitionMaintenance } from './services/partition.service.js';
+import { getContextCacheStats } from './services/context-resolver.service.js';
 
 dotenv.config();
 
@@ -31,12 +34,19 @@ app.use(cors({
 }));
 app.use(morgan('dev'));
 app.use(compression());
+// Segment member uploads carry up to hundreds of thousands of IDs
+app.use('/api/segments', express.json({ limit: process.env.SEGMENT_UPLOAD_LIMIT || '20mb' }));
 app.use(express.json());
 app.use(express.urlencoded({ extended: true }));
 
 // Health check
 app.get('/api/health', (req, res) => {
-  res.json({ status: 'ok', timestamp: new Date().toISOString() });
+  res.json({
+    status: 'ok',
+    timestamp: new Date().toISOString(),
+    evaluationLog: getEvaluationLogStats(),
+    contextCache: getContextCacheStats()
+  });
 });
 
 // Routes
@@ -56,6 +66,12 @@ async function startServer() {
     await initDatabase();
     console.log('✅ Database connected');
 
+    // Create the evaluations partitions ahead, and drop expired ones hourly
+    await startPartitionMaintenance();
+
+    // Start the batched evaluation log writer
+    startEvaluationLog();
+
     // Initialize Redis
     await initRedis();
     console.log('✅ Redis connected');
@@ -68,6 +84,10 @@ async function startServer() {
     setupWebSocket(wss);
     console.log('✅ WebSocket server initialized');
 
+    // Relay flag updates from every node through Redis pub/sub
+    await startFlagUpdateRelay();
+    console.log('✅ Flag update relay subscribed');
+
     // Start gRPC server
     startGrpcServer();
     console.log('✅ gRPC server started on port 50051');
@@ -83,4 +103,12 @@ async function startServer() {
   }
 }
 
+// Flush buffered evaluation events before exiting
+for (const signal of ['SIGINT', 'SIGTERM']) {
+  process.once(signal, async () => {
+    await stopEvaluationLog();
+    process.exit(0);
+  });
+}
+
 startServer();
\ No newline at end of file
@@ -0,0 +1,59 @@
+import crypto from 'crypto';
+import { getRulePlan } from './rule-engine.service.js';
+import { resolveContext } from './context-resolver.service.js';
+import { loadEnvironmentFlags } from './flag-loader.service.js';
+import { getFlagsVersion } from './flag-version.service.js';
+import { recordEvaluations } from './evaluation-log.service.js';
+import { prepareSegments } from './segment.service.js';
+
+// ETag of an evaluate-all response. Results depend only on the environment's
+// flag set (identified by its version) and the caller's user and context, so
+// the tag can be checked before any flag is loaded.
+export async function getBootstrapTag(environment, userId, context) {
+  const version = await getFlagsVersion(environment);
+  const digest = crypto
+    .createHash('sha1')
+    .update(stableStringify([environment, version, userId ?? null, context ?? {}]))
+    .digest('base64url');
+  return { version, etag: `"${digest}"` };
+}
+
+// Evaluate every flag of an environment for one user. Returns a map of flag
+// ID to { enabled, reason }. Pass the version from getBootstrapTag so the
+// results hold at least every change the tag covers.
+export async function evaluateAllFlags(environment, userId, context, version) {
+  const flags = await loadEnvironmentFlags(environment, version);
+  await prepareSegments(flags);
+  const resolved = resolveContext(context);
+
+  const results = {};
+  const evaluated = [];
+  for (const flag of flags) {
+    try {
+      results[flag.id] = flag.enabled
+        ? getRulePlan(flag)(context, resolved)
+        : { enabled: false, reason: 'Flag is disabled' };
+      evaluated.push([flag.id, results[flag.id].enabled]);
+    } catch (error) {
+      results[flag.id] = { enabled: false, reason: 'Evaluation error' };
+    }
+  }
+
+  recordEvaluations(userId, context, evaluated);
+  return results;
+}
+
+// JSON with object keys sorted, so equal contexts hash equally
+function stableStringify(value) {
+  if (Array.isArray(value)) {
+    return `[${value.map(stableStringify).join(',')}]`;
+  }
+  if (value && typeof value === 'object') {
+    const entries = Object.keys(value)
+      .sort()
+      .filter((key) => value[key] !== undefined)
+      .map((key) => `${JSON.stringify(key)}:${stableStringify(value[key])}`);
+    return `{${entries.join(',')}}`;
+  }
+  return JSON.stringify(value) ?? 'null';
+}
@@ -0,0 +1,122 @@
+import geoip from 'geoip-lite';
+import UAParser from 'ua-parser-js';
+
+// The same IPs and user agents recur across requests, so lookups are cached
+// process-wide in bounded LRU maps. Both hold small values: a country code,
+// or the three names parsed from a user agent.
+const GEO_CACHE_LIMIT = parseInt(process.env.GEO_CACHE_SIZE) || 50000;
+const USER_AGENT_CACHE_LIMIT = parseInt(process.env.USER_AGENT_CACHE_SIZE) || 10000;
+
+// Longer user agents are parsed but not cached, bounding the cache's memory
+const MAX_CACHED_USER_AGENT_LENGTH = 512;
+
+const countryCache = new Map();
+const agentCache = new Map();
+const cacheStats = { geoHits: 0, geoMisses: 0, userAgentHits: 0, userAgentMisses: 0 };
+
+// Resolve a context into the profile read by geo and device rules:
+// { country(), agent() } returning the country code and
+// { deviceType, os, browser }. Each is computed at most once, on first use,
+// so pass one resolved context to every flag evaluated for the same context.
+//
+// Callers that resolved the context themselves send it as
+// context.resolved = { country, deviceType, os, browser } and may omit ip and
+// userAgent. Fields present there are used as they are; the others fall back
+// to looking up ip / userAgent.
+export function resolveContext(context) {
+  const provided = context?.resolved && typeof context.resolved === 'object' ? context.resolved : {};
+  let country;
+  let agent;
+
+  return {
+    country() {
+      if (country === undefined) {
+        if (typeof provided.country === 'string') {
+          country = provided.country;
+        } else {
+          const ip = context?.ip || context?.userIp;
+          country = ip ? lookupCountry(ip) : null;
+        }
+      }
+      return country;
+    },
+    agent() {
+      if (agent === undefined) {
+        if (['deviceType', 'os', 'browser'].some((name) => typeof provided[name] === 'string')) {
+          agent = {
+            deviceType: stringOrUndefined(provided.deviceType) || 'desktop',
+            os: stringOrUndefined(provided.os),
+            browser: stringOrUndefined(provided.browser)
+          };
+        } else {
+          agent = context?.userAgent ? parseUserAgent(context.userAgent) : null;
+        }
+      }
+      return agent;
+    }
+  };
+}
+
+export function lookupCountry(ip) {
+  const cached = readCache(countryCache, ip);
+  if (cached !== undefined) {
+    cacheStats.geoHits++;
+    return cached;
+  }
+  cacheStats.geoMisses++;
+  const geo = geoip.lookup(ip);
+  const country = geo ? geo.country : null;
+  writeCache(countryCache, GEO_CACHE_LIMIT, ip, country);
+  return country;
+}
+
+export function parseUserAgent(userAgent) {
+  const cacheable = userAgent.length <= MAX_CACHED_USER_AGENT_LENGTH;
+  const cached = cacheable ? readCache(agentCache, userAgent) : undefined;
+  if (cached !== undefined) {
+    cacheStats.userAgentHits++;
+    return cached;
+  }
+  cacheStats.userAgentMisses++;
+
+  const parser = new UAParser(userAgent);
+  const agent = Object.freeze({
+    deviceType: parser.getDevice().type || 'desktop',
+    os: parser.getOS().name,
+    browser: parser.getBrowser().name
+  });
+  if (cacheable) {
+    writeCache(agentCache, USER_AGENT_CACHE_LIMIT, userAgent, agent);
+  }
+  return agent;
+}
+
+export function getContextCacheStats() {
+  return {
+    ...cacheStats,
+    geoEntries: countryCache.size,
+    userAgentEntries: agentCache.size
+  };
+}
+
+// Map iteration order is insertion order: re-inserting on every hit keeps
+// the least recently used entry first, where eviction takes it from.
+function readCache(cache, key) {
+  const value = cache.get(key);
+  if (value !== undefined) {
+    cache.delete(key);
+    cache.set(key, value);
+  }
+  return value;
+}
+
+function writeCache(cache, limit, key, value) {
+  if (cache.size >= limit) {
+    cache.delete(cache.keys().next().value);
+  }
+  cache.set(key, value);
+}
+
+function stringOrUndefined(value) {
+  return typeof value === 'string' ? value : undefined;
+}
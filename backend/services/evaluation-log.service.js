@@ -0,0 +1,159 @@
+import pool from '../config/database.js';
+
+// Evaluation events are buffered in memory and written in multi-row batches,
+// so logging never puts Postgres on the critical path of a flag check.
+const MAX_QUEUE_SIZE = Number(process.env.EVALUATION_LOG_MAX_QUEUE) || 10000;
+const BATCH_SIZE = Number(process.env.EVALUATION_LOG_BATCH_SIZE) || 500;
+const FLUSH_INTERVAL_MS = Number(process.env.EVALUATION_LOG_FLUSH_MS) || 1000;
+
+// Fraction of evaluations recorded at all (1 = every evaluation)
+const SAMPLE_RATE = Number(process.env.EVALUATION_LOG_SAMPLE_RATE ?? 1);
+
+// What happens under overload:
+//   drop_newest - a full queue rejects new events (default)
+//   drop_oldest - a full queue discards its oldest event to make room
+//   sample      - past half capacity, new events are kept with a probability
+//                 falling linearly to 0 at full capacity
+const OVERFLOW_POLICY = process.env.EVALUATION_LOG_OVERFLOW || 'drop_newest';
+
+// Unknown flag IDs (e.g. flags deleted since evaluation) are filtered out by
+// the join, and timestamps outside the days that have a partition (yesterday
+// through tomorrow are always there, see partition.service.js) by the WHERE,
+// so one stale or skewed client event cannot fail its whole batch.
+const INSERT_BATCH_SQL = `
+  INSERT INTO evaluations (flag_id, user_id, context, result, timestamp)
+  SELECT e.flag_id, e.user_id, e.context, e.result, e.timestamp
+  FROM (
+    SELECT *, to_timestamp(timestamp_ms / 1000.0)::timestamp AS timestamp
+    FROM unnest($1::varchar[], $2::varchar[], $3::jsonb[], $4::boolean[], $5::double precision[])
+      AS u(flag_id, user_id, context, result, timestamp_ms)
+  ) e
+  JOIN feature_flags f ON f.id = e.flag_id
+  WHERE e.timestamp >= CURRENT_DATE - 1 AND e.timestamp < CURRENT_DATE + 2
+`;
+
+const queue = [];
+const stats = {
+  recorded: 0,
+  sampledOut: 0,
+  dropped: 0,
+  written: 0,
+  failed: 0
+};
+
+let flushTimer = null;
+let flushing = null;
+
+export function startEvaluationLog() {
+  if (!flushTimer) {
+    flushTimer = setInterval(() => scheduleFlush(), FLUSH_INTERVAL_MS);
+    flushTimer.unref();
+  }
+}
+
+// Flush everything still buffered; call on shutdown.
+export async function stopEvaluationLog() {
+  clearInterval(flushTimer);
+  flushTimer = null;
+  while (flushing || queue.length > 0) {
+    await (flushing || flush());
+  }
+}
+
+// Queue one evaluation event. Returns false if it was sampled out or dropped.
+export function recordEvaluation(flagId, userId, context, result, timestamp = Date.now()) {
+  return enqueue(flagId, userId ?? null, JSON.stringify(context ?? {}), result, timestamp);
+}
+
+// Queue the results of one bulk evaluation, serializing the shared context
+// once. `results` is an iterable of [flagId, enabled] pairs.
+export function recordEvaluations(userId, context, results, timestamp = Date.now()) {
+  const serialized = JSON.stringify(context ?? {});
+  let accepted = 0;
+  for (const [flagId, result] of results) {
+    if (enqueue(flagId, userId ?? null, serialized, result, timestamp)) {
+      accepted++;
+    }
+  }
+  return accepted;
+}
+
+export function getEvaluationLogStats() {
+  return { ...stats, queued: queue.length, maxQueueSize: MAX_QUEUE_SIZE, overflowPolicy: OVERFLOW_POLICY };
+}
+
+function enqueue(flagId, userId, context, result, timestamp) {
+  if (SAMPLE_RATE < 1 && Math.random() >= SAMPLE_RATE) {
+    stats.sampledOut++;
+    return false;
+  }
+  if (!admit()) {
+    stats.dropped++;
+    return false;
+  }
+
+  queue.push({ flagId, userId, context, result: Boolean(result), timestamp });
+  stats.recorded++;
+
+  if (queue.length >= BATCH_SIZE) {
+    scheduleFlush();
+  }
+  return true;
+}
+
+function admit() {
+  switch (OVERFLOW_POLICY) {
+    case 'drop_oldest':
+      if (queue.length >= MAX_QUEUE_SIZE) {
+        queue.shift();
+        stats.dropped++;
+      }
+      return true;
+    case 'sample': {
+      const highWater = MAX_QUEUE_SIZE / 2;
+      if (queue.length < highWater) {
+        return true;
+      }
+      return Math.random() < (MAX_QUEUE_SIZE - queue.length) / highWater;
+    }
+    default:
+      return queue.length < MAX_QUEUE_SIZE;
+  }
+}
+
+function scheduleFlush() {
+  if (!flushing && queue.length > 0) {
+    flush();
+  }
+}
+
+function flush() {
+  flushing = (async () => {
+    try {
+      // Keep going while full batches are waiting; a partial remainder is
+      // left for the next timer tick.
+      do {
+        await writeBatch(queue.splice(0, BATCH_SIZE));
+      } while (queue.length >= BATCH_SIZE);
+    } finally {
+      flushing = null;
+    }
+  })();
+  return flushing;
+}
+
+async function writeBatch(batch) {
+  try {
+    const result = await pool.query(INSERT_BATCH_SQL, [
+      batch.map((event) => event.flagId),
+      batch.map((event) => event.userId),
+      batch.map((event) => event.context),
+      batch.map((event) => event.result),
+      batch.map((event) => event.timestamp)
+    ]);
+    stats.written += result.rowCount;
+  } catch (error) {
+    stats.failed += batch.length;
+    console.error('Failed to write evaluation batch:', error);
+  }
+}
@@ -0,0 +1,81 @@
+import pool from '../config/database.js';
+import { getRedisClient } from '../config/redis.js';
+import { getFlagsVersion } from './flag-version.service.js';
+
+const CACHE_TTL = 300; // 5 minutes
+
+// Load one flag from cache or database. Returns null if it does not exist.
+export async function loadFlag(flagId) {
+  const flags = await loadFlags([flagId]);
+  return flags.get(flagId) || null;
+}
+
+// Load many flags with one MGET, one query for the cache misses and one
+// pipelined cache fill. Returns a Map of the flags that exist.
+//
+// With fresh: true the flags are read from the database only, for callers
+// that must see every write committed before the call.
+export async function loadFlags(flagIds, { fresh = false } = {}) {
+  const ids = [...new Set(flagIds)];
+  const flags = new Map();
+  if (ids.length === 0) {
+    return flags;
+  }
+
+  if (fresh) {
+    const result = await pool.query('SELECT * FROM feature_flags WHERE id = ANY($1)', [ids]);
+    for (const flag of result.rows) {
+      flags.set(flag.id, flag);
+    }
+    return flags;
+  }
+
+  const redis = getRedisClient();
+  const cached = await redis.mGet(ids.map((id) => `flag:${id}`));
+
+  const missing = [];
+  ids.forEach((id, i) => {
+    if (cached[i]) {
+      flags.set(id, JSON.parse(cached[i]));
+    } else {
+      missing.push(id);
+    }
+  });
+
+  if (missing.length > 0) {
+    const result = await pool.query('SELECT * FROM feature_flags WHERE id = ANY($1)', [missing]);
+    if (result.rows.length > 0) {
+      const multi = redis.multi();
+      for (const flag of result.rows) {
+        flags.set(flag.id, flag);
+        multi.setEx(`flag:${flag.id}`, CACHE_TTL, JSON.stringify(flag));
+      }
+      await multi.exec();
+    }
+  }
+
+  return flags;
+}
+
+// Load every flag of an environment, newest first.
+//
+// The list is cached under the flag set version read before querying, so it
+// holds every change up to that version. A fill that races a write lands
+// under the old version's key and is never served for the new one. Pass the
+// version the response is tagged with; it is read here otherwise.
+export async function loadEnvironmentFlags(environment, version) {
+  const redis = getRedisClient();
+  const cacheKey = `flags:list:${environment}:${version ?? await getFlagsVersion(environment)}`;
+
+  const cached = await redis.get(cacheKey);
+  if (cached) {
+    return JSON.parse(cached);
+  }
+
+  const result = await pool.query(
+    'SELECT * FROM feature_flags WHERE environment = $1 ORDER BY created_at DESC',
+    [environment]
+  );
+  await redis.setEx(cacheKey, CACHE_TTL, JSON.stringify(result.rows));
+  return result.rows;
+}
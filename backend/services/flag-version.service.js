@@ -0,0 +1,79 @@
+import { getRedisClient } from '../config/redis.js';
+
+// Changes kept per environment for delta sync. Clients further behind get a
+// full flag set.
+const CHANGE_LOG_LIMIT = parseInt(process.env.FLAG_CHANGE_LOG_LIMIT) || 10000;
+
+// Monotonic per-environment version of the flag set, bumped on every flag
+// change. A missing counter starts at the current time in milliseconds, so a
+// Redis flush never re-issues a version clients may still hold.
+//
+// Each change is also logged in a sorted set of flag IDs scored by the
+// version that last changed them. The floor key holds the newest version no
+// longer covered by the log: a delta since an older version is incomplete.
+function keys(environment) {
+  return [
+    `flags:version:${environment}`,
+    `flags:changes:${environment}`,
+    `flags:changes:floor:${environment}`
+  ];
+}
+
+// Bump the version and log the change in one step, so a delta read never
+// sees a version whose change is not logged yet.
+const RECORD_CHANGE = `
+  if redis.call('SET', KEYS[1], ARGV[2], 'NX') then
+    redis.call('SET', KEYS[3], ARGV[2])
+  end
+  local version = redis.call('INCR', KEYS[1])
+  redis.call('ZADD', KEYS[2], version, ARGV[1])
+  local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[3])
+  if excess > 0 then
+    local trimmed = redis.call('ZPOPMIN', KEYS[2], excess)
+    redis.call('SET', KEYS[3], trimmed[#trimmed])
+  end
+  return version
+`;
+
+export async function getFlagsVersion(environment) {
+  const redis = getRedisClient();
+  const [versionKey, , floorKey] = keys(environment);
+
+  const version = await redis.get(versionKey);
+  if (version !== null) {
+    return version;
+  }
+
+  const now = String(Date.now());
+  if (await redis.set(versionKey, now, { NX: true })) {
+    await redis.set(floorKey, now);
+  }
+  return redis.get(versionKey);
+}
+
+// Record a change to one flag. Returns the new version.
+export async function recordFlagChange(environment, flagId) {
+  const redis = getRedisClient();
+  const version = await redis.eval(RECORD_CHANGE, {
+    keys: keys(environment),
+    arguments: [flagId, String(Date.now()), String(CHANGE_LOG_LIMIT)]
+  });
+  return String(version);
+}
+
+// IDs of the flags changed after a version. Returns { version, full: true }
+// when the log cannot answer: the version is unknown or older than the log.
+export async function getFlagChanges(environment, since) {
+  const redis = getRedisClient();
+  const [, changesKey, floorKey] = keys(environment);
+
+  const version = await getFlagsVersion(environment);
+  const floor = Number(await redis.get(floorKey)) || 0;
+  const from = Number(since);
+  if (!Number.isSafeInteger(from) || from < floor || from > Number(version)) {
+    return { version, full: true };
+  }
+
+  const flagIds = await redis.zRangeByScore(changesKey, `(${from}`, '+inf');
+  return { version, full: false, flagIds };
+}
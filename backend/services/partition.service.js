@@ -0,0 +1,112 @@
+import pool, { LEGACY_EVALUATIONS_TABLE } from '../config/database.js';
+
+// Days of raw evaluations kept; older partitions are dropped whole, never
+// DELETEd row by row. Analytics read the rollups, which are not affected.
+const RETENTION_DAYS = Math.max(1, parseInt(process.env.EVALUATION_RETENTION_DAYS) || 30);
+
+// Daily partitions created ahead of time, so inserts never wait on DDL
+const DAYS_AHEAD = Math.max(1, parseInt(process.env.EVALUATION_PARTITIONS_AHEAD) || 3);
+
+const MAINTENANCE_INTERVAL_MS = 60 * 60 * 1000;
+
+// Partitions are named evaluations_pYYYYMMDD and hold one day, in the
+// database's time zone like the timestamp column. Yesterday's is created
+// too, for client-side events reported late.
+const PARTITION_PATTERN = /^evaluations_p(\d{4})(\d{2})(\d{2})$/;
+
+let maintenanceTimer = null;
+
+// Create missing partitions now, then keep creating and dropping them hourly.
+export async function startPartitionMaintenance() {
+  await maintainPartitions();
+  if (!maintenanceTimer) {
+    maintenanceTimer = setInterval(() => {
+      maintainPartitions().catch((error) => console.error('Evaluation partition maintenance failed:', error));
+    }, MAINTENANCE_INTERVAL_MS);
+    maintenanceTimer.unref();
+  }
+}
+
+export function stopPartitionMaintenance() {
+  clearInterval(maintenanceTimer);
+  maintenanceTimer = null;
+}
+
+export async function maintainPartitions() {
+  const client = await pool.connect();
+  try {
+    await client.query('BEGIN');
+    // One node at a time; the others find the work done
+    await client.query("SELECT pg_advisory_xact_lock(hashtext('evaluations_partitioning'))");
+
+    const created = await createPartitions(client);
+    const dropped = await dropExpiredPartitions(client);
+
+    await client.query('COMMIT');
+    if (created.length > 0 || dropped.length > 0) {
+      console.log(`Evaluation partitions created: [${created.join(', ')}], dropped: [${dropped.join(', ')}]`);
+    }
+    return { created, dropped };
+  } catch (error) {
+    await client.query('ROLLBACK');
+    throw error;
+  } finally {
+    client.release();
+  }
+}
+
+async function createPartitions(client) {
+  const days = await client.query(
+    `SELECT 'evaluations_p' || to_char(day, 'YYYYMMDD') AS name,
+            day::date::text AS start,
+            (day + INTERVAL '1 day')::date::text AS "end"
+     FROM generate_series(CURRENT_DATE - 1, CURRENT_DATE + $1::int, INTERVAL '1 day') AS day
+     WHERE to_regclass('evaluations_p' || to_char(day, 'YYYYMMDD')) IS NULL`,
+    [DAYS_AHEAD]
+  );
+
+  for (const { name, start, end } of days.rows) {
+    await client.query(
+      `CREATE TABLE IF NOT EXISTS ${name} PARTITION OF evaluations FOR VALUES FROM ('${start}') TO ('${end}')`
+    );
+  }
+  return days.rows.map((day) => day.name);
+}
+
+async function dropExpiredPartitions(client) {
+  const { rows } = await client.query(
+    `SELECT c.relname AS name, (CURRENT_DATE - $1::int)::text AS cutoff
+     FROM pg_inherits i
+     JOIN pg_class c ON c.oid = i.inhrelid
+     WHERE i.inhparent = 'evaluations'::regclass`,
+    [RETENTION_DAYS]
+  );
+
+  const dropped = [];
+  for (const { name, cutoff } of rows) {
+    const match = PARTITION_PATTERN.exec(name);
+    // The partition of day D holds rows up to midnight of D + 1, all of them
+    // older than the cutoff once D is
+    if (match && `${match[1]}-${match[2]}-${match[3]}` < cutoff) {
+      await client.query(`DROP TABLE ${name}`);
+      dropped.push(name);
+    }
+  }
+
+  // The pre-partitioning table, once nothing in it is within retention
+  const legacy = await client.query(
+    `SELECT to_regclass($1) IS NOT NULL AS present`,
+    [LEGACY_EVALUATIONS_TABLE]
+  );
+  if (legacy.rows[0].present) {
+    const newest = await client.query(
+      `SELECT COALESCE(MAX(timestamp) < CURRENT_DATE - $1::int, true) AS expired FROM ${LEGACY_EVALUATIONS_TABLE}`,
+      [RETENTION_DAYS]
+    );
+    if (newest.rows[0].expired) {
+      await client.query(`DROP TABLE ${LEGACY_EVALUATIONS_TABLE}`);
+      dropped.push(LEGACY_EVALUATIONS_TABLE);
+    }
+  }
+  return dropped;
+}
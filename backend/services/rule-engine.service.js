@@ -1,186 +1,322 @@
-import geoip from 'geoip-lite';
-import UAParser from 'ua-parser-js';
+import { resolveContext } from './context-resolver.service.js';
+import { getSegmentMembers, prepareSegments } from './segment.service.js';
+
+// Relative cost of each rule type. Plans run cheap in-memory checks before
+// hashing, and hashing before geo lookups and user agent parsing.
+const RULE_COSTS = new Map([
+  ['user', 0],
+  ['segment', 0],
+  ['custom', 0],
+  ['percentage', 1],
+  ['geo', 2],
+  ['device', 3]
+]);
+
+const PLAN_CACHE_LIMIT = 10000;
+const planCache = new Map();
 
 export async function evaluateRules(rules, context) {
-  if (!rules || rules.length === 0) {
-    return { enabled: true, reason: 'No rules defined' };
+  return compileRules(rules)(context);
+}
+
+// Evaluate a flag's rules with its compiled plan, compiling at most once per
+// flag version. Pass the same resolveContext() result when evaluating many
+// flags for one context. Plans run synchronously: callers using getRulePlan()
+// directly must prepareSegments() first.
+export async function evaluateFlagRules(flag, context, resolved) {
+  await prepareSegments([flag]);
+  return getRulePlan(flag)(context, resolved);
+}
+
+export function getRulePlan(flag) {
+  if (!flag.id) {
+    return compileRules(flag.rules);
   }
 
-  for (const rule of rules) {
-    const result = await evaluateRule(rule, context);
-    if (!result.passed) {
-      return { enabled: false, reason: result.reason };
-    }
+  const version = flag.updated_at ? new Date(flag.updated_at).getTime() : null;
+  const cached = planCache.get(flag.id);
+  if (cached && cached.version === version) {
+    return cached.plan;
   }
 
-  return { enabled: true, reason: 'All rules passed' };
+  const plan = compileRules(flag.rules);
+  planCache.delete(flag.id);
+  if (planCache.size >= PLAN_CACHE_LIMIT) {
+    planCache.delete(planCache.keys().next().value);
+  }
+  planCache.set(flag.id, { version, plan });
+  return plan;
+}
+
+export function invalidateRulePlan(flagId) {
+  planCache.delete(flagId);
+}
+
+// Compile rules into a plan: a function evaluating a context. Rules of
+// unknown type always pass and are dropped; the rest run cheapest first, so
+// the reason reported is that of the first failing rule in cost order.
+export function compileRules(rules) {
+  if (!rules || rules.length === 0) {
+    return () => ({ enabled: true, reason: 'No rules defined' });
+  }
+
+  const predicates = rules
+    .map((rule, index) => ({ rule, index, cost: RULE_COSTS.get(rule.type) }))
+    .filter(({ cost }) => cost !== undefined)
+    .sort((a, b) => a.cost - b.cost || a.index - b.index)
+    .map(({ rule }) => compileRule(rule));
+
+  return (context, resolved = resolveContext(context)) => {
+    for (const predicate of predicates) {
+      const result = predicate(context, resolved);
+      if (!result.passed) {
+        return { enabled: false, reason: result.reason };
+      }
+    }
+    return { enabled: true, reason: 'All rules passed' };
+  };
 }
 
-async function evaluateRule(rule, context) {
+function compileRule(rule) {
   const { type, operator, value } = rule;
 
   switch (type) {
     case 'geo':
-      return evaluateGeoRule(operator, value, context);
+      return compileGeoRule(operator, value);
     case 'device':
-      return evaluateDeviceRule(operator, value, context);
+      return compileDeviceRule(operator, value);
     case 'percentage':
-      return evaluatePercentageRule(operator, value, context);
+      return compilePercentageRule(operator, value);
     case 'user':
-      return evaluateUserRule(operator, value, context);
+      return compileUserRule(operator, value);
+    case 'segment':
+      return compileSegmentRule(operator, value);
     case 'custom':
-      return evaluateCustomRule(rule, context);
-    default:
-      return { passed: true, reason: 'Unknown rule type' };
+      return compileCustomRule(rule);
   }
 }
 
-function evaluateGeoRule(operator, value, context) {
-  const ip = context?.ip || context?.userIp;
-  if (!ip) {
-    return { passed: false, reason: 'No IP address provided' };
-  }
+function toSet(value) {
+  return Array.isArray(value) ? new Set(value) : null;
+}
 
-  const geo = geoip.lookup(ip);
-  if (!geo) {
-    return { passed: false, reason: 'Could not determine location' };
-  }
+function outcome(passed, reason) {
+  return Object.freeze({ passed, reason });
+}
+
+const UNKNOWN_OPERATOR = outcome(true, 'Unknown operator');
+const NO_IP = outcome(false, 'No IP address provided');
+const NO_LOCATION = outcome(false, 'Could not determine location');
+const NO_USER_AGENT = outcome(false, 'No user agent provided');
+const NO_USER_OR_SESSION = outcome(false, 'No user/session ID provided');
+const NO_USER = outcome(false, 'No user ID provided');
+
+function compileGeoRule(operator, value) {
+  const countries = toSet(value);
+  let check;
 
   switch (operator) {
     case 'in':
-      if (Array.isArray(value) && value.includes(geo.country)) {
-        return { passed: true, reason: `Country ${geo.country} is in allowed list` };
-      }
-      return { passed: false, reason: `Country ${geo.country} not in allowed list` };
+      check = (country) => countries !== null && countries.has(country)
+        ? { passed: true, reason: `Country ${country} is in allowed list` }
+        : { passed: false, reason: `Country ${country} not in allowed list` };
+      break;
     case 'not_in':
-      if (Array.isArray(value) && !value.includes(geo.country)) {
-        return { passed: true, reason: `Country ${geo.country} is not in blocked list` };
-      }
-      return { passed: false, reason: `Country ${geo.country} is in blocked list` };
+      check = (country) => countries !== null && !countries.has(country)
+        ? { passed: true, reason: `Country ${country} is not in blocked list` }
+        : { passed: false, reason: `Country ${country} is in blocked list` };
+      break;
     default:
-      return { passed: true, reason: 'Unknown operator' };
+      check = () => UNKNOWN_OPERATOR;
   }
+
+  return (context, resolved) => {
+    const country = resolved.country();
+    if (country !== null) {
+      return check(country);
+    }
+    return context?.ip || context?.userIp ? NO_LOCATION : NO_IP;
+  };
 }
 
-function evaluateDeviceRule(operator, value, context) {
-  const userAgent = context?.userAgent;
-  if (!userAgent) {
-    return { passed: false, reason: 'No user agent provided' };
+function compileDeviceRule(operator, value) {
+  let check;
+
+  switch (operator) {
+    case 'is': {
+      const matches = outcome(true, `Device/OS/Browser matches ${value}`);
+      const differs = outcome(false, `Device/OS/Browser does not match ${value}`);
+      check = ({ deviceType, os, browser }) =>
+        deviceType === value || os === value || browser === value ? matches : differs;
+      break;
+    }
+    case 'is_not': {
+      const differs = outcome(true, `Device/OS/Browser is not ${value}`);
+      const matches = outcome(false, `Device/OS/Browser is ${value}`);
+      check = ({ deviceType, os, browser }) =>
+        deviceType !== value && os !== value && browser !== value ? differs : matches;
+      break;
+    }
+    case 'in': {
+      const allowed = toSet(value);
+      const inList = outcome(true, 'Device/OS/Browser in allowed list');
+      const notInList = outcome(false, 'Device/OS/Browser not in allowed list');
+      check = ({ deviceType, os, browser }) =>
+        allowed !== null && (allowed.has(deviceType) || allowed.has(os) || allowed.has(browser))
+          ? inList
+          : notInList;
+      break;
+    }
+    default:
+      check = () => UNKNOWN_OPERATOR;
   }
 
-  const parser = new UAParser(userAgent);
-  const device = parser.getDevice();
-  const os = parser.getOS();
-  const browser = parser.getBrowser();
+  return (context, resolved) => {
+    const agent = resolved.agent();
+    return agent ? check(agent) : NO_USER_AGENT;
+  };
+}
 
-  const deviceType = device.type || 'desktop';
+function compilePercentageRule(operator, value) {
+  let check;
 
   switch (operator) {
-    case 'is':
-      if (deviceType === value || os.name === value || browser.name === value) {
-        return { passed: true, reason: `Device/OS/Browser matches ${value}` };
-      }
-      return { passed: false, reason: `Device/OS/Browser does not match ${value}` };
-    case 'is_not':
-      if (deviceType !== value && os.name !== value && browser.name !== value) {
-        return { passed: true, reason: `Device/OS/Browser is not ${value}` };
-      }
-      return { passed: false, reason: `Device/OS/Browser is ${value}` };
-    case 'in':
-      if (Array.isArray(value) && (value.includes(deviceType) || value.includes(os.name) || value.includes(browser.name))) {
-        return { passed: true, reason: 'Device/OS/Browser in allowed list' };
-      }
-      return { passed: false, reason: 'Device/OS/Browser not in allowed list' };
+    case 'less_than': {
+      const inRollout = outcome(true, `User in ${value}% rollout`);
+      const outOfRollout = outcome(false, `User not in ${value}% rollout`);
+      check = (percentage) => percentage <= value ? inRollout : outOfRollout;
+      break;
+    }
+    case 'greater_than':
+      check = (percentage) => percentage > value
+        ? { passed: true, reason: `User percentage ${percentage} > ${value}` }
+        : { passed: false, reason: `User percentage ${percentage} <= ${value}` };
+      break;
     default:
-      return { passed: true, reason: 'Unknown operator' };
+      check = () => UNKNOWN_OPERATOR;
   }
-}
 
-function evaluatePercentageRule(operator, value, context) {
-  const userId = context?.userId || context?.sessionId;
-  if (!userId) {
-    return { passed: false, reason: 'No user/session ID provided' };
-  }
+  return (context) => {
+    const userId = context?.userId || context?.sessionId;
+    if (!userId) {
+      return NO_USER_OR_SESSION;
+    }
+
+    // Consistent hash-based percentage
+    return check((simpleHash(userId) % 100) + 1);
+  };
+}
 
-  // Consistent hash-based percentage
-  const hash = simpleHash(userId);
-  const percentage = (hash % 100) + 1;
+function compileUserRule(operator, value) {
+  const users = toSet(value);
+  let check;
 
   switch (operator) {
-    case 'less_than':
-      if (percentage <= value) {
-        return { passed: true, reason: `User in ${value}% rollout` };
-      }
-      return { passed: false, reason: `User not in ${value}% rollout` };
-    case 'greater_than':
-      if (percentage > value) {
-        return { passed: true, reason: `User percentage ${percentage} > ${value}` };
-      }
-      return { passed: false, reason: `User percentage ${percentage} <= ${value}` };
+    case 'in': {
+      const listed = outcome(true, 'User in whitelist');
+      const unlisted = outcome(false, 'User not in whitelist');
+      check = (userId) => users !== null && users.has(userId) ? listed : unlisted;
+      break;
+    }
+    case 'not_in': {
+      const unlisted = outcome(true, 'User not in blacklist');
+      const listed = outcome(false, 'User in blacklist');
+      check = (userId) => users !== null && !users.has(userId) ? unlisted : listed;
+      break;
+    }
     default:
-      return { passed: true, reason: 'Unknown operator' };
+      check = () => UNKNOWN_OPERATOR;
   }
+
+  return (context) => {
+    const userId = context?.userId;
+    if (!userId) {
+      return NO_USER;
+    }
+    return check(userId);
+  };
 }
 
-function evaluateUserRule(operator, value, context) {
-  const userId = context?.userId;
-  if (!userId) {
-    return { passed: false, reason: 'No user ID provided' };
-  }
+// Membership in any of one or more segments (value: segment ID or array of
+// IDs). Members are read from the shared segment index at evaluation time.
+function compileSegmentRule(operator, value) {
+  const segmentIds = Array.isArray(value) ? value : [value];
+  const inSegment = (userId) => segmentIds.some((segmentId) => getSegmentMembers(segmentId)?.has(userId));
+  let check;
 
   switch (operator) {
-    case 'in':
-      if (Array.isArray(value) && value.includes(userId)) {
-        return { passed: true, reason: 'User in whitelist' };
-      }
-      return { passed: false, reason: 'User not in whitelist' };
-    case 'not_in':
-      if (Array.isArray(value) && !value.includes(userId)) {
-        return { passed: true, reason: 'User not in blacklist' };
-      }
-      return { passed: false, reason: 'User in blacklist' };
+    case 'in': {
+      const member = outcome(true, 'User in segment');
+      const nonMember = outcome(false, 'User not in segment');
+      check = (userId) => inSegment(userId) ? member : nonMember;
+      break;
+    }
+    case 'not_in': {
+      const nonMember = outcome(true, 'User not in segment');
+      const member = outcome(false, 'User in segment');
+      check = (userId) => inSegment(userId) ? member : nonMember;
+      break;
+    }
     default:
-      return { passed: true, reason: 'Unknown operator' };
+      check = () => UNKNOWN_OPERATOR;
   }
+
+  return (context) => {
+    const userId = context?.userId;
+    if (!userId) {
+      return NO_USER;
+    }
+    return check(userId);
+  };
 }
 
-function evaluateCustomRule(rule, context) {
+function compileCustomRule(rule) {
   const { field, operator, value } = rule;
-  const contextValue = context?.[field];
-
-  if (contextValue === undefined) {
-    return { passed: false, reason: `Field ${field} not found in context` };
-  }
+  const missing = outcome(false, `Field ${field} not found in context`);
+  let check;
 
   switch (operator) {
-    case 'equals':
-      return {
-        passed: contextValue === value,
-        reason: contextValue === value ? 'Values match' : 'Values do not match'
-      };
-    case 'not_equals':
-      return {
-        passed: contextValue !== value,
-        reason: contextValue !== value ? 'Values differ' : 'Values are equal'
-      };
-    case 'contains':
-      return {
-        passed: String(contextValue).includes(value),
-        reason: String(contextValue).includes(value) ? 'Contains value' : 'Does not contain value'
-      };
-    case 'greater_than':
-      return {
-        passed: contextValue > value,
-        reason: contextValue > value ? 'Greater than' : 'Not greater than'
-      };
-    case 'less_than':
-      return {
-        passed: contextValue < value,
-        reason: contextValue < value ? 'Less than' : 'Not less than'
-      };
+    case 'equals': {
+      const match = outcome(true, 'Values match');
+      const mismatch = outcome(false, 'Values do not match');
+      check = (contextValue) => contextValue === value ? match : mismatch;
+      break;
+    }
+    case 'not_equals': {
+      const differ = outcome(true, 'Values differ');
+      const equal = outcome(false, 'Values are equal');
+      check = (contextValue) => contextValue !== value ? differ : equal;
+      break;
+    }
+    case 'contains': {
+      const contains = outcome(true, 'Contains value');
+      const absent = outcome(false, 'Does not contain value');
+      check = (contextValue) => String(contextValue).includes(value) ? contains : absent;
+      break;
+    }
+    case 'greater_than': {
+      const greater = outcome(true, 'Greater than');
+      const notGreater = outcome(false, 'Not greater than');
+      check = (contextValue) => contextValue > value ? greater : notGreater;
+      break;
+    }
+    case 'less_than': {
+      const less = outcome(true, 'Less than');
+      const notLess = outcome(false, 'Not less than');
+      check = (contextValue) => contextValue < value ? less : notLess;
+      break;
+    }
     default:
-      return { passed: true, reason: 'Unknown operator' };
+      check = () => UNKNOWN_OPERATOR;
   }
+
+  return (context) => {
+    const contextValue = context?.[field];
+    if (contextValue === undefined) {
+      return missing;
+    }
+    return check(contextValue);
+  };
 }
 
 function simpleHash(str) {
@@ -191,4 +327,4 @@ function simpleHash(str) {
     hash = hash & hash;
   }
   return Math.abs(hash);
-}
\ No newline at end of file
+}
@@ -0,0 +1,100 @@
+import pool from '../config/database.js';
+import { getRedisClient } from '../config/redis.js';
+
+// Segment membership index. Each segment's member IDs are kept in Postgres
+// (segment_members) and loaded once per process into a Set shared by every
+// flag whose rules reference the segment. A per-segment version counter in
+// Redis, bumped on each membership change, tells every node when to reload.
+const membership = new Map();
+
+function versionKey(segmentId) {
+  return `segment:version:${segmentId}`;
+}
+
+// Members of a loaded segment, or undefined. Synchronous, for compiled rule
+// plans; prepareSegments() must have run for the flags being evaluated.
+export function getSegmentMembers(segmentId) {
+  return membership.get(segmentId)?.members;
+}
+
+// IDs of the segments referenced by the rules of some flags
+export function referencedSegments(flags) {
+  const segmentIds = new Set();
+  for (const flag of flags) {
+    for (const rule of flag.rules || []) {
+      if (rule.type !== 'segment') {
+        continue;
+      }
+      for (const segmentId of Array.isArray(rule.value) ? rule.value : [rule.value]) {
+        if (typeof segmentId === 'string') {
+          segmentIds.add(segmentId);
+        }
+      }
+    }
+  }
+  return [...segmentIds];
+}
+
+// Make sure the segments referenced by some flags are loaded and current.
+// Costs one MGET of versions; only changed segments are reloaded.
+export async function prepareSegments(flags) {
+  const segmentIds = referencedSegments(flags);
+  if (segmentIds.length === 0) {
+    return;
+  }
+
+  const versions = await getRedisClient().mGet(segmentIds.map(versionKey));
+  await Promise.all(segmentIds.map((segmentId, i) => {
+    // null until the segment's members are first changed
+    const version = versions[i];
+    const entry = membership.get(segmentId);
+    if (entry && entry.version === version) {
+      return entry.loading;
+    }
+    return loadSegment(segmentId, version);
+  }));
+}
+
+function loadSegment(segmentId, version) {
+  const entry = { version, members: membership.get(segmentId)?.members };
+  entry.loading = pool
+    .query('SELECT member_id FROM segment_members WHERE segment_id = $1', [segmentId])
+    .then((result) => {
+      entry.members = new Set(result.rows.map((row) => row.member_id));
+    })
+    .catch((error) => {
+      // Retry on the next evaluation
+      if (membership.get(segmentId) === entry) {
+        membership.delete(segmentId);
+      }
+      throw error;
+    });
+  membership.set(segmentId, entry);
+  return entry.loading;
+}
+
+export async function getSegmentVersion(segmentId) {
+  const redis = getRedisClient();
+  const key = versionKey(segmentId);
+
+  const version = await redis.get(key);
+  if (version !== null) {
+    return version;
+  }
+
+  await redis.set(key, String(Date.now()), { NX: true });
+  return redis.get(key);
+}
+
+// Record a membership change so every node reloads the segment
+export async function bumpSegmentVersion(segmentId) {
+  const redis = getRedisClient();
+  const key = versionKey(segmentId);
+
+  await redis.set(key, String(Date.now()), { NX: true });
+  return String(await redis.incr(key));
+}
+
+export function forgetSegment(segmentId) {
+  membership.delete(segmentId);
+}
@@ -1,17 +1,42 @@
+import { getRedisPubClient, getRedisSubClient } from '../config/redis.js';
+
+// Flag updates are published on one Redis channel per environment. Every
+// node, including the publisher, relays them to its own WebSocket clients and
+// gRPC watchers, so a change reaches clients connected to any replica.
+const FLAG_UPDATE_CHANNEL = 'flags:updates:';
+
 let wss;
-const clients = new Set();
+// WebSocket -> subscription filter; an empty set matches everything
+const clients = new Map();
+const flagUpdateListeners = new Set();
+let relaying = false;
 
 export function setupWebSocket(websocketServer) {
   wss = websocketServer;
 
-  wss.on('connection', (ws) => {
+  wss.on('connection', (ws, req) => {
     console.log('New WebSocket client connected');
-    clients.add(ws);
+
+    // Initial subscription from the query string:
+    // /ws?environments=production,staging&flagIds=flag-1,flag-2
+    const query = new URL(req.url, 'http://localhost').searchParams;
+    clients.set(ws, toSubscription(query.get('environments'), query.get('flagIds')));
 
     ws.on('message', (message) => {
       try {
         const data = JSON.parse(message);
-        console.log('Received:', data);
+        if (data.type === 'subscribe') {
+          const subscription = toSubscription(data.environments, data.flagIds);
+          clients.set(ws, subscription);
+          ws.send(JSON.stringify({
+            type: 'subscribed',
+            environments: [...subscription.environments],
+            flagIds: [...subscription.flagIds],
+            timestamp: new Date().toISOString()
+          }));
+        } else {
+          console.log('Received:', data);
+        }
       } catch (error) {
         console.error('Invalid WebSocket message:', error);
       }
@@ -36,19 +61,63 @@ export function setupWebSocket(websocketServer) {
   });
 }
 
-export function broadcastFlagUpdate(action, flag) {
+// Relay flag updates published by any node. Until this has run, updates are
+// delivered to this node's clients only.
+export async function startFlagUpdateRelay() {
+  const subClient = getRedisSubClient();
+  await subClient.pSubscribe(`${FLAG_UPDATE_CHANNEL}*`, (message) => {
+    try {
+      const { action, flag, timestamp } = JSON.parse(message);
+      deliverFlagUpdate(action, flag, timestamp);
+    } catch (error) {
+      console.error('Invalid flag update message:', error);
+    }
+  });
+  relaying = true;
+}
+
+export function subscribeFlagUpdates(listener) {
+  flagUpdateListeners.add(listener);
+  return () => flagUpdateListeners.delete(listener);
+}
+
+export async function broadcastFlagUpdate(action, flag) {
+  const timestamp = new Date().toISOString();
+
+  if (relaying) {
+    try {
+      const channel = `${FLAG_UPDATE_CHANNEL}${flag.environment}`;
+      await getRedisPubClient().publish(channel, JSON.stringify({ action, flag, timestamp }));
+      return;
+    } catch (error) {
+      console.error('Failed to publish flag update, delivering locally:', error);
+    }
+  }
+
+  deliverFlagUpdate(action, flag, timestamp);
+}
+
+function deliverFlagUpdate(action, flag, timestamp) {
   const message = JSON.stringify({
     type: 'flag_update',
     action,
     flag,
-    timestamp: new Date().toISOString()
+    timestamp
   });
 
-  clients.forEach((client) => {
-    if (client.readyState === 1) { // OPEN
+  clients.forEach((subscription, client) => {
+    if (client.readyState === 1 && matches(subscription, flag)) { // OPEN
       client.send(message);
     }
   });
+
+  flagUpdateListeners.forEach((listener) => {
+    try {
+      listener(action, flag, timestamp);
+    } catch (error) {
+      console.error('Flag update listener error:', error);
+    }
+  });
 }
 
 export function broadcastMessage(type, data) {
@@ -58,9 +127,27 @@ export function broadcastMessage(type, data) {
     timestamp: new Date().toISOString()
   });
 
-  clients.forEach((client) => {
+  clients.forEach((subscription, client) => {
     if (client.readyState === 1) {
       client.send(message);
     }
   });
-}
\ No newline at end of file
+}
+
+// Accepts arrays or comma-separated strings
+function toSubscription(environments, flagIds) {
+  return {
+    environments: toSet(environments),
+    flagIds: toSet(flagIds)
+  };
+}
+
+function toSet(value) {
+  const items = Array.isArray(value) ? value : String(value ?? '').split(',');
+  return new Set(items.map((item) => String(item).trim()).filter(Boolean));
+}
+
+function matches({ environments, flagIds }, flag) {
+  return (environments.size === 0 || environments.has(flag.environment))
+    && (flagIds.size === 0 || flagIds.has(flag.id));
+}
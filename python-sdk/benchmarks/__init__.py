@@ -0,0 +1,10 @@
+"""
+Benchmark suite for the Python SDK.
+
+Runs the REST, WebSocket and gRPC clients against local stand-in
+servers, and the local evaluators directly, and writes latency percentiles
+and throughput as JSON so results can be compared across releases::
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare baseline.json
+"""
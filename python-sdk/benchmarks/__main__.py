@@ -0,0 +1,172 @@
+"""
+Run the SDK benchmarks against local stand-in servers.
+
+Results are written as JSON: one entry per benchmark and parameter
+combination, with throughput and latency percentiles. ``--compare`` prints
+the change against an earlier results file, and ``--max-regression`` turns
+the comparison into a pass/fail check.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .protos import DEFAULT_PROTO, load_protos
+
+SCHEMA_VERSION = 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    suites = args.suites.split(",")
+    grpc_unavailable = load_protos(args.proto) if "grpc" in suites else None
+    if grpc_unavailable:
+        print(f"skipping grpc: {grpc_unavailable}", file=sys.stderr)
+        suites.remove("grpc")
+
+    # Imported after load_protos, which must precede the SDK's gRPC modules
+    import feature_flag_client
+    from .suites import SUITES, Config
+
+    unknown = [name for name in suites if name not in SUITES]
+    if unknown:
+        print(f"error: unknown suites: {', '.join(unknown)} (choose from {', '.join(SUITES)})", file=sys.stderr)
+        return 2
+
+    config = Config(
+        concurrency=_int_list(args.concurrency),
+        flag_counts=_int_list(args.flags),
+        rule_counts=_int_list(args.rules),
+        users=args.users,
+        duration=args.duration,
+        warmup=args.warmup,
+        proto=args.proto,
+    )
+
+    results = []
+    for name in suites:
+        for result in SUITES[name](config):
+            result = {"suite": name, **result}
+            results.append(result)
+            print(_describe(result), file=sys.stderr)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "label": args.label,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": _environment(feature_flag_client.__version__),
+        "config": config._asdict(),
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = _compare(json.load(baseline), report, args.max_regression)
+        if regressions:
+            print(f"{regressions} benchmarks regressed by more than {args.max_regression}%", file=sys.stderr)
+            return 1
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", default="rest,grpc,websocket,local", help="comma-separated suites to run")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated threads/tasks in flight")
+    parser.add_argument("--flags", default="10,100", help="comma-separated flag counts")
+    parser.add_argument("--rules", default="1,4,7", help="comma-separated rules per flag")
+    parser.add_argument("--users", type=int, default=50000, help="users per local.bulk_users pass")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds measured per benchmark")
+    parser.add_argument("--warmup", type=float, default=0.25, help="seconds run before measuring")
+    parser.add_argument("-o", "--output", default="benchmark-results.json", help="results file, or - for stdout")
+    parser.add_argument("--label", help="name recorded with the results, e.g. a release")
+    parser.add_argument("--proto", default=DEFAULT_PROTO, help="feature_flag.proto for the gRPC suite")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="with --compare, fail if any throughput dropped by more than this percentage",
+    )
+    return parser
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _environment(sdk_version: str) -> Dict[str, Any]:
+    environment = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "sdk_version": sdk_version,
+    }
+    for package in ("requests", "grpc", "websocket", "numpy"):
+        try:
+            environment[package] = __import__(package).__version__
+        except (ImportError, AttributeError):
+            environment[package] = None
+    return environment
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+    return result["benchmark"], tuple(sorted(result["params"].items()))
+
+
+def _describe(result: Dict[str, Any]) -> str:
+    params = " ".join(f"{name}={value}" for name, value in result["params"].items())
+    latency = result["latency_ms"] or {}
+    return (
+        f"{result['benchmark']} {params}: {result['throughput_per_s']:.0f} ops/s, "
+        f"p50 {latency.get('p50', float('nan')):.3f} ms, p99 {latency.get('p99', float('nan')):.3f} ms, "
+        f"{result['errors']} errors"
+    )
+
+
+def _compare(baseline: Dict[str, Any], report: Dict[str, Any], max_regression: Optional[float]) -> int:
+    """Print throughput and p99 changes per benchmark; returns how many regressed past the limit."""
+    previous = {_key(result): result for result in baseline.get("results", [])}
+    regressions = 0
+    print(f"compared with {baseline.get('label') or 'baseline'} ({baseline.get('created_at')}):", file=sys.stderr)
+    for result in report["results"]:
+        before = previous.get(_key(result))
+        if before is None or not before["throughput_per_s"]:
+            continue
+        throughput = _change(before["throughput_per_s"], result["throughput_per_s"])
+        p99 = _change(
+            (before["latency_ms"] or {}).get("p99"), (result["latency_ms"] or {}).get("p99")
+        )
+        regressed = max_regression is not None and throughput < -max_regression
+        regressions += regressed
+        params = " ".join(f"{name}={value}" for name, value in result["params"].items())
+        print(
+            f"  {'!' if regressed else ' '} {result['benchmark']} {params}: "
+            f"throughput {throughput:+.1f}%, p99 {p99:+.1f}%",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def _change(before: Optional[float], after: Optional[float]) -> float:
+    if not before or after is None:
+        return float("nan")
+    return (after - before) / before * 100
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Run a mock server in a child process, so it does not share the measured client's GIL."""
+
+import multiprocessing
+from typing import Any, Optional
+
+
+class ServerProcess:
+    """
+    Proxy for a ``MockApiServer`` or ``MockGrpcServer`` living in a child process.
+
+    Method calls (``set_flags``, ``broadcast``, ``wait_for_clients``) are
+    forwarded over a pipe and block until the child answers.
+    """
+
+    def __init__(self, kind: str, *args: Any, proto_path: Optional[str] = None, **kwargs: Any):
+        """
+        Initialize the proxy.
+
+        Args:
+            kind: ``api`` for MockApiServer, ``grpc`` for MockGrpcServer
+            *args: Server constructor arguments
+            proto_path: feature_flag.proto, compiled in the child for ``grpc``
+            **kwargs: Server constructor keyword arguments
+        """
+        self.kind = kind
+        self._args = args
+        self._kwargs = kwargs
+        self._proto_path = proto_path
+        self._process = None
+        self._connection = None
+
+    def start(self) -> "ServerProcess":
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            args=(child, self.kind, self._args, self._kwargs, self._proto_path),
+            daemon=True,
+        )
+        self._process.start()
+        child.close()
+        self.address = self._receive()
+        return self
+
+    def stop(self):
+        if self._process is None:
+            return
+        try:
+            self._call("stop")
+        finally:
+            self._process.join(5)
+            if self._process.is_alive():
+                self._process.kill()
+            self._connection.close()
+            self._process = None
+
+    @property
+    def host(self) -> str:
+        return self.address["host"]
+
+    @property
+    def port(self) -> int:
+        return self.address["port"]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
+
+    def _call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        self._connection.send((name, args, kwargs))
+        return self._receive()
+
+    def _receive(self) -> Any:
+        ok, value = self._connection.recv()
+        if not ok:
+            raise RuntimeError(f"{self.kind} server process: {value}")
+        return value
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def _serve(connection, kind: str, args, kwargs, proto_path: Optional[str]):
+    """Child process: start the server, then execute forwarded calls until ``stop``."""
+    try:
+        if kind == "grpc":
+            from .protos import load_protos
+
+            error = load_protos(proto_path) if proto_path else None
+            if error:
+                raise ImportError(error)
+        # Imported only now, after the protobuf modules are in place
+        from .servers import MockApiServer, MockGrpcServer
+
+        server = (MockGrpcServer if kind == "grpc" else MockApiServer)(*args, **kwargs).start()
+    except Exception as e:
+        connection.send((False, repr(e)))
+        return
+    connection.send((True, {"host": server.host, "port": server.port}))
+
+    while True:
+        name, call_args, call_kwargs = connection.recv()
+        try:
+            result = getattr(server, name)(*call_args, **call_kwargs)
+        except Exception as e:
+            connection.send((False, repr(e)))
+            continue
+        connection.send((True, result))
+        if name == "stop":
+            return
@@ -0,0 +1,62 @@
+"""Load the gRPC modules built from ``feature_flag.proto`` for the benchmarks."""
+
+import importlib.util
+import os
+import sys
+import tempfile
+from typing import Optional
+
+DEFAULT_PROTO = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "grpc", "feature_flag.proto"
+))
+
+
+def load_protos(proto_path: str = DEFAULT_PROTO) -> Optional[str]:
+    """
+    Make ``feature_flag_client.feature_flag_pb2`` and ``_pb2_grpc`` importable.
+
+    Modules already generated into the package are used as they are.
+    Otherwise they are compiled from the proto into a temporary directory
+    with grpcio-tools and registered under the package, so the SDK's gRPC
+    clients and the mock server use the same code. Must run before
+    ``feature_flag_client`` is imported.
+
+    Args:
+        proto_path: Path of ``feature_flag.proto``
+
+    Returns:
+        None on success, otherwise why the gRPC benchmarks cannot run
+    """
+    package = importlib.util.find_spec("feature_flag_client")
+    if package is None:
+        return "feature_flag_client is not importable"
+    package_dir = os.path.dirname(package.origin)
+    if os.path.exists(os.path.join(package_dir, "feature_flag_pb2.py")):
+        return None
+
+    try:
+        from grpc_tools import protoc
+    except ImportError:
+        return "grpcio-tools is not installed"
+    if not os.path.exists(proto_path):
+        return f"{proto_path} not found"
+
+    output_dir = tempfile.mkdtemp(prefix="feature_flag_pb2_")
+    status = protoc.main([
+        "grpc_tools.protoc",
+        f"-I{os.path.dirname(os.path.abspath(proto_path))}",
+        f"--python_out={output_dir}",
+        f"--grpc_python_out={output_dir}",
+        os.path.basename(proto_path),
+    ])
+    if status != 0:
+        return f"protoc failed with status {status}"
+
+    # The generated _grpc module imports feature_flag_pb2 as a top-level module
+    for name in ("feature_flag_pb2", "feature_flag_pb2_grpc"):
+        spec = importlib.util.spec_from_file_location(name, os.path.join(output_dir, f"{name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        sys.modules[f"feature_flag_client.{name}"] = module
+        spec.loader.exec_module(module)
+    return None
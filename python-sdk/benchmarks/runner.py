@@ -0,0 +1,145 @@
+"""Closed-loop load generation and latency statistics."""
+
+import asyncio
+import itertools
+import math
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, items_per_op: int = 1) -> Dict[str, Any]:
+    """
+    Summarize one benchmark run.
+
+    Args:
+        latencies: Seconds taken by each successful operation
+        errors: Operations that raised
+        elapsed: Wall-clock seconds of the measured window
+        items_per_op: Flags or users handled per operation, for item throughput
+
+    Returns:
+        Dictionary with operation counts, throughput and latency percentiles
+        in milliseconds
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    throughput = count / elapsed if elapsed > 0 else 0.0
+    summary: Dict[str, Any] = {
+        "operations": count,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_per_s": round(throughput, 2),
+        "items_per_op": items_per_op,
+        "items_per_s": round(throughput * items_per_op, 2),
+        "latency_ms": None,
+    }
+    if count:
+        summary["latency_ms"] = {
+            "min": _ms(ordered[0]),
+            "mean": _ms(sum(ordered) / count),
+            "p50": _ms(_percentile(ordered, 50)),
+            "p90": _ms(_percentile(ordered, 90)),
+            "p99": _ms(_percentile(ordered, 99)),
+            "p999": _ms(_percentile(ordered, 99.9)),
+            "max": _ms(ordered[-1]),
+        }
+    return summary
+
+
+def run_threads(
+    operation: Callable[[int], Any],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    items_per_op: int = 1,
+) -> Dict[str, Any]:
+    """
+    Call ``operation`` back to back from ``concurrency`` threads.
+
+    Each thread starts its next call as soon as the previous one returns.
+    Calls started during the warm-up are not measured.
+
+    Args:
+        operation: Function receiving the call's sequence number
+        concurrency: Number of threads
+        duration: Seconds measured after the warm-up
+        warmup: Seconds run before measuring
+        items_per_op: Flags or users handled per call
+
+    Returns:
+        The run's summary, see ``summarize``
+    """
+    sequence = itertools.count()
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+    samples: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def worker(slot: int):
+        latencies = samples[slot]
+        while True:
+            started = time.perf_counter()
+            if started >= deadline:
+                return
+            try:
+                operation(next(sequence))
+            except Exception:
+                if started >= measure_from:
+                    errors[slot] += 1
+                continue
+            if started >= measure_from:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker, args=(slot,), daemon=True) for slot in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - measure_from
+    return summarize(list(itertools.chain.from_iterable(samples)), sum(errors), elapsed, items_per_op)
+
+
+async def run_tasks(
+    operation: Callable[[int], Awaitable[Any]],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    items_per_op: int = 1,
+) -> Dict[str, Any]:
+    """Coroutine counterpart of ``run_threads``: ``concurrency`` tasks on the running loop."""
+    sequence = itertools.count()
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            started = time.perf_counter()
+            if started >= deadline:
+                return
+            try:
+                await operation(next(sequence))
+            except Exception:
+                if started >= measure_from:
+                    errors += 1
+                continue
+            if started >= measure_from:
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+    return summarize(latencies, errors, elapsed, items_per_op)
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 4)
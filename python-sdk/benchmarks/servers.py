@@ -0,0 +1,388 @@
+"""
+Stand-ins for the backend's REST, WebSocket and gRPC APIs.
+
+The servers evaluate flags with the SDK's ``RuleEngine``, which mirrors the
+backend's rule semantics, so request and response shapes and the per-request
+evaluation work match the real services. There is no database, cache or
+evaluation log behind them.
+"""
+
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import grpc
+
+from feature_flag_client.grpc_client import feature_flag_pb2, feature_flag_pb2_grpc
+from feature_flag_client.rule_engine import RuleEngine
+
+from .workloads import geo_lookup
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_WS_TEXT, _WS_CLOSE, _WS_PING, _WS_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+class _Flags:
+    """Flag set shared by the mock servers; replaced whole between benchmark cases."""
+
+    def __init__(self, flags: List[Dict[str, Any]], engine: Optional[RuleEngine]):
+        self.engine = engine or RuleEngine(geo_lookup=geo_lookup)
+        self.set(flags)
+
+    def set(self, flags: List[Dict[str, Any]]):
+        self.by_id = {flag["id"]: flag for flag in flags}
+        self.listing = json.dumps(flags).encode("utf-8")
+
+    def evaluate(self, flag_id: str, context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        flag = self.by_id.get(flag_id)
+        if flag is None:
+            return None
+        return self.engine.evaluate(flag, context)
+
+
+class _WebSocketPeer:
+    """Server side of one WebSocket connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._lock = threading.Lock()
+
+    def send(self, opcode: int, payload: bytes) -> bool:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        try:
+            with self._lock:
+                self.connection.sendall(header + payload)
+            return True
+        except OSError:
+            return False
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle, the body waits for
+    # the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        flags: _Flags = self.server.flags
+        if path == "/ws":
+            self._serve_websocket()
+        elif path == "/api/flags":
+            self._send_body(200, flags.listing)
+        elif path.startswith("/api/flags/"):
+            flag = flags.by_id.get(path[len("/api/flags/"):])
+            if flag is None:
+                self._send_json(404, {"error": "Flag not found"})
+            else:
+                self._send_json(200, flag)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        flags: _Flags = self.server.flags
+        context = body.get("context") or {}
+
+        if path == "/api/evaluate":
+            result = flags.evaluate(body.get("flagId"), context)
+            if result is None:
+                self._send_json(404, {"error": "Flag not found"})
+            else:
+                self._send_json(200, result)
+        elif path == "/api/evaluate/bulk":
+            results = {}
+            for flag_id in body.get("flagIds") or []:
+                result = flags.evaluate(flag_id, context)
+                results[flag_id] = result if result is not None else {"enabled": False, "reason": "Flag not found"}
+            self._send_json(200, results)
+        elif path == "/api/evaluate/all":
+            self._send_json(200, {flag_id: flags.evaluate(flag_id, context) for flag_id in flags.by_id})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def _send_json(self, status: int, payload: Any):
+        self._send_body(status, json.dumps(payload).encode("utf-8"))
+
+    def _send_body(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_websocket(self):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key or self.headers.get("Upgrade", "").lower() != "websocket":
+            self._send_json(400, {"error": "WebSocket upgrade required"})
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+
+        peer = _WebSocketPeer(self.connection)
+        self.server.add_peer(peer)
+        try:
+            self._read_frames(peer)
+        finally:
+            self.server.remove_peer(peer)
+            self.close_connection = True
+
+    def _read_frames(self, peer: _WebSocketPeer):
+        """Answer pings and close frames; client messages are otherwise ignored."""
+        while True:
+            header = self.rfile.read(2)
+            if len(header) < 2:
+                return
+            opcode, length = header[0] & 0x0F, header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self.rfile.read(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self.rfile.read(8))[0]
+            mask = self.rfile.read(4) if header[1] & 0x80 else b""
+            payload = self.rfile.read(length)
+            if mask:
+                payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+
+            if opcode == _WS_CLOSE:
+                peer.send(_WS_CLOSE, payload[:2])
+                return
+            if opcode == _WS_PING:
+                peer.send(_WS_PONG, payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ApiHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, flags: _Flags):
+        self.flags = flags
+        self.peers: Set[_WebSocketPeer] = set()
+        self.peers_lock = threading.Lock()
+        self.peers_changed = threading.Condition(self.peers_lock)
+        super().__init__(address, _ApiHandler)
+
+    def add_peer(self, peer: _WebSocketPeer):
+        with self.peers_lock:
+            self.peers.add(peer)
+            self.peers_changed.notify_all()
+
+    def remove_peer(self, peer: _WebSocketPeer):
+        with self.peers_lock:
+            self.peers.discard(peer)
+            self.peers_changed.notify_all()
+
+
+class MockApiServer:
+    """Stand-in for the REST API (``/api``) and WebSocket endpoint (``/ws``)."""
+
+    def __init__(
+        self,
+        flags: List[Dict[str, Any]],
+        engine: Optional[RuleEngine] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            flags: Flags served and evaluated
+            engine: Rule engine used for evaluations
+            host: Address to bind
+            port: Port to listen on; 0 picks a free one
+        """
+        self.flags = _Flags(flags, engine)
+        self._server = _ApiHTTPServer((host, port), self.flags)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def start(self) -> "MockApiServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        with self._server.peers_lock:
+            peers = list(self._server.peers)
+        for peer in peers:
+            peer.send(_WS_CLOSE, struct.pack("!H", 1001))
+        self._server.server_close()
+
+    def set_flags(self, flags: List[Dict[str, Any]]):
+        """Replace the flag set."""
+        self.flags.set(flags)
+
+    def broadcast(self, message: Dict[str, Any]) -> int:
+        """
+        Send a message to every WebSocket client.
+
+        The message is stamped with ``sentAt`` (epoch seconds) just before it
+        is written, for measuring delivery latency from another process.
+
+        Returns:
+            Number of clients the message was written to
+        """
+        payload = json.dumps({**message, "sentAt": time.time()}).encode("utf-8")
+        with self._server.peers_lock:
+            peers = list(self._server.peers)
+        return sum(peer.send(_WS_TEXT, payload) for peer in peers)
+
+    def wait_for_clients(self, count: int, timeout: float = 10.0) -> bool:
+        """Block until exactly ``count`` WebSocket clients are connected."""
+        with self._server.peers_changed:
+            return self._server.peers_changed.wait_for(lambda: len(self._server.peers) == count, timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class MockGrpcServer:
+    """Stand-in for the gRPC ``FeatureFlagService``; needs the generated protobuf modules."""
+
+    def __init__(
+        self,
+        flags: List[Dict[str, Any]],
+        engine: Optional[RuleEngine] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_workers: int = 32,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            flags: Flags served and evaluated
+            engine: Rule engine used for evaluations
+            host: Address to bind
+            port: Port to listen on; 0 picks a free one
+            max_workers: Threads handling calls
+        """
+        if feature_flag_pb2 is None or feature_flag_pb2_grpc is None:
+            raise ImportError("gRPC protobuf files not found; see benchmarks.protos.load_protos")
+
+        self.flags = _Flags(flags, engine)
+        self.host = host
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+        feature_flag_pb2_grpc.add_FeatureFlagServiceServicer_to_server(_Servicer(self.flags), self._server)
+        self.port = self._server.add_insecure_port(f"{host}:{port}")
+
+    def start(self) -> "MockGrpcServer":
+        self._server.start()
+        return self
+
+    def stop(self):
+        self._server.stop(grace=None)
+
+    def set_flags(self, flags: List[Dict[str, Any]]):
+        """Replace the flag set."""
+        self.flags.set(flags)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class _Servicer:
+    """FeatureFlagService handlers over the shared flag set."""
+
+    def __init__(self, flags: _Flags):
+        self.flags = flags
+
+    def EvaluateFlag(self, request, context):
+        result = self.flags.evaluate(request.flag_id, _context_from_proto(request.ctx))
+        if result is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Flag not found")
+        return feature_flag_pb2.EvaluateResponse(enabled=result["enabled"], reason=result["reason"])
+
+    def BulkEvaluate(self, request, context):
+        evaluation_context = _context_from_proto(request.ctx)
+        response = feature_flag_pb2.BulkEvaluateResponse()
+        for flag_id in request.flag_ids:
+            result = self.flags.evaluate(flag_id, evaluation_context) or {"enabled": False, "reason": "Flag not found"}
+            response.results[flag_id].enabled = result["enabled"]
+            response.results[flag_id].reason = result["reason"]
+        return response
+
+    def EvaluateAll(self, request, context):
+        evaluation_context = _context_from_proto(request.ctx)
+        response = feature_flag_pb2.EvaluateAllResponse()
+        for flag_id in self.flags.by_id:
+            result = self.flags.evaluate(flag_id, evaluation_context)
+            response.results[flag_id].enabled = result["enabled"]
+            response.results[flag_id].reason = result["reason"]
+        return response
+
+    def GetFlag(self, request, context):
+        flag = self.flags.by_id.get(request.flag_id)
+        if flag is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Flag not found")
+        return feature_flag_pb2.FlagResponse(
+            id=flag["id"],
+            name=flag["name"],
+            description=flag.get("description") or "",
+            enabled=flag["enabled"],
+            environment=flag["environment"],
+            rules=json.dumps(flag["rules"]),
+            updated_at=flag.get("updated_at") or "",
+        )
+
+    def WatchFlags(self, request, context):
+        # Flag pushes are benchmarked over the WebSocket
+        return iter(())
+
+
+# EvaluationContext fields holding a context key, as set by the SDK's _build_context
+_TYPED_CONTEXT_FIELDS = (("userId", "user_id"), ("sessionId", "session_id"), ("ip", "ip"), ("userAgent", "user_agent"))
+
+
+def _context_from_proto(ctx) -> Dict[str, Any]:
+    """Convert an EvaluationContext message back to a context dict."""
+    context: Dict[str, Any] = {}
+    for key, field in _TYPED_CONTEXT_FIELDS:
+        value = getattr(ctx, field)
+        if value:
+            context[key] = value
+    for key, value in ctx.attributes.items():
+        kind = value.WhichOneof("kind")
+        if kind in (None, "null_value"):
+            context[key] = None
+        elif kind == "json_value":
+            context[key] = json.loads(value.json_value)
+        else:
+            context[key] = getattr(value, kind)
+    return context
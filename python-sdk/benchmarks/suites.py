@@ -0,0 +1,233 @@
+"""Benchmark suites: each yields one result per parameter combination."""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple
+
+from feature_flag_client import (
+    AsyncGrpcFeatureFlagClient,
+    FeatureFlagClient,
+    FlagStore,
+    GrpcFeatureFlagClient,
+    RuleEngine,
+    WebSocketClient,
+)
+from feature_flag_client.bulk_users import BulkUserEvaluator, np
+
+from .process import ServerProcess
+from .runner import run_tasks, run_threads, summarize
+from .workloads import geo_lookup, make_context, make_flags
+
+logger = logging.getLogger(__name__)
+
+# Distinct users cycled through, so per-user work is not cached away
+CONTEXTS = [make_context(i) for i in range(1024)]
+
+
+class Config(NamedTuple):
+    """Parameter grid and timing shared by every suite."""
+
+    concurrency: List[int]
+    flag_counts: List[int]
+    rule_counts: List[int]
+    users: int
+    duration: float
+    warmup: float
+    proto: str
+
+
+def rest_suite(config: Config) -> Iterator[Dict[str, Any]]:
+    """REST ``evaluate_flag`` and ``bulk_evaluate`` against the mock API."""
+    with ServerProcess("api", make_flags(1, 0)) as server:
+        client = FeatureFlagClient(server.base_url, pool_size=max(config.concurrency), max_retries=0)
+        try:
+            yield from _remote_cases("rest", server, client, config)
+        finally:
+            client.close()
+
+
+def grpc_suite(config: Config) -> Iterator[Dict[str, Any]]:
+    """gRPC ``EvaluateFlag`` and ``BulkEvaluate`` with the sync and asyncio clients."""
+    with ServerProcess(
+        "grpc", make_flags(1, 0), max_workers=max(config.concurrency), proto_path=config.proto
+    ) as server:
+        client = GrpcFeatureFlagClient(server.host, server.port)
+        client.connect()
+        try:
+            yield from _remote_cases("grpc", server, client, config)
+        finally:
+            client.disconnect()
+
+        for rules in config.rule_counts:
+            server.set_flags(make_flags(max(config.flag_counts), rules))
+            for concurrency in config.concurrency:
+                summary = asyncio.run(_run_aio(server, config, concurrency, lambda client, i: client.evaluate_flag(
+                    "bench-0", CONTEXTS[i % len(CONTEXTS)]["userId"], CONTEXTS[i % len(CONTEXTS)]
+                )))
+                yield _result("grpc_aio.evaluate_flag", summary, concurrency=concurrency, rules=rules)
+
+            for flags in config.flag_counts:
+                flag_ids = [f"bench-{i}" for i in range(flags)]
+                for concurrency in config.concurrency:
+                    summary = asyncio.run(_run_aio(server, config, concurrency, lambda client, i: client.evaluate_many(
+                        flag_ids, CONTEXTS[i % len(CONTEXTS)]["userId"], CONTEXTS[i % len(CONTEXTS)]
+                    ), items_per_op=flags))
+                    yield _result("grpc_aio.evaluate_many", summary, concurrency=concurrency, flags=flags, rules=rules)
+
+
+def websocket_suite(config: Config) -> Iterator[Dict[str, Any]]:
+    """Delivery latency of ``flag_update`` pushes, fanned out to a growing number of clients."""
+    flag = make_flags(1, max(config.rule_counts))[0]
+    with ServerProcess("api", [flag]) as server:
+        for clients in config.concurrency:
+            summary = _run_fanout(server, flag, clients, config)
+            yield _result("websocket.flag_update", summary, clients=clients, rules=max(config.rule_counts))
+
+
+def local_suite(config: Config) -> Iterator[Dict[str, Any]]:
+    """In-process evaluation: ``RuleEngine``, a synced ``FlagStore`` and ``BulkUserEvaluator``."""
+    engine = RuleEngine(geo_lookup=geo_lookup)
+    for rules in config.rule_counts:
+        flag = make_flags(1, rules)[0]
+        for concurrency in config.concurrency:
+            summary = run_threads(
+                lambda i: engine.evaluate(flag, CONTEXTS[i % len(CONTEXTS)]),
+                concurrency, config.duration, config.warmup,
+            )
+            yield _result("local.rule_engine", summary, concurrency=concurrency, rules=rules)
+
+    flags = max(config.flag_counts)
+    with ServerProcess("api", make_flags(flags, 0)) as server:
+        client = FeatureFlagClient(server.base_url)
+        store = FlagStore(client, ws_url=server.ws_url, engine=RuleEngine(geo_lookup=geo_lookup))
+        store.start()
+        try:
+            store.wait_until_ready(10)
+            for rules in config.rule_counts:
+                server.set_flags(make_flags(flags, rules))
+                store.refresh()
+                for concurrency in config.concurrency:
+                    summary = run_threads(
+                        lambda i: store.evaluate(f"bench-{i % flags}", CONTEXTS[i % len(CONTEXTS)]),
+                        concurrency, config.duration, config.warmup,
+                    )
+                    yield _result("local.flag_store", summary, concurrency=concurrency, flags=flags, rules=rules)
+        finally:
+            store.stop()
+            client.close()
+
+    if np is None:
+        logger.warning("NumPy is not installed; skipping local.bulk_users")
+        return
+    contexts = [make_context(i) for i in range(config.users)]
+    user_ids = [context["userId"] for context in contexts]
+    columns = {name: [context[name] for context in contexts] for name in contexts[0] if name != "userId"}
+    evaluator = BulkUserEvaluator(engine)
+    for rules in config.rule_counts:
+        flag = make_flags(1, rules)[0]
+        summary = run_threads(
+            lambda i: sum(len(chunk.user_ids) for chunk in evaluator.evaluate(flag, user_ids, columns)),
+            1, config.duration, config.warmup, items_per_op=config.users,
+        )
+        yield _result("local.bulk_users", summary, users=config.users, rules=rules)
+
+
+SUITES: Dict[str, Callable[[Config], Iterator[Dict[str, Any]]]] = {
+    "rest": rest_suite,
+    "grpc": grpc_suite,
+    "websocket": websocket_suite,
+    "local": local_suite,
+}
+
+
+def _remote_cases(transport: str, server, client, config: Config) -> Iterator[Dict[str, Any]]:
+    """``evaluate_flag`` and ``bulk_evaluate`` through a REST or sync gRPC client."""
+    for rules in config.rule_counts:
+        server.set_flags(make_flags(max(config.flag_counts), rules))
+        for concurrency in config.concurrency:
+            summary = run_threads(
+                lambda i: client.evaluate_flag(
+                    "bench-0", CONTEXTS[i % len(CONTEXTS)]["userId"], CONTEXTS[i % len(CONTEXTS)]
+                ),
+                concurrency, config.duration, config.warmup,
+            )
+            yield _result(f"{transport}.evaluate_flag", summary, concurrency=concurrency, rules=rules)
+
+        for flags in config.flag_counts:
+            flag_ids = [f"bench-{i}" for i in range(flags)]
+            for concurrency in config.concurrency:
+                summary = run_threads(
+                    lambda i: client.bulk_evaluate(
+                        flag_ids, CONTEXTS[i % len(CONTEXTS)]["userId"], CONTEXTS[i % len(CONTEXTS)]
+                    ),
+                    concurrency, config.duration, config.warmup, items_per_op=flags,
+                )
+                yield _result(
+                    f"{transport}.bulk_evaluate", summary, concurrency=concurrency, flags=flags, rules=rules
+                )
+
+
+async def _run_aio(server: ServerProcess, config: Config, concurrency: int, call, items_per_op: int = 1):
+    """Run ``call(client, i)`` on a fresh asyncio gRPC client; channels bind to the running loop."""
+    async with AsyncGrpcFeatureFlagClient(server.host, server.port) as client:
+        return await run_tasks(
+            lambda i: call(client, i), concurrency, config.duration, config.warmup, items_per_op=items_per_op
+        )
+
+
+def _run_fanout(server: ServerProcess, flag: Dict[str, Any], clients: int, config: Config) -> Dict[str, Any]:
+    """Broadcast updates one at a time, each once every client has received the previous one."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    delivered = threading.Event()
+    pending = [0]
+    measuring = [False]
+
+    def on_update(data: Dict[str, Any]):
+        latency = time.time() - data["sentAt"]
+        with lock:
+            if measuring[0]:
+                latencies.append(latency)
+            pending[0] -= 1
+            if pending[0] == 0:
+                delivered.set()
+
+    sockets = [WebSocketClient(server.ws_url) for _ in range(clients)]
+    for socket in sockets:
+        socket.on_flag_update(on_update)
+        socket.connect()
+    errors = 0
+    try:
+        if not server.wait_for_clients(clients):
+            raise RuntimeError(f"{clients} WebSocket clients did not connect")
+
+        measure_from = time.perf_counter() + config.warmup
+        deadline = measure_from + config.duration
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            with lock:
+                measuring[0] = now >= measure_from
+                pending[0] = clients
+                delivered.clear()
+            server.broadcast({
+                "type": "flag_update",
+                "action": "update",
+                "flag": flag,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+            if not delivered.wait(5):
+                errors += 1
+        elapsed = time.perf_counter() - measure_from
+    finally:
+        for socket in sockets:
+            socket.disconnect()
+        server.wait_for_clients(0)
+    return summarize(latencies, errors, elapsed)
+
+
+def _result(benchmark: str, summary: Dict[str, Any], **params: int) -> Dict[str, Any]:
+    return {"benchmark": benchmark, "params": params, **summary}
@@ -0,0 +1,66 @@
+"""Synthetic flags and contexts with a tunable number of rules."""
+
+from typing import Any, Dict, List
+
+# Rule types in the order they are added; every rule passes for the
+# generated contexts, so each evaluation runs the whole rule list.
+RULE_TEMPLATES: List[Dict[str, Any]] = [
+    {"type": "percentage", "operator": "less_than", "value": 100},
+    {"type": "custom", "field": "plan", "operator": "equals", "value": "premium"},
+    {"type": "user", "operator": "not_in", "value": [f"blocked-{i}" for i in range(1000)]},
+    {"type": "geo", "operator": "in", "value": ["US", "CA", "GB", "DE", "FR"]},
+    {"type": "device", "operator": "is_not", "value": "mobile"},
+    {"type": "custom", "field": "age", "operator": "greater_than", "value": 18},
+    {"type": "custom", "field": "email", "operator": "contains", "value": "@example.com"},
+]
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def make_rules(count: int) -> List[Dict[str, Any]]:
+    """Build ``count`` rules, cycling through RULE_TEMPLATES."""
+    return [dict(RULE_TEMPLATES[i % len(RULE_TEMPLATES)]) for i in range(count)]
+
+
+def make_flags(flag_count: int, rule_count: int, environment: str = "development") -> List[Dict[str, Any]]:
+    """
+    Build enabled flags shaped like the API's flag objects.
+
+    Args:
+        flag_count: Number of flags
+        rule_count: Rules per flag
+        environment: Environment of every flag
+
+    Returns:
+        List of flag dictionaries with IDs ``bench-0`` .. ``bench-{n-1}``
+    """
+    rules = make_rules(rule_count)
+    return [
+        {
+            "id": f"bench-{i}",
+            "name": f"bench-{i}",
+            "description": "Benchmark flag",
+            "enabled": True,
+            "environment": environment,
+            "rules": rules,
+            "updated_at": "2024-01-01T00:00:00.000Z",
+        }
+        for i in range(flag_count)
+    ]
+
+
+def make_context(index: int) -> Dict[str, Any]:
+    """Evaluation context of the ``index``-th synthetic user, passing every template rule."""
+    return {
+        "userId": f"user-{index}",
+        "ip": f"10.0.{(index >> 8) & 255}.{index & 255}",
+        "userAgent": USER_AGENT,
+        "plan": "premium",
+        "age": 30 + index % 40,
+        "email": f"user-{index}@example.com",
+    }
+
+
+def geo_lookup(ip: str) -> str:
+    """Constant geo resolver, so geo rules cost a rule check and not a database lookup."""
+    return "US"
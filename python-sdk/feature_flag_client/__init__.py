@@ -6,22 +6,58 @@ Supports REST API, WebSocket, and gRPC protocols.
 """
 
 from .client import FeatureFlagClient
+from .async_client import AsyncFeatureFlagClient
 from .grpc_client import GrpcFeatureFlagClient
+from .grpc_aio_client import AsyncGrpcFeatureFlagClient
 from .websocket_client import WebSocketClient
+from .rule_engine import RuleEngine, simple_hash
+from .flag_store import FlagStore
+from .cache import EvaluationCache
+from .transport import CircuitBreaker, CircuitOpenError
+from .metrics import SDKMetrics, start_http_server
+from .exposure import ExposureReporter
+from .snapshot import FlagSnapshot, SnapshotWriter, write_snapshot
+from .shared_store import SharedFlagStore, SharedFlagReader, SharedFlagWriter
+from .segments import SegmentIndex
+from .bulk_users import BulkUserEvaluator, simple_hash_array
 from .exceptions import (
     FeatureFlagError,
     FlagNotFoundError,
     EvaluationError,
     ConnectionError,
+    SnapshotError,
+    SegmentNotFoundError,
 )
 
 __version__ = "1.0.0"
 __all__ = [
     "FeatureFlagClient",
+    "AsyncFeatureFlagClient",
     "GrpcFeatureFlagClient",
+    "AsyncGrpcFeatureFlagClient",
     "WebSocketClient",
+    "RuleEngine",
+    "simple_hash",
+    "FlagStore",
+    "EvaluationCache",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "SDKMetrics",
+    "start_http_server",
+    "ExposureReporter",
+    "FlagSnapshot",
+    "SnapshotWriter",
+    "write_snapshot",
+    "SharedFlagStore",
+    "SharedFlagReader",
+    "SharedFlagWriter",
+    "SegmentIndex",
+    "BulkUserEvaluator",
+    "simple_hash_array",
     "FeatureFlagError",
     "FlagNotFoundError",
     "EvaluationError",
     "ConnectionError",
+    "SnapshotError",
+    "SegmentNotFoundError",
 ]
\ No newline at end of file
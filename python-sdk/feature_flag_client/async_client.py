@@ -0,0 +1,982 @@
+"""Asyncio REST API client for Feature Flag Management System."""
+
+import asyncio
+import contextlib
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Any, Optional, Type, Union
+from .cache import ETagMemo, EvaluationCache, context_digest
+from .client import _SEGMENT_DOWNLOAD_ATTEMPTS, _analytics_params, _audit_params
+from .exceptions import FeatureFlagError, FlagNotFoundError, EvaluationError, SegmentNotFoundError, SnapshotError
+from .metrics import SDKMetrics, timed_async
+from .rule_engine import RuleEngine
+from .snapshot import FlagSnapshot, SnapshotWriter
+from .transport import EVALUATION_PATHS, CircuitBreaker, CircuitOpenError, guarded_path
+
+try:
+    import aiohttp
+
+    # aiohttp reports timeouts as asyncio.TimeoutError, not ClientError
+    _REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError)
+except ImportError:
+    aiohttp = None
+    _REQUEST_ERRORS = ()
+
+
+class AsyncFeatureFlagClient:
+    """Asyncio client for interacting with Feature Flag Management System via REST API."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3001/api",
+        timeout: int = 10,
+        pool_size: int = 100,
+        keepalive_timeout: float = 30.0,
+        cache: Optional[EvaluationCache] = None,
+        bulk_chunk_size: int = 100,
+        metrics: Optional[SDKMetrics] = None,
+        circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+        default_values: Optional[Dict[str, bool]] = None,
+        snapshot_path: Optional[str] = None,
+        engine: Optional[RuleEngine] = None,
+    ):
+        """
+        Initialize the async Feature Flag client.
+
+        The underlying ``aiohttp.ClientSession`` is created lazily on first use
+        so the client can be constructed outside a running event loop.
+
+        Args:
+            base_url: Base URL of the Feature Flag API
+            timeout: Request timeout in seconds
+            pool_size: Maximum number of pooled connections
+            keepalive_timeout: Seconds an idle pooled connection is kept open
+            cache: Optional cache for evaluation results
+            bulk_chunk_size: Maximum number of flags per /evaluate/bulk request;
+                             longer bulk_evaluate lists are split into chunks
+                             sent concurrently
+            metrics: Registry recording request latency, errors and cache hits
+            circuit_breaker: Breaker guarding the evaluation endpoints
+                             (/evaluate, /evaluate/bulk, /evaluate/all);
+                             defaults to CircuitBreaker(), False disables it.
+                             While it is open, evaluations fail at once and
+                             evaluate_flag falls back to the snapshot or to
+                             the flag's default value
+            default_values: Flag ID -> enabled value returned by evaluate_flag
+                            when the API is unavailable
+            snapshot_path: File where the last good get_all_flags result is
+                           persisted, in the background and only when it
+                           changed; it is served when the API is unreachable
+            engine: Rule engine used to evaluate flags from the snapshot
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for AsyncFeatureFlagClient. Install it using:\n"
+                "pip install feature-flag-client[async]"
+            )
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache
+        self.bulk_chunk_size = bulk_chunk_size
+        self._bootstraps = ETagMemo()
+        if circuit_breaker is None or circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker: Optional[CircuitBreaker] = circuit_breaker or None
+        self.default_values = dict(default_values or {})
+        self.snapshot_path = snapshot_path
+        self.engine = engine or RuleEngine()
+        self._snapshot: Optional[FlagSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self.snapshot_writer = (
+            SnapshotWriter(snapshot_path, on_write=self._release_snapshot) if snapshot_path else None
+        )
+        self.metrics = metrics
+        if metrics is not None:
+            self._cache_hits = metrics.counter("cache_requests_total", result="hit")
+            self._cache_misses = metrics.counter("cache_requests_total", result="miss")
+        self.session = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Return the pooled HTTP session, creating it on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        not_found: Optional[str] = None,
+        not_found_error: Type[FeatureFlagError] = FlagNotFoundError,
+        **kwargs,
+    ) -> Any:
+        """
+        Send a request and decode the JSON response.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the base URL
+            not_found: Message for the error raised on a 404 response
+            not_found_error: Error raised on a 404 response
+
+        Returns:
+            Decoded JSON response body
+        """
+        async with self._send(method, path, **kwargs) as response:
+            if not_found and response.status == 404:
+                raise not_found_error(not_found)
+            response.raise_for_status()
+            return await response.json()
+
+    @contextlib.asynccontextmanager
+    async def _send(self, method: str, path: str, **kwargs) -> AsyncIterator["aiohttp.ClientResponse"]:
+        """Send a request, through the circuit breaker for the evaluation endpoints."""
+        breaker = self.circuit_breaker
+        if breaker is None or not guarded_path(path, EVALUATION_PATHS):
+            async with self._get_session().request(method, f"{self.base_url}{path}", **kwargs) as response:
+                yield response
+            return
+
+        if not breaker.allow_request():
+            raise CircuitOpenError("Circuit breaker is open; request not sent")
+        try:
+            async with self._get_session().request(method, f"{self.base_url}{path}", **kwargs) as response:
+                if response.status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                yield response
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            breaker.record_failure()
+            raise
+
+    @timed_async("rest")
+    async def get_all_flags(self, environment: str = "development") -> List[Dict[str, Any]]:
+        """
+        Get all feature flags for an environment.
+
+        Args:
+            environment: Environment name (development, staging, production)
+
+        Returns:
+            List of feature flags
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        try:
+            flags = await self._request("GET", "/flags", params={"environment": environment})
+        except _REQUEST_ERRORS as e:
+            snapshot = self.load_snapshot() if _is_unavailable(e) else None
+            if snapshot is not None and snapshot.environment == environment:
+                return snapshot.flags()
+            raise FeatureFlagError(f"Failed to get flags: {str(e)}")
+
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.submit(flags, environment)
+        return flags
+
+    @timed_async("rest")
+    async def get_flag_changes(
+        self, environment: str = "development", since: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the flags of an environment that changed after a version.
+
+        The flag set version is also the ETag of ``/flags``, so an unchanged
+        environment costs one 304 without a body.
+
+        Args:
+            environment: Environment name (development, staging, production)
+            since: Flag set version from a previous call; None for a full load
+
+        Returns:
+            None if nothing changed, otherwise a dictionary with the new
+            ``version``, ``full`` (True if ``flags`` is the complete set
+            rather than a delta), the changed ``flags`` and the ``deleted``
+            flag IDs
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        headers = {"If-None-Match": f'"{since}"'} if since else {}
+
+        try:
+            async with self._get_session().get(
+                f"{self.base_url}/flags",
+                params={"environment": environment, "since": since or 0},
+                headers=headers,
+            ) as response:
+                if response.status == 304:
+                    return None
+                response.raise_for_status()
+                return await response.json()
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get flag changes: {str(e)}")
+
+    @timed_async("rest")
+    async def get_flag(self, flag_id: str) -> Dict[str, Any]:
+        """
+        Get a specific feature flag by ID.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Feature flag details
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If the request fails
+        """
+        try:
+            return await self._request("GET", f"/flags/{flag_id}", not_found=f"Flag {flag_id} not found")
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get flag: {str(e)}")
+
+    @timed_async("rest")
+    async def create_flag(self, flag_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a new feature flag.
+
+        Args:
+            flag_data: Flag configuration
+
+        Returns:
+            Created flag details
+
+        Raises:
+            FeatureFlagError: If creation fails
+        """
+        try:
+            return await self._request("POST", "/flags", json=flag_data)
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to create flag: {str(e)}")
+
+    @timed_async("rest")
+    async def update_flag(self, flag_id: str, flag_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update an existing feature flag.
+
+        Args:
+            flag_id: Flag identifier
+            flag_data: Updated flag configuration
+
+        Returns:
+            Updated flag details
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If update fails
+        """
+        try:
+            return await self._request(
+                "PUT", f"/flags/{flag_id}", not_found=f"Flag {flag_id} not found", json=flag_data
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to update flag: {str(e)}")
+
+    @timed_async("rest")
+    async def delete_flag(self, flag_id: str) -> Dict[str, str]:
+        """
+        Delete a feature flag.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Deletion confirmation
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If deletion fails
+        """
+        try:
+            return await self._request("DELETE", f"/flags/{flag_id}", not_found=f"Flag {flag_id} not found")
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to delete flag: {str(e)}")
+
+    @timed_async("rest")
+    async def toggle_flag(self, flag_id: str) -> Dict[str, Any]:
+        """
+        Toggle a feature flag on/off.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Updated flag details
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If toggle fails
+        """
+        try:
+            return await self._request("PATCH", f"/flags/{flag_id}/toggle", not_found=f"Flag {flag_id} not found")
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to toggle flag: {str(e)}")
+
+    @timed_async("rest")
+    async def kill_switch(self, flag_id: str, reason: str) -> Dict[str, Any]:
+        """
+        Activate kill switch for a flag (emergency disable).
+
+        Args:
+            flag_id: Flag identifier
+            reason: Reason for kill switch activation
+
+        Returns:
+            Kill switch confirmation
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If kill switch fails
+        """
+        try:
+            return await self._request(
+                "POST",
+                f"/flags/{flag_id}/kill-switch",
+                not_found=f"Flag {flag_id} not found",
+                json={"reason": reason},
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to activate kill switch: {str(e)}")
+
+    @timed_async("rest")
+    async def evaluate_flag(
+        self,
+        flag_id: str,
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        default: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a feature flag for a user/context.
+
+        When the API is unavailable, or the circuit breaker is open, the flag
+        is evaluated from the snapshot if there is one, and otherwise
+        ``default`` is returned.
+
+        Args:
+            flag_id: Flag identifier
+            user_id: User identifier
+            context: Evaluation context (IP, device, custom fields)
+            default: Enabled value to fall back to; overrides default_values
+
+        Returns:
+            Evaluation result with enabled status and reason
+
+        Raises:
+            EvaluationError: If evaluation fails and there is no fallback
+        """
+        if self.cache is not None:
+            key = self.cache.make_key(flag_id, user_id, context)
+            cached = self.cache.get(key)
+            if self.metrics is not None:
+                (self._cache_misses if cached is None else self._cache_hits).inc()
+            if cached is not None:
+                return cached
+            version = self.cache.version(flag_id)
+
+        if default is None:
+            default = self.default_values.get(flag_id)
+        if self.circuit_breaker is not None and self.circuit_breaker.state == CircuitBreaker.OPEN:
+            fallback = self._fallback(flag_id, context, default)
+            if fallback:
+                return fallback
+
+        try:
+            result = await self._request(
+                "POST",
+                "/evaluate",
+                json={"flagId": flag_id, "userId": user_id, "context": context or {}},
+            )
+        except _REQUEST_ERRORS as e:
+            fallback = _is_unavailable(e) and self._fallback(flag_id, context, default)
+            if fallback:
+                return fallback
+            raise EvaluationError(f"Failed to evaluate flag: {str(e)}")
+
+        if self.cache is not None:
+            self.cache.set(key, result, version)
+        return result
+
+    @timed_async("rest")
+    async def bulk_evaluate(
+        self, flag_ids: List[str], user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate multiple flags at once.
+
+        Args:
+            flag_ids: List of flag identifiers
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            EvaluationError: If bulk evaluation fails
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = flag_ids
+        if self.cache is not None:
+            keys = {flag_id: self.cache.make_key(flag_id, user_id, context) for flag_id in flag_ids}
+            pending = []
+            for flag_id in flag_ids:
+                cached = self.cache.get(keys[flag_id])
+                if cached is not None:
+                    results[flag_id] = cached
+                else:
+                    pending.append(flag_id)
+            if self.metrics is not None:
+                self._cache_hits.inc(len(flag_ids) - len(pending))
+                self._cache_misses.inc(len(pending))
+            if not pending:
+                return results
+            versions = {flag_id: self.cache.version(flag_id) for flag_id in pending}
+
+        chunks = [
+            pending[start:start + self.bulk_chunk_size]
+            for start in range(0, len(pending), self.bulk_chunk_size)
+        ]
+        try:
+            responses = await asyncio.gather(
+                *(
+                    self._request(
+                        "POST",
+                        "/evaluate/bulk",
+                        json={"flagIds": chunk, "userId": user_id, "context": context or {}},
+                    )
+                    for chunk in chunks
+                )
+            )
+        except _REQUEST_ERRORS as e:
+            raise EvaluationError(f"Failed to bulk evaluate flags: {str(e)}")
+
+        fetched: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            fetched.update(response)
+        if self.cache is not None:
+            for flag_id, result in fetched.items():
+                # Lookup errors are transient and must not be cached
+                if flag_id in versions and "error" not in result:
+                    self.cache.set(keys[flag_id], result, versions[flag_id])
+        results.update(fetched)
+        return results
+
+    @timed_async("rest")
+    async def evaluate_all(
+        self,
+        environment: str = "development",
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate every flag of an environment for one user.
+
+        The last response per (environment, user, context) is remembered with
+        its ETag; repeating the call sends ``If-None-Match`` and an unchanged
+        flag set is answered with a 304 from memory.
+
+        Args:
+            environment: Environment name (development, staging, production)
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            EvaluationError: If evaluation fails
+        """
+        key = (environment, context_digest(user_id, context))
+        remembered = self._bootstraps.get(key)
+        headers = {"If-None-Match": remembered[0]} if remembered else {}
+
+        try:
+            async with self._send(
+                "POST",
+                "/evaluate/all",
+                json={"environment": environment, "userId": user_id, "context": context or {}},
+                headers=headers,
+            ) as response:
+                if response.status == 304 and remembered:
+                    return dict(remembered[1])
+                response.raise_for_status()
+                results = await response.json()
+                etag = response.headers.get("ETag")
+        except _REQUEST_ERRORS as e:
+            raise EvaluationError(f"Failed to evaluate flags: {str(e)}")
+
+        if etag:
+            self._bootstraps.set(key, etag, results)
+        return dict(results)
+
+    @timed_async("rest")
+    async def send_evaluation_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Report evaluations performed client-side.
+
+        Args:
+            events: Events with 'flagId', 'enabled', and optionally 'userId',
+                    'context' and 'timestamp' (epoch milliseconds)
+
+        Returns:
+            Counts of accepted and dropped events
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        try:
+            return await self._request("POST", "/evaluate/events", json={"events": events})
+        except (*_REQUEST_ERRORS, TypeError, ValueError) as e:
+            # TypeError / ValueError: a context value is not JSON serializable
+            raise FeatureFlagError(f"Failed to send evaluation events: {str(e)}")
+
+    @timed_async("rest")
+    async def get_all_segments(self) -> List[Dict[str, Any]]:
+        """
+        Get all segments.
+
+        Returns:
+            List of segments
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        try:
+            return await self._request("GET", "/segments")
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get segments: {str(e)}")
+
+    @timed_async("rest")
+    async def get_segment(self, segment_id: str) -> Dict[str, Any]:
+        """
+        Get a specific segment by ID.
+
+        Args:
+            segment_id: Segment identifier
+
+        Returns:
+            Segment details
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If the request fails
+        """
+        try:
+            return await self._request(
+                "GET",
+                f"/segments/{segment_id}",
+                not_found=f"Segment {segment_id} not found",
+                not_found_error=SegmentNotFoundError,
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get segment: {str(e)}")
+
+    @timed_async("rest")
+    async def create_segment(self, segment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a new segment.
+
+        Args:
+            segment_data: Segment name, description and conditions
+
+        Returns:
+            Created segment details
+
+        Raises:
+            FeatureFlagError: If creation fails
+        """
+        try:
+            return await self._request("POST", "/segments", json=segment_data)
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to create segment: {str(e)}")
+
+    @timed_async("rest")
+    async def update_segment(self, segment_id: str, segment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update an existing segment.
+
+        Args:
+            segment_id: Segment identifier
+            segment_data: Updated name, description and conditions
+
+        Returns:
+            Updated segment details
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If update fails
+        """
+        try:
+            return await self._request(
+                "PUT",
+                f"/segments/{segment_id}",
+                not_found=f"Segment {segment_id} not found",
+                not_found_error=SegmentNotFoundError,
+                json=segment_data,
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to update segment: {str(e)}")
+
+    @timed_async("rest")
+    async def delete_segment(self, segment_id: str) -> Dict[str, str]:
+        """
+        Delete a segment and its members.
+
+        Args:
+            segment_id: Segment identifier
+
+        Returns:
+            Deletion confirmation
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If deletion fails
+        """
+        try:
+            return await self._request(
+                "DELETE",
+                f"/segments/{segment_id}",
+                not_found=f"Segment {segment_id} not found",
+                not_found_error=SegmentNotFoundError,
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to delete segment: {str(e)}")
+
+    @timed_async("rest")
+    async def download_segment_members(
+        self, segment_id: str, page_size: int = 10000, known_version: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Download every member of a segment.
+
+        Pages are fetched in member ID order. If the members change during
+        the download, it starts over, so the result is a consistent version.
+
+        Args:
+            segment_id: Segment identifier
+            page_size: Members per request (at most 10000)
+            known_version: Version already held; if it is still current,
+                           nothing is downloaded
+
+        Returns:
+            Dictionary with the membership ``version`` and the ``members``
+            list, or None if ``known_version`` is current
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If the request fails or the members keep changing
+        """
+        for _ in range(_SEGMENT_DOWNLOAD_ATTEMPTS):
+            version, members, cursor = None, [], None
+            while True:
+                # A known version is checked with a one-member first page
+                params = {"limit": 1 if known_version and version is None else page_size}
+                if cursor is not None:
+                    params["cursor"] = cursor
+                try:
+                    page = await self._request(
+                        "GET",
+                        f"/segments/{segment_id}/members",
+                        not_found=f"Segment {segment_id} not found",
+                        not_found_error=SegmentNotFoundError,
+                        params=params,
+                    )
+                except _REQUEST_ERRORS as e:
+                    raise FeatureFlagError(f"Failed to download segment members: {str(e)}")
+                if version is not None and page["version"] != version:
+                    break
+                if known_version is not None and page["version"] == known_version:
+                    return None
+                version = page["version"]
+                members.extend(page["members"])
+                cursor = page["nextCursor"]
+                if cursor is None:
+                    return {"version": version, "members": members}
+        raise FeatureFlagError(f"Segment {segment_id} changed during every download attempt")
+
+    @timed_async("rest")
+    async def upload_segment_members(
+        self,
+        segment_id: str,
+        members: Iterable[str],
+        replace: bool = True,
+        chunk_size: int = 50000,
+    ) -> int:
+        """
+        Upload segment members in bulk.
+
+        Args:
+            segment_id: Segment identifier
+            members: Member (user) IDs
+            replace: Replace the current members in one atomic request;
+                     otherwise add to them in requests of ``chunk_size``
+            chunk_size: Members per request when adding
+
+        Returns:
+            Number of members stored (replace) or newly added
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If the upload fails
+        """
+        members = list(members)
+        if replace:
+            return (await self._send_segment_members("PUT", segment_id, members))["total"]
+        added = 0
+        for i in range(0, len(members), chunk_size):
+            added += (await self._send_segment_members("POST", segment_id, members[i:i + chunk_size]))["added"]
+        return added
+
+    @timed_async("rest")
+    async def remove_segment_members(
+        self, segment_id: str, members: Iterable[str], chunk_size: int = 50000
+    ) -> int:
+        """
+        Remove members from a segment.
+
+        Args:
+            segment_id: Segment identifier
+            members: Member (user) IDs
+            chunk_size: Members per request
+
+        Returns:
+            Number of members removed
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        members = list(members)
+        removed = 0
+        for i in range(0, len(members), chunk_size):
+            removed += (await self._send_segment_members("DELETE", segment_id, members[i:i + chunk_size]))["removed"]
+        return removed
+
+    async def _send_segment_members(self, method: str, segment_id: str, members: List[str]) -> Dict[str, Any]:
+        try:
+            return await self._request(
+                method,
+                f"/segments/{segment_id}/members",
+                not_found=f"Segment {segment_id} not found",
+                not_found_error=SegmentNotFoundError,
+                json={"members": members},
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to upload segment members: {str(e)}")
+
+    @timed_async("rest")
+    async def get_audit_log_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 500,
+        flag_id: Optional[str] = None,
+        action: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of audit logs, newest first.
+
+        Args:
+            cursor: ``nextCursor`` of the previous page; None for the first page
+            limit: Entries per page (at most 5000)
+            flag_id: Only entries of this flag
+            action: Only entries with this action (CREATE, UPDATE, ...)
+            user_id: Only entries by this user
+            start: Only entries at or after this time (datetime or ISO 8601 string)
+            end: Only entries before this time
+
+        Returns:
+            Dictionary with the ``items`` and the ``nextCursor``, which is
+            None on the last page
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        params = _audit_params(flag_id, action, user_id, start, end)
+        params["limit"] = limit
+        if cursor is not None:
+            params["cursor"] = cursor
+        try:
+            return await self._request("GET", "/audit/page", params=params)
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get audit logs: {str(e)}")
+
+    async def iter_audit_logs(
+        self,
+        flag_id: Optional[str] = None,
+        action: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every matching audit log entry, newest first.
+
+        Pages are fetched lazily, so at most two pages are held in memory.
+        With ``prefetch``, the next page is requested concurrently while the
+        current one is consumed.
+
+        Args:
+            flag_id: Only entries of this flag
+            action: Only entries with this action
+            user_id: Only entries by this user
+            start: Only entries at or after this time
+            end: Only entries before this time
+            page_size: Entries per request (at most 5000)
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Audit log entries
+
+        Raises:
+            FeatureFlagError: If a request fails
+        """
+        def fetch(cursor: Optional[str]):
+            return self.get_audit_log_page(cursor, page_size, flag_id, action, user_id, start, end)
+
+        page = await fetch(None)
+        upcoming = None
+        try:
+            while True:
+                cursor = page["nextCursor"]
+                if cursor is not None and prefetch:
+                    upcoming = asyncio.ensure_future(fetch(cursor))
+                for item in page["items"]:
+                    yield item
+                if cursor is None:
+                    return
+                page = await upcoming if upcoming is not None else await fetch(cursor)
+                upcoming = None
+        finally:
+            if upcoming is not None:
+                upcoming.cancel()
+
+    @timed_async("rest")
+    async def get_analytics(
+        self,
+        flag_id: str,
+        time_range: str = "24h",
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+        bucket: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get analytics for a specific flag.
+
+        Args:
+            flag_id: Flag identifier
+            time_range: Time range (1h, 24h, 7d, 30d), used when start is not set
+            start: Start of a custom range (datetime or ISO 8601 string)
+            end: End of a custom range (defaults to now)
+            bucket: Timeline bucket size (1m, 5m, 15m, 1h, 6h, 1d; default 1h)
+
+        Returns:
+            Analytics data with stats and timeline. unique_users is an
+            approximate distinct count.
+
+        Raises:
+            FeatureFlagError: If request fails
+        """
+        try:
+            return await self._request(
+                "GET",
+                f"/analytics/flags/{flag_id}",
+                params=_analytics_params(time_range, start, end, bucket),
+            )
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get analytics: {str(e)}")
+
+    @timed_async("rest")
+    async def get_system_metrics(self) -> Dict[str, int]:
+        """
+        Get system-wide metrics.
+
+        Returns:
+            System metrics (total flags, enabled flags, etc.)
+
+        Raises:
+            FeatureFlagError: If request fails
+        """
+        try:
+            return await self._request("GET", "/analytics/metrics")
+        except _REQUEST_ERRORS as e:
+            raise FeatureFlagError(f"Failed to get system metrics: {str(e)}")
+
+    def load_snapshot(self) -> Optional[FlagSnapshot]:
+        """
+        Get the persisted flag snapshot, memory-mapping it on first use.
+
+        Returns:
+            The snapshot, or None if no valid snapshot file exists
+        """
+        snapshot = self._snapshot
+        if snapshot is None and self.snapshot_path:
+            with self._snapshot_lock:
+                if self._snapshot is None:
+                    try:
+                        self._snapshot = FlagSnapshot.open(self.snapshot_path)
+                    except SnapshotError:
+                        return None
+                snapshot = self._snapshot
+        return snapshot
+
+    def _release_snapshot(self):
+        """Drop the mapped snapshot after the file was replaced; the next use maps the new one."""
+        with self._snapshot_lock:
+            self._snapshot = None
+
+    def _fallback(
+        self, flag_id: str, context: Optional[Dict[str, Any]], default: Optional[bool]
+    ) -> Optional[Dict[str, Any]]:
+        """Answer an evaluation the API cannot serve: from the snapshot, else with the default."""
+        snapshot = self.load_snapshot()
+        flag = snapshot.get(flag_id) if snapshot is not None else None
+        if flag is not None:
+            return self.engine.evaluate(flag, context)
+        if default is not None:
+            return {"enabled": default, "reason": "Default value (API unavailable)"}
+        return None
+
+    async def close(self):
+        """Close the HTTP session and its connection pool."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+        self._release_snapshot()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+
+
+def _is_unavailable(error: Optional[BaseException]) -> bool:
+    """Check if a request failed because the API could not serve it at all."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError, CircuitOpenError))
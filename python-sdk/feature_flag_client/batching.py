@@ -0,0 +1,150 @@
+"""Micro-batching of concurrent flag evaluations into bulk requests."""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .cache import context_digest
+from .exceptions import EvaluationError
+
+BulkSender = Callable[[List[str], Optional[str], Dict[str, Any]], Dict[str, Dict[str, Any]]]
+
+
+class _Batch:
+    """Pending evaluations sharing one user and context."""
+
+    __slots__ = ("user_id", "context", "deadline", "waiters")
+
+    def __init__(self, user_id: Optional[str], context: Dict[str, Any], deadline: float):
+        self.user_id = user_id
+        self.context = context
+        self.deadline = deadline
+        self.waiters: Dict[str, List[Future]] = {}
+
+
+class EvaluationBatcher:
+    """
+    Coalesces concurrent single-flag evaluations into ``/evaluate/bulk`` calls.
+
+    Calls for the same (user, context) are held for up to ``window`` seconds or
+    until ``max_batch_size`` distinct flags are pending, then sent as one bulk
+    request whose results are fanned back out to the waiting callers.
+    """
+
+    def __init__(
+        self,
+        send_bulk: BulkSender,
+        window: float = 0.002,
+        max_batch_size: int = 50,
+        max_workers: int = 4,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            send_bulk: Function performing a bulk evaluation request
+            window: Maximum time in seconds a call waits for companions
+            max_batch_size: Number of distinct flags that triggers an early flush
+            max_workers: Number of bulk requests that may be in flight at once
+        """
+        self.send_bulk = send_bulk
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._batches: Dict[str, _Batch] = {}
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ff-batch")
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(
+        self, flag_id: str, user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None
+    ) -> Future:
+        """
+        Queue an evaluation.
+
+        Args:
+            flag_id: Flag identifier
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Future resolving to the evaluation result
+
+        Raises:
+            EvaluationError: If the batcher has been closed
+        """
+        future: Future = Future()
+        key = context_digest(user_id, context)
+        with self._cond:
+            if self._closed:
+                raise EvaluationError("Evaluation batcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = _Batch(user_id, context or {}, time.monotonic() + self.window)
+                self._batches[key] = batch
+                self._cond.notify()
+            batch.waiters.setdefault(flag_id, []).append(future)
+            if len(batch.waiters) >= self.max_batch_size:
+                self._cond.notify()
+        return future
+
+    def close(self):
+        """Flush pending evaluations and stop the batcher."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        """Flush batches whose window elapsed or which are full."""
+        while True:
+            with self._cond:
+                while not self._batches and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._batches:
+                    return
+
+                now = time.monotonic()
+                due = [
+                    key
+                    for key, batch in self._batches.items()
+                    if self._closed or batch.deadline <= now or len(batch.waiters) >= self.max_batch_size
+                ]
+                if not due:
+                    self._cond.wait(min(batch.deadline for batch in self._batches.values()) - now)
+                    continue
+                ready = [self._batches.pop(key) for key in due]
+
+            for batch in ready:
+                self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: _Batch):
+        """Send one bulk request and resolve its waiters."""
+        try:
+            results = self.send_bulk(list(batch.waiters), batch.user_id, batch.context)
+        except Exception as e:
+            error = EvaluationError(f"Failed to evaluate flag: {str(e)}")
+            error.__cause__ = e
+            for futures in batch.waiters.values():
+                for future in futures:
+                    future.set_exception(error)
+            return
+
+        for flag_id, futures in batch.waiters.items():
+            result = results.get(flag_id)
+            # The single-flag endpoint answers these with an HTTP error, so
+            # batched callers see the same EvaluationError.
+            if result is None or "error" in result or result.get("reason") == "Flag not found":
+                reason = result.get("error") or result.get("reason") if result else "missing from bulk response"
+                for future in futures:
+                    future.set_exception(EvaluationError(f"Failed to evaluate flag: {reason}"))
+            else:
+                for future in futures:
+                    future.set_result(result)
@@ -0,0 +1,268 @@
+"""Vectorized evaluation of one flag for large user populations.
+
+Used for rollout previews and exports: every user in a column of IDs is run
+through a flag's rules in NumPy, with results identical to ``RuleEngine``.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from .rule_engine import RuleEngine, simple_hash
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_INVERSE_31 = pow(31, -1, 1 << 32)
+
+
+class UserChunk(NamedTuple):
+    """Evaluation results for one chunk of users."""
+
+    user_ids: "np.ndarray"
+    enabled: "np.ndarray"
+
+
+def simple_hash_array(values: "np.ndarray") -> "np.ndarray":
+    """
+    Vectorized ``simple_hash`` over an array of strings.
+
+    Args:
+        values: Array or sequence of Python strings (any NumPy string or
+                object dtype); '<U' arrays cannot hold strings ending in NUL
+
+    Returns:
+        int64 array of hash values
+    """
+    _require_numpy()
+    source = values if isinstance(values, np.ndarray) else _object_array(values)
+    strings = source.astype(str)
+    if strings.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # '<U' arrays cannot end in NUL: converting drops trailing "\x00"s, which
+    # the hash must still see. Such strings are hashed one by one below.
+    if source.dtype == object:
+        truncated = np.fromiter(
+            (isinstance(value, str) and value.endswith("\x00") for value in source), dtype=bool, count=source.size
+        )
+    else:
+        truncated = np.zeros(strings.shape, dtype=bool)
+
+    width = strings.dtype.itemsize // 4
+    if width == 0:
+        signed = np.zeros(strings.shape, dtype=np.int64)
+        for i in np.flatnonzero(truncated):
+            signed[i] = simple_hash(source[i])
+        return signed
+
+    # '<U' arrays hold one UTF-32 code point per uint32, zero padded on the
+    # right. Hashing the padded rows multiplies each hash by 31 once per
+    # padding position; 31 is odd, hence invertible modulo 2**32, so the
+    # padding is undone with a single multiply instead of per-row masking.
+    code_points = strings.view(np.uint32).reshape(strings.shape[0], width)
+    lengths = np.char.str_len(strings)
+
+    hashes = np.zeros(strings.shape[0], dtype=np.uint32)
+    for position in range(width):
+        hashes = hashes * np.uint32(31) + code_points[:, position]
+    unpad = np.array([pow(_INVERSE_31, k, 1 << 32) for k in range(width + 1)], dtype=np.uint32)
+    hashes *= unpad[width - lengths]
+
+    signed = np.abs(hashes.view(np.int32).astype(np.int64))
+
+    # Characters outside the BMP are two UTF-16 code units in JavaScript
+    astral = (code_points > 0xFFFF).any(axis=1)
+    for i in np.flatnonzero(astral & ~truncated):
+        signed[i] = simple_hash(str(strings[i]))
+    for i in np.flatnonzero(truncated):
+        signed[i] = simple_hash(source[i])
+    return signed
+
+
+class BulkUserEvaluator:
+    """Evaluates a flag's rules for many users in one vectorized pass."""
+
+    def __init__(self, engine: Optional[RuleEngine] = None, chunk_size: int = 100_000):
+        """
+        Initialize the evaluator.
+
+        Args:
+            engine: Rule engine providing geo/device resolvers for scalar rules
+            chunk_size: Number of users evaluated and yielded per chunk
+        """
+        _require_numpy()
+        self.engine = engine or RuleEngine()
+        self.chunk_size = chunk_size
+
+    def evaluate(
+        self,
+        flag: Dict[str, Any],
+        user_ids: Iterable[Optional[str]],
+        context_columns: Optional[Dict[str, Iterable[Any]]] = None,
+    ) -> Iterator[UserChunk]:
+        """
+        Evaluate a flag for every user, streaming results in chunks.
+
+        Args:
+            flag: Flag definition with 'enabled' and 'rules'
+            user_ids: Column of user IDs, used as the context ``userId``
+            context_columns: Optional extra context columns (e.g. 'sessionId',
+                             'ip', 'userAgent', custom fields), aligned with
+                             ``user_ids``
+
+        Yields:
+            UserChunk with the chunk's user IDs and a boolean enabled mask
+        """
+        columns = {name: iter(values) for name, values in (context_columns or {}).items()}
+        ids = iter(user_ids)
+        while True:
+            chunk_ids = _take(ids, self.chunk_size)
+            if not chunk_ids:
+                return
+            chunk_columns = {name: _take(values, len(chunk_ids)) for name, values in columns.items()}
+            user_array = _object_array(chunk_ids)
+            yield UserChunk(user_array, self.evaluate_chunk(flag, user_array, chunk_columns))
+
+    def evaluate_chunk(
+        self,
+        flag: Dict[str, Any],
+        user_ids: Sequence[Optional[str]],
+        context_columns: Optional[Dict[str, Sequence[Any]]] = None,
+    ) -> "np.ndarray":
+        """
+        Evaluate a flag for one in-memory chunk of users.
+
+        Args:
+            flag: Flag definition with 'enabled' and 'rules'
+            user_ids: User IDs, used as the context ``userId``
+            context_columns: Extra context columns aligned with ``user_ids``
+
+        Returns:
+            Boolean array, True where the flag is enabled
+        """
+        users = _object_array(user_ids)
+        enabled = np.full(len(users), bool(flag.get("enabled")), dtype=bool)
+        if not flag.get("enabled"):
+            return enabled
+
+        columns = {name: _object_array(values) for name, values in (context_columns or {}).items()}
+        columns["userId"] = users
+        for rule in flag.get("rules") or []:
+            if not enabled.any():
+                break
+            enabled &= self._evaluate_rule(rule, columns, len(users))
+        return enabled
+
+    def _evaluate_rule(self, rule: Dict[str, Any], columns: Dict[str, "np.ndarray"], size: int) -> "np.ndarray":
+        rule_type = rule.get("type")
+        operator = rule.get("operator")
+        value = rule.get("value")
+
+        if rule_type == "percentage" and operator in ("less_than", "greater_than") and _is_number(value):
+            keys = _first_truthy(columns["userId"], columns.get("sessionId"))
+            present = _truthy(keys)
+            buckets = np.zeros(size, dtype=np.int64)
+            string_keys = present & np.array([isinstance(k, str) for k in keys], dtype=bool)
+            buckets[string_keys] = simple_hash_array(keys[string_keys]) % 100 + 1
+            buckets[present & ~string_keys] = 1
+            passed = buckets <= value if operator == "less_than" else buckets > value
+            return present & passed
+
+        if rule_type == "user" and operator in ("in", "not_in") and isinstance(value, list):
+            if all(isinstance(v, str) for v in value):
+                users = columns["userId"]
+                is_string = np.array([isinstance(u, str) for u in users], dtype=bool)
+                strings = np.where(is_string, users, "").astype(str)
+                member = np.isin(strings, np.array(value, dtype=str)) & is_string
+                return _truthy(users) & (member if operator == "in" else ~member)
+
+        # Everything else depends on a single context column, so it is
+        # evaluated once per distinct value with the scalar engine.
+        return self._evaluate_by_distinct_values(rule, columns, size)
+
+    def _evaluate_by_distinct_values(
+        self, rule: Dict[str, Any], columns: Dict[str, "np.ndarray"], size: int
+    ) -> "np.ndarray":
+        names = _rule_columns(rule)
+        missing = np.full(size, _MISSING_MARKER, dtype=object)
+        keys = list(zip(*(columns.get(name, missing) for name in names)))
+
+        predicate = self.engine.compile_rule(rule)
+        results: Dict[Any, bool] = {}
+        passed = np.empty(size, dtype=bool)
+        for i, key in enumerate(keys):
+            hashable = tuple(_freeze(v) for v in key)
+            result = results.get(hashable)
+            if result is None:
+                context = {name: v for name, v in zip(names, key) if v is not _MISSING_MARKER}
+                result = predicate(context)[0]
+                results[hashable] = result
+            passed[i] = result
+        return passed
+
+
+_MISSING_MARKER = object()
+
+
+def _rule_columns(rule: Dict[str, Any]):
+    """Context keys a rule reads."""
+    rule_type = rule.get("type")
+    if rule_type == "geo":
+        return ("ip", "userIp", "resolved")
+    if rule_type == "device":
+        return ("userAgent", "resolved")
+    if rule_type == "percentage":
+        return ("userId", "sessionId")
+    if rule_type in ("user", "segment"):
+        return ("userId",)
+    if rule_type == "custom":
+        return (rule.get("field"),)
+    return ()
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return ("__json__", repr(value))
+    # Keep True/1 and 1/1.0 apart: they are different JSON values
+    return (type(value).__name__, value) if isinstance(value, bool) else value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _truthy(values: "np.ndarray") -> "np.ndarray":
+    return np.array([bool(v) for v in values], dtype=bool)
+
+
+def _first_truthy(primary: "np.ndarray", fallback: Optional["np.ndarray"]) -> "np.ndarray":
+    """Element-wise ``primary || fallback``."""
+    if fallback is None:
+        return primary
+    return np.where(_truthy(primary), primary, fallback)
+
+
+def _object_array(values: Iterable[Any]) -> "np.ndarray":
+    items = values if isinstance(values, (list, tuple)) else list(values)
+    array = np.empty(len(items), dtype=object)
+    array[:] = items
+    return array
+
+
+def _take(iterator: Iterator[Any], count: int) -> list:
+    items = []
+    for item in iterator:
+        items.append(item)
+        if len(items) >= count:
+            break
+    return items
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "NumPy is required for bulk user evaluation. Install it using:\n"
+            "pip install feature-flag-client[numpy]"
+        )
@@ -0,0 +1,243 @@
+"""Evaluation result cache for Feature Flag clients."""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .websocket_client import WebSocketClient
+
+CacheKey = Tuple[str, str]
+
+
+def context_digest(user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Stable digest of a user ID and evaluation context.
+
+    Args:
+        user_id: User identifier
+        context: Evaluation context
+
+    Returns:
+        Hex digest that is independent of the context's key order
+    """
+    payload = json.dumps([user_id, context or {}], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EvaluationCache:
+    """
+    Bounded LRU cache of flag evaluation results with a per-entry TTL.
+
+    Entries are keyed by the flag ID plus a stable hash of the user ID and
+    context, and can be dropped per flag when a ``flag_update`` arrives.
+    Results are copied on the way in and out, so callers may modify what they
+    get without changing the cached entry.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        """
+        Initialize the evaluation cache.
+
+        Args:
+            max_size: Maximum number of cached results
+            ttl: Time to live of each entry in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._keys_by_flag: Dict[str, Set[CacheKey]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        flag_id: str, user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None
+    ) -> CacheKey:
+        """
+        Build the cache key for an evaluation.
+
+        Args:
+            flag_id: Flag identifier
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Tuple of flag ID and a digest of user ID and context
+        """
+        return flag_id, context_digest(user_id, context)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key returned by ``make_key``
+
+        Returns:
+            Copy of the cached evaluation result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(result)
+
+    def version(self, flag_id: str) -> Tuple[int, int]:
+        """
+        Get the invalidation version of a flag.
+
+        Take it before fetching a result and pass it to ``set`` so a result
+        fetched while the flag was being invalidated is not cached.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Opaque version token
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(flag_id, 0)
+
+    def set(self, key: CacheKey, result: Dict[str, Any], version: Optional[Tuple[int, int]] = None):
+        """
+        Store an evaluation result.
+
+        Args:
+            key: Key returned by ``make_key``
+            result: Evaluation result
+            version: Token from ``version`` taken before the result was fetched
+        """
+        result = _copy_result(result)
+        with self._lock:
+            if version is not None and version != (self._epoch, self._generations.get(key[0], 0)):
+                return
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._keys_by_flag.setdefault(key[0], set()).add(key)
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_flag(self, flag_id: str):
+        """
+        Drop every cached result for a flag.
+
+        Args:
+            flag_id: Flag identifier
+        """
+        with self._lock:
+            self._generations[flag_id] = self._generations.get(flag_id, 0) + 1
+            for key in self._keys_by_flag.pop(flag_id, ()):
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self._entries.clear()
+            self._keys_by_flag.clear()
+
+    def watch(self, ws_client: WebSocketClient):
+        """
+        Invalidate entries when the WebSocket pushes a change to their flag.
+
+        Args:
+            ws_client: WebSocket client receiving ``flag_update`` events
+        """
+        ws_client.on_flag_update(self._on_flag_update)
+        # Pushes missed while disconnected are unknown, so start over.
+        ws_client.on_connect(self.clear)
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss, eviction and size counters."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _on_flag_update(self, data: Dict[str, Any]):
+        flag_id = (data.get("flag") or {}).get("id")
+        if flag_id:
+            self.invalidate_flag(flag_id)
+
+    def _remove(self, key: CacheKey):
+        del self._entries[key]
+        keys = self._keys_by_flag.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_flag[key[0]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ETagMemo:
+    """
+    Bounded LRU map of request key to the last (ETag, body) received, so a
+    repeated request can be sent conditionally and answered from memory on a
+    "not modified" response.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Initialize the memo.
+
+        Args:
+            max_size: Maximum number of remembered responses
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[Any, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Tuple[str, Any]]:
+        """Get the remembered (etag, body) for a key, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Any, etag: str, body: Any):
+        """Remember the ETag and body of a response."""
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an evaluation result; it is usually flat, so a deep copy is rarely needed."""
+    if any(isinstance(value, (dict, list)) for value in result.values()):
+        return copy.deepcopy(result)
+    return dict(result)
@@ -0,0 +1,427 @@
+"""
+Command line interface for bulk flag operations.
+
+Flags and segments are exported and imported as JSON Lines, one object per
+line, with requests sent concurrently. ``bulk-evaluate`` streams a CSV or
+JSONL file of users through evaluation and writes each result as soon as it
+is ready, so memory use does not grow with the input.
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .client import FeatureFlagClient
+from .exceptions import FeatureFlagError, FlagNotFoundError, SegmentNotFoundError
+from .rule_engine import RuleEngine
+from .segments import SegmentIndex, referenced_segments
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Fields accepted by POST /flags and PUT /flags/:id
+_FLAG_FIELDS = ("name", "description", "enabled", "environment", "rules")
+_SEGMENT_FIELDS = ("name", "description", "conditions")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the CLI and return its exit status."""
+    args = _parser().parse_args(argv)
+    client = FeatureFlagClient(
+        base_url=args.api_url,
+        timeout=args.timeout,
+        pool_size=args.concurrency,
+    )
+    try:
+        return args.command(client, args)
+    except FeatureFlagError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        client.close()
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="feature-flag-cli", description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--api-url",
+        default=os.environ.get("FEATURE_FLAG_API_URL", "http://localhost:3001/api"),
+        help="API base URL (default: $FEATURE_FLAG_API_URL or http://localhost:3001/api)",
+    )
+    parser.add_argument("--timeout", type=float, default=10, help="request timeout in seconds")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="requests in flight (default: 8)")
+    commands = parser.add_subparsers(required=True, metavar="command")
+
+    export_flags = commands.add_parser("export-flags", help="write the flags of an environment as JSONL")
+    export_flags.add_argument("-e", "--environment", default="development")
+    export_flags.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    export_flags.set_defaults(command=_export_flags)
+
+    import_flags = commands.add_parser("import-flags", help="create or update flags from JSONL")
+    import_flags.add_argument("input", help="JSONL file of flags, or - for stdin")
+    import_flags.add_argument("-e", "--environment", help="environment of created flags (default: each flag's own)")
+    import_flags.add_argument("--segment-map", help="JSON file of old -> new segment IDs written by import-segments")
+    import_flags.set_defaults(command=_import_flags)
+
+    export_segments = commands.add_parser("export-segments", help="write segments and their members as JSONL")
+    export_segments.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    export_segments.add_argument("--no-members", action="store_true", help="omit segment members")
+    export_segments.set_defaults(command=_export_segments)
+
+    import_segments = commands.add_parser("import-segments", help="create or update segments from JSONL")
+    import_segments.add_argument("input", help="JSONL file of segments, or - for stdin")
+    import_segments.add_argument("--id-map", help="write a JSON file of old -> new segment IDs")
+    import_segments.set_defaults(command=_import_segments)
+
+    evaluate = commands.add_parser("bulk-evaluate", help="evaluate flags for every user of a CSV/JSONL file")
+    evaluate.add_argument("input", help="CSV or JSONL file of users, or - for stdin")
+    evaluate.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    evaluate.add_argument("-e", "--environment", default="development")
+    evaluate.add_argument("-f", "--flags", help="comma-separated flag IDs (default: every flag of the environment)")
+    evaluate.add_argument("--user-field", default="userId", help="column or key holding the user ID")
+    evaluate.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    evaluate.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    evaluate.add_argument("--local", action="store_true", help="evaluate in-process instead of calling the API")
+    evaluate.add_argument("--flags-file", help="JSONL flags from export-flags; implies --local and works offline")
+    evaluate.add_argument(
+        "--segments-file", help="JSONL segments with members from export-segments, for local segment rules"
+    )
+    evaluate.add_argument(
+        "--geo-lookup",
+        type=_import_function,
+        metavar="MODULE:FUNCTION",
+        help="IP -> country resolver for local geo rules",
+    )
+    evaluate.add_argument(
+        "--device-parser",
+        type=_import_function,
+        metavar="MODULE:FUNCTION",
+        help="user agent -> (device type, OS, browser) resolver for local device rules",
+    )
+    evaluate.add_argument(
+        "--allow-unresolved",
+        action="store_true",
+        help="evaluate locally even if geo, device or segment rules cannot be resolved "
+        "(e.g. the users carry a pre-resolved context)",
+    )
+    evaluate.set_defaults(command=_bulk_evaluate)
+
+    return parser
+
+
+def _export_flags(client: FeatureFlagClient, args: argparse.Namespace) -> int:
+    flags = client.get_all_flags(args.environment)
+    with _open(args.output, "w") as output:
+        for flag in flags:
+            _write_json_line(output, flag)
+    print(f"exported {len(flags)} flags", file=sys.stderr)
+    return 0
+
+
+def _import_flags(client: FeatureFlagClient, args: argparse.Namespace) -> int:
+    segment_map = _read_json(args.segment_map) if args.segment_map else {}
+
+    def upsert(flag: Dict[str, Any]) -> Dict[str, Any]:
+        data = {field: flag[field] for field in _FLAG_FIELDS if field in flag}
+        if args.environment:
+            data["environment"] = args.environment
+        if segment_map:
+            data["rules"] = [_remap_segments(rule, segment_map) for rule in data.get("rules") or []]
+        if flag.get("id"):
+            try:
+                return client.update_flag(flag["id"], data)
+            except FlagNotFoundError:
+                pass
+        return client.create_flag(data)
+
+    with _open(args.input, "r") as lines:
+        return _run_imports(upsert, _read_json_lines(lines), args.concurrency, "flags")
+
+
+def _export_segments(client: FeatureFlagClient, args: argparse.Namespace) -> int:
+    def with_members(segment: Dict[str, Any]) -> Dict[str, Any]:
+        if not args.no_members:
+            segment = dict(segment, members=client.download_segment_members(segment["id"])["members"])
+        return segment
+
+    count = 0
+    with _open(args.output, "w") as output:
+        for _, segment in _bounded_map(with_members, client.get_all_segments(), args.concurrency):
+            _write_json_line(output, segment)
+            count += 1
+    print(f"exported {count} segments", file=sys.stderr)
+    return 0
+
+
+def _import_segments(client: FeatureFlagClient, args: argparse.Namespace) -> int:
+    id_map: Dict[str, str] = {}
+
+    def upsert(segment: Dict[str, Any]) -> Dict[str, Any]:
+        data = {field: segment[field] for field in _SEGMENT_FIELDS if field in segment}
+        saved = None
+        if segment.get("id"):
+            try:
+                saved = client.update_segment(segment["id"], data)
+            except SegmentNotFoundError:
+                pass
+        if saved is None:
+            saved = client.create_segment(data)
+        if "members" in segment:
+            client.upload_segment_members(saved["id"], segment["members"])
+        if segment.get("id"):
+            id_map[segment["id"]] = saved["id"]
+        return saved
+
+    with _open(args.input, "r") as lines:
+        status = _run_imports(upsert, _read_json_lines(lines), args.concurrency, "segments")
+    if args.id_map:
+        with open(args.id_map, "w", encoding="utf-8") as f:
+            json.dump(id_map, f, indent=2)
+    return status
+
+
+def _bulk_evaluate(client: FeatureFlagClient, args: argparse.Namespace) -> int:
+    flag_ids = [flag_id.strip() for flag_id in args.flags.split(",") if flag_id.strip()] if args.flags else None
+    evaluate = _local_evaluator(client, args, flag_ids) if args.local or args.flags_file else None
+
+    def remote(user: Tuple[Optional[str], Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        user_id, context = user
+        if flag_ids:
+            return client.bulk_evaluate(flag_ids, user_id, context)
+        return client.evaluate_all(args.environment, user_id, context)
+
+    def local(user: Tuple[Optional[str], Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        user_id, context = user
+        return evaluate(dict(context, userId=user_id) if user_id is not None else context)
+
+    input_format = args.input_format or _format_of(args.input, "jsonl")
+    output_format = args.output_format or _format_of(args.output, "jsonl")
+    count = 0
+    with _open(args.input, "r", newline="") as source, _open(args.output, "w", newline="") as output:
+        users = _read_users(source, input_format, args.user_field)
+        results = ((user, local(user)) for user in users) if evaluate else _bounded_map(remote, users, args.concurrency)
+        write = _result_writer(output, output_format, args.user_field, flag_ids)
+        for (user_id, _), result in results:
+            write(user_id, result)
+            count += 1
+    print(f"evaluated {count} users", file=sys.stderr)
+    return 0
+
+
+def _local_evaluator(
+    client: FeatureFlagClient, args: argparse.Namespace, flag_ids: Optional[List[str]]
+) -> Callable[[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Load the flags once and return a function evaluating them for a context."""
+    if args.flags_file:
+        with _open(args.flags_file, "r") as lines:
+            flags = list(_read_json_lines(lines))
+    else:
+        flags = client.get_all_flags(args.environment)
+
+    if flag_ids:
+        by_id = {flag["id"]: flag for flag in flags}
+        missing = [flag_id for flag_id in flag_ids if flag_id not in by_id]
+        if missing:
+            raise FlagNotFoundError(f"Flags not found: {', '.join(missing)}")
+        flags = [by_id[flag_id] for flag_id in flag_ids]
+
+    segment_ids = referenced_segments(flags)
+    segment_lookup = None
+    if args.segments_file:
+        with _open(args.segments_file, "r") as lines:
+            members = {
+                segment["id"]: frozenset(segment["members"])
+                for segment in _read_json_lines(lines)
+                if "members" in segment
+            }
+        segment_lookup = members.get
+        segment_ids = [segment_id for segment_id in segment_ids if segment_id not in members]
+    elif segment_ids and not args.flags_file:
+        segments = SegmentIndex(client)
+        segments.load(segment_ids)
+        segment_lookup = segments.members
+        segment_ids = []
+
+    # Without resolvers these rules would evaluate differently from the
+    # server, so refuse unless the caller accepts it.
+    unresolved = []
+    if args.geo_lookup is None and _rules_of_type(flags, "geo"):
+        unresolved.append(f"geo rules ({', '.join(_rules_of_type(flags, 'geo'))}) need --geo-lookup")
+    if args.device_parser is None and _rules_of_type(flags, "device"):
+        unresolved.append(f"device rules ({', '.join(_rules_of_type(flags, 'device'))}) need --device-parser")
+    if segment_ids:
+        unresolved.append(f"segments {', '.join(segment_ids)} need --segments-file with members")
+    if unresolved:
+        message = "; ".join(unresolved)
+        if not args.allow_unresolved:
+            raise FeatureFlagError(f"Cannot evaluate locally like the server: {message} (or pass --allow-unresolved)")
+        print(f"warning: {message}; results may differ from the server", file=sys.stderr)
+
+    engine = RuleEngine(
+        geo_lookup=args.geo_lookup, device_parser=args.device_parser, segment_lookup=segment_lookup
+    )
+    plans = [(flag["id"], flag, engine.plan_for(flag)) for flag in flags]
+
+    def evaluate(context: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        return {
+            flag_id: plan(context) if flag.get("enabled") else {"enabled": False, "reason": "Flag is disabled"}
+            for flag_id, flag, plan in plans
+        }
+
+    return evaluate
+
+
+def _rules_of_type(flags: List[Dict[str, Any]], rule_type: str) -> List[str]:
+    """IDs of the flags with at least one rule of a type."""
+    return [
+        flag["id"] for flag in flags if any(rule.get("type") == rule_type for rule in flag.get("rules") or [])
+    ]
+
+
+def _run_imports(
+    upsert: Callable[[Dict[str, Any]], Dict[str, Any]],
+    items: Iterable[Dict[str, Any]],
+    concurrency: int,
+    noun: str,
+) -> int:
+    """Apply an upsert to every item, reporting failures without stopping."""
+    def attempt(item: Dict[str, Any]) -> Optional[str]:
+        try:
+            upsert(item)
+            return None
+        except FeatureFlagError as e:
+            return f"{item.get('id') or item.get('name')}: {e}"
+
+    imported = failed = 0
+    for item, error in _bounded_map(attempt, items, concurrency):
+        if error is None:
+            imported += 1
+        else:
+            failed += 1
+            print(f"error: {error}", file=sys.stderr)
+    print(f"imported {imported} {noun}, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _bounded_map(fn: Callable[[T], R], items: Iterable[T], concurrency: int) -> Iterator[Tuple[T, R]]:
+    """
+    Apply ``fn`` to items on a thread pool, yielding (item, result) in input order.
+
+    At most ``2 * concurrency`` items are read ahead of the output, so the
+    input is consumed as results are written.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending: deque = deque()
+        for item in items:
+            pending.append((item, executor.submit(fn, item)))
+            if len(pending) >= 2 * concurrency:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+
+def _read_users(source, input_format: str, user_field: str) -> Iterator[Tuple[Optional[str], Dict[str, Any]]]:
+    """Yield (user ID, context) pairs; every other column or key is context."""
+    rows = csv.DictReader(source) if input_format == "csv" else _read_json_lines(source)
+    for row in rows:
+        user_id = row.pop(user_field, None)
+        # JSONL rows may nest the context instead of flattening it
+        context = row["context"] if isinstance(row.get("context"), dict) else row
+        yield (str(user_id) if user_id not in (None, "") else None), context
+
+
+def _result_writer(output, output_format: str, user_field: str, flag_ids: Optional[List[str]]):
+    """Return a function writing one user's results."""
+    if output_format == "jsonl":
+        def write_json(user_id: Optional[str], results: Dict[str, Dict[str, Any]]):
+            _write_json_line(output, {user_field: user_id, "results": results})
+
+        return write_json
+
+    # One enabled column per flag; without --flags, the first user's flags
+    writer = csv.writer(output)
+    columns: List[str] = []
+
+    def write_csv(user_id: Optional[str], results: Dict[str, Dict[str, Any]]):
+        if not columns:
+            columns.extend(flag_ids or sorted(results))
+            writer.writerow([user_field, *columns])
+        writer.writerow([user_id or "", *(_enabled_cell(results.get(flag_id)) for flag_id in columns)])
+
+    return write_csv
+
+
+def _enabled_cell(result: Optional[Dict[str, Any]]) -> str:
+    if result is None or "enabled" not in result:
+        return ""
+    return "true" if result["enabled"] else "false"
+
+
+def _remap_segments(rule: Dict[str, Any], segment_map: Dict[str, str]) -> Dict[str, Any]:
+    if rule.get("type") != "segment":
+        return rule
+    value = rule.get("value")
+    if isinstance(value, list):
+        value = [segment_map.get(segment_id, segment_id) for segment_id in value]
+    else:
+        value = segment_map.get(value, value)
+    return dict(rule, value=value)
+
+
+def _read_json_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise FeatureFlagError(f"Invalid JSON on line {number}: {e}")
+
+
+def _write_json_line(output, item: Dict[str, Any]):
+    output.write(json.dumps(item, separators=(",", ":"), default=str))
+    output.write("\n")
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _import_function(spec: str) -> Callable[..., Any]:
+    """Resolve a ``module:function`` argument."""
+    module_name, _, name = spec.partition(":")
+    try:
+        function = getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"cannot import {spec}: {e}")
+    if not callable(function):
+        raise argparse.ArgumentTypeError(f"{spec} is not callable")
+    return function
+
+
+def _format_of(path: str, default: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else default
+
+
+@contextmanager
+def _open(path: str, mode: str, newline: Optional[str] = None):
+    """Open a file, or stdin/stdout for ``-``, without closing the standard streams."""
+    if path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+        return
+    with open(path, mode, encoding="utf-8", newline=newline) as f:
+        yield f
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,133 @@
 """REST API client for Feature Flag Management System."""
 
+import logging
+import os
+import threading
+import time
 import requests
-from typing import Dict, List, Any, Optional
-from .exceptions import FeatureFlagError, FlagNotFoundError, EvaluationError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Union
+from .batching import EvaluationBatcher
+from .cache import ETagMemo, EvaluationCache, context_digest
+from .exceptions import FeatureFlagError, FlagNotFoundError, EvaluationError, SegmentNotFoundError, SnapshotError
+from .metrics import SDKMetrics, timed
+from .rule_engine import RuleEngine
+from .snapshot import FlagSnapshot, SnapshotWriter
+from .transport import EVALUATION_PATHS, CircuitBreaker, create_session
+
+logger = logging.getLogger(__name__)
+
+# Full restarts of a segment download whose members change mid-way
+_SEGMENT_DOWNLOAD_ATTEMPTS = 3
 
 
 class FeatureFlagClient:
     """Client for interacting with Feature Flag Management System via REST API."""
 
-    def __init__(self, base_url: str = "http://localhost:3001/api", timeout: int = 10):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:3001/api",
+        timeout: float = 10,
+        connect_timeout: float = 3.05,
+        pool_size: int = 10,
+        max_retries: int = 2,
+        retry_backoff: float = 0.2,
+        tcp_keepalive: Optional[int] = 60,
+        circuit_breaker: Union[CircuitBreaker, bool, None] = None,
+        default_values: Optional[Dict[str, bool]] = None,
+        cache: Optional[EvaluationCache] = None,
+        batch_window: Optional[float] = None,
+        max_batch_size: int = 50,
+        batch_max_workers: Optional[int] = None,
+        snapshot_path: Optional[str] = None,
+        engine: Optional[RuleEngine] = None,
+        bulk_chunk_size: int = 100,
+        metrics: Optional[SDKMetrics] = None,
+    ):
         """
         Initialize the Feature Flag client.
 
         Args:
             base_url: Base URL of the Feature Flag API
-            timeout: Request timeout in seconds
+            timeout: Read timeout in seconds
+            connect_timeout: Connection timeout in seconds
+            pool_size: Connections kept open to the API; size it to the
+                       number of threads making requests
+            max_retries: Retries of a request after a connection error, or for
+                         idempotent methods a read error or 502/503/504
+            retry_backoff: Backoff factor between retries, in seconds
+            tcp_keepalive: Idle seconds before TCP keep-alive probes on pooled
+                           connections; None keeps the system defaults
+            circuit_breaker: Breaker guarding the evaluation endpoints
+                             (/evaluate, /evaluate/bulk, /evaluate/all);
+                             defaults to CircuitBreaker(), False disables it.
+                             While it is open, evaluations fail at once and
+                             evaluate_flag falls back to the snapshot or to
+                             the flag's default value. Other endpoints neither
+                             trip nor consult it
+            default_values: Flag ID -> enabled value returned by evaluate_flag
+                            when the API is unavailable
+            cache: Optional cache for evaluation results
+            batch_window: If set, concurrent evaluate_flag calls for the same
+                          user and context are held for up to this many seconds
+                          and sent as one /evaluate/bulk request
+            max_batch_size: Number of distinct flags that flushes a batch early
+            batch_max_workers: Bulk requests the batcher keeps in flight at
+                               once; defaults to pool_size
+            snapshot_path: File where the last good get_all_flags result is
+                           persisted, in the background and only when it
+                           changed; it is served when the API is unreachable
+            engine: Rule engine used to evaluate flags from the snapshot
+            bulk_chunk_size: Maximum number of flags per /evaluate/bulk request;
+                             longer bulk_evaluate lists are split transparently
+            metrics: Registry recording request latency, errors, retries,
+                     cache hits and snapshot age
         """
         self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
-        self.session = requests.Session()
+        self.timeout = (connect_timeout, timeout)
+        self.cache = cache
+        if circuit_breaker is None or circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker: Optional[CircuitBreaker] = circuit_breaker or None
+        self.default_values = dict(default_values or {})
+        self.session = create_session(
+            pool_size=pool_size,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            circuit_breaker=self.circuit_breaker,
+            circuit_breaker_paths=EVALUATION_PATHS,
+            tcp_keepalive=tcp_keepalive,
+            on_retry=metrics.counter("retries_total", transport="rest").inc if metrics else None,
+        )
         self.session.headers.update({"Content-Type": "application/json"})
+        self._batcher = (
+            EvaluationBatcher(
+                self._post_bulk,
+                window=batch_window,
+                max_batch_size=max_batch_size,
+                max_workers=batch_max_workers or pool_size,
+            )
+            if batch_window
+            else None
+        )
+        self.snapshot_path = snapshot_path
+        self.engine = engine or RuleEngine()
+        self._snapshot: Optional[FlagSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self.snapshot_writer = (
+            SnapshotWriter(snapshot_path, on_write=self._release_snapshot) if snapshot_path else None
+        )
+        self.bulk_chunk_size = bulk_chunk_size
+        self._bootstraps = ETagMemo()
+        self.metrics = metrics
+        if metrics is not None:
+            self._cache_hits = metrics.counter("cache_requests_total", result="hit")
+            self._cache_misses = metrics.counter("cache_requests_total", result="miss")
+            if snapshot_path:
+                metrics.gauge("snapshot_age_seconds", self._snapshot_file_age, source="file", path=snapshot_path)
 
+    @timed("rest")
     def get_all_flags(self, environment: str = "development") -> List[Dict[str, Any]]:
         """
         Get all feature flags for an environment.
@@ -41,10 +148,56 @@ class FeatureFlagClient:
                 timeout=self.timeout,
             )
             response.raise_for_status()
-            return response.json()
+            flags = response.json()
         except requests.RequestException as e:
+            snapshot = self.load_snapshot() if _is_unavailable(e) else None
+            if snapshot is not None and snapshot.environment == environment:
+                return snapshot.flags()
             raise FeatureFlagError(f"Failed to get flags: {str(e)}")
 
+        self._save_snapshot(flags, environment)
+        return flags
+
+    @timed("rest")
+    def get_flag_changes(
+        self, environment: str = "development", since: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the flags of an environment that changed after a version.
+
+        The flag set version is also the ETag of ``/flags``, so an unchanged
+        environment costs one 304 without a body.
+
+        Args:
+            environment: Environment name (development, staging, production)
+            since: Flag set version from a previous call; None for a full load
+
+        Returns:
+            None if nothing changed, otherwise a dictionary with the new
+            ``version``, ``full`` (True if ``flags`` is the complete set
+            rather than a delta), the changed ``flags`` and the ``deleted``
+            flag IDs
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        headers = {"If-None-Match": f'"{since}"'} if since else {}
+
+        try:
+            response = self.session.get(
+                f"{self.base_url}/flags",
+                params={"environment": environment, "since": since or 0},
+                headers=headers,
+                timeout=self.timeout,
+            )
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to get flag changes: {str(e)}")
+
+    @timed("rest")
     def get_flag(self, flag_id: str) -> Dict[str, Any]:
         """
         Get a specific feature flag by ID.
@@ -70,6 +223,7 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to get flag: {str(e)}")
 
+    @timed("rest")
     def create_flag(self, flag_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new feature flag.
@@ -92,6 +246,7 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to create flag: {str(e)}")
 
+    @timed("rest")
     def update_flag(self, flag_id: str, flag_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update an existing feature flag.
@@ -118,6 +273,7 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to update flag: {str(e)}")
 
+    @timed("rest")
     def delete_flag(self, flag_id: str) -> Dict[str, str]:
         """
         Delete a feature flag.
@@ -143,6 +299,7 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to delete flag: {str(e)}")
 
+    @timed("rest")
     def toggle_flag(self, flag_id: str) -> Dict[str, Any]:
         """
         Toggle a feature flag on/off.
@@ -168,6 +325,7 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to toggle flag: {str(e)}")
 
+    @timed("rest")
     def kill_switch(self, flag_id: str, reason: str) -> Dict[str, Any]:
         """
         Activate kill switch for a flag (emergency disable).
@@ -196,34 +354,78 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to activate kill switch: {str(e)}")
 
+    @timed("rest")
     def evaluate_flag(
-        self, flag_id: str, user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None
+        self,
+        flag_id: str,
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+        default: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Evaluate a feature flag for a user/context.
 
+        When the API is unavailable, or the circuit breaker is open, the flag
+        is evaluated from the snapshot if there is one, and otherwise
+        ``default`` is returned.
+
         Args:
             flag_id: Flag identifier
             user_id: User identifier
             context: Evaluation context (IP, device, custom fields)
+            default: Enabled value to fall back to; overrides default_values
 
         Returns:
             Evaluation result with enabled status and reason
 
         Raises:
-            EvaluationError: If evaluation fails
+            EvaluationError: If evaluation fails and there is no fallback
         """
-        try:
-            response = self.session.post(
-                f"{self.base_url}/evaluate",
-                json={"flagId": flag_id, "userId": user_id, "context": context or {}},
-                timeout=self.timeout,
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise EvaluationError(f"Failed to evaluate flag: {str(e)}")
+        if self.cache is not None:
+            key = self.cache.make_key(flag_id, user_id, context)
+            cached = self.cache.get(key)
+            if self.metrics is not None:
+                (self._cache_misses if cached is None else self._cache_hits).inc()
+            if cached is not None:
+                return cached
+            version = self.cache.version(flag_id)
+
+        if default is None:
+            default = self.default_values.get(flag_id)
+        # Skip the batch window too: the request would fail anyway
+        if self.circuit_breaker is not None and self.circuit_breaker.state == CircuitBreaker.OPEN:
+            fallback = self._fallback(flag_id, context, default)
+            if fallback:
+                return fallback
+
+        if self._batcher is not None:
+            try:
+                result = self._batcher.submit(flag_id, user_id, context).result()
+            except EvaluationError as e:
+                fallback = _is_unavailable(e.__cause__) and self._fallback(flag_id, context, default)
+                if fallback:
+                    return fallback
+                raise
+        else:
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/evaluate",
+                    json={"flagId": flag_id, "userId": user_id, "context": context or {}},
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                result = response.json()
+            except requests.RequestException as e:
+                fallback = _is_unavailable(e) and self._fallback(flag_id, context, default)
+                if fallback:
+                    return fallback
+                raise EvaluationError(f"Failed to evaluate flag: {str(e)}")
+
+        if self.cache is not None:
+            self.cache.set(key, result, version)
+        return result
 
+    @timed("rest")
     def bulk_evaluate(
         self, flag_ids: List[str], user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Dict[str, Any]]:
@@ -241,27 +443,476 @@ class FeatureFlagClient:
         Raises:
             EvaluationError: If bulk evaluation fails
         """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = flag_ids
+        if self.cache is not None:
+            keys = {flag_id: self.cache.make_key(flag_id, user_id, context) for flag_id in flag_ids}
+            pending = []
+            for flag_id in flag_ids:
+                cached = self.cache.get(keys[flag_id])
+                if cached is not None:
+                    results[flag_id] = cached
+                else:
+                    pending.append(flag_id)
+            if self.metrics is not None:
+                self._cache_hits.inc(len(flag_ids) - len(pending))
+                self._cache_misses.inc(len(pending))
+            if not pending:
+                return results
+            versions = {flag_id: self.cache.version(flag_id) for flag_id in pending}
+
+        fetched: Dict[str, Dict[str, Any]] = {}
+        try:
+            for start in range(0, len(pending), self.bulk_chunk_size):
+                chunk = pending[start:start + self.bulk_chunk_size]
+                fetched.update(self._post_bulk(chunk, user_id, context))
+        except requests.RequestException as e:
+            raise EvaluationError(f"Failed to bulk evaluate flags: {str(e)}")
+
+        if self.cache is not None:
+            for flag_id, result in fetched.items():
+                # Lookup errors are transient and must not be cached
+                if flag_id in versions and "error" not in result:
+                    self.cache.set(keys[flag_id], result, versions[flag_id])
+        results.update(fetched)
+        return results
+
+    @timed("rest")
+    def evaluate_all(
+        self,
+        environment: str = "development",
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate every flag of an environment for one user.
+
+        The last response per (environment, user, context) is remembered with
+        its ETag; repeating the call sends ``If-None-Match`` and an unchanged
+        flag set is answered with a 304 from memory.
+
+        Args:
+            environment: Environment name (development, staging, production)
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            EvaluationError: If evaluation fails
+        """
+        key = (environment, context_digest(user_id, context))
+        remembered = self._bootstraps.get(key)
+        headers = {"If-None-Match": remembered[0]} if remembered else {}
+
         try:
             response = self.session.post(
-                f"{self.base_url}/evaluate/bulk",
-                json={"flagIds": flag_ids, "userId": user_id, "context": context or {}},
+                f"{self.base_url}/evaluate/all",
+                json={"environment": environment, "userId": user_id, "context": context or {}},
+                headers=headers,
                 timeout=self.timeout,
             )
+            if response.status_code == 304 and remembered:
+                return dict(remembered[1])
+            response.raise_for_status()
+            results = response.json()
+        except requests.RequestException as e:
+            snapshot = self.load_snapshot() if _is_unavailable(e) else None
+            if snapshot is not None and snapshot.environment == environment:
+                return {flag["id"]: self.engine.evaluate(flag, context) for flag in snapshot}
+            raise EvaluationError(f"Failed to evaluate flags: {str(e)}")
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._bootstraps.set(key, etag, results)
+        return dict(results)
+
+    def _post_bulk(
+        self, flag_ids: List[str], user_id: Optional[str], context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Send one /evaluate/bulk request."""
+        response = self.session.post(
+            f"{self.base_url}/evaluate/bulk",
+            json={"flagIds": flag_ids, "userId": user_id, "context": context or {}},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @timed("rest")
+    def send_evaluation_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Report evaluations performed client-side.
+
+        Args:
+            events: Events with 'flagId', 'enabled', and optionally 'userId',
+                    'context' and 'timestamp' (epoch milliseconds)
+
+        Returns:
+            Counts of accepted and dropped events
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        try:
+            response = self.session.post(
+                f"{self.base_url}/evaluate/events", json={"events": events}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, TypeError, ValueError) as e:
+            # TypeError / ValueError: a context value is not JSON serializable
+            raise FeatureFlagError(f"Failed to send evaluation events: {str(e)}")
+
+    @timed("rest")
+    def get_all_segments(self) -> List[Dict[str, Any]]:
+        """
+        Get all segments.
+
+        Returns:
+            List of segments
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/segments", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-            raise EvaluationError(f"Failed to bulk evaluate flags: {str(e)}")
+            raise FeatureFlagError(f"Failed to get segments: {str(e)}")
+
+    @timed("rest")
+    def get_segment(self, segment_id: str) -> Dict[str, Any]:
+        """
+        Get a specific segment by ID.
+
+        Args:
+            segment_id: Segment identifier
+
+        Returns:
+            Segment details
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If the request fails
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/segments/{segment_id}", timeout=self.timeout)
+            if response.status_code == 404:
+                raise SegmentNotFoundError(f"Segment {segment_id} not found")
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to get segment: {str(e)}")
+
+    @timed("rest")
+    def create_segment(self, segment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create a new segment.
+
+        Args:
+            segment_data: Segment name, description and conditions
+
+        Returns:
+            Created segment details
+
+        Raises:
+            FeatureFlagError: If creation fails
+        """
+        try:
+            response = self.session.post(f"{self.base_url}/segments", json=segment_data, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to create segment: {str(e)}")
+
+    @timed("rest")
+    def update_segment(self, segment_id: str, segment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update an existing segment.
+
+        Args:
+            segment_id: Segment identifier
+            segment_data: Updated name, description and conditions
+
+        Returns:
+            Updated segment details
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If update fails
+        """
+        try:
+            response = self.session.put(
+                f"{self.base_url}/segments/{segment_id}", json=segment_data, timeout=self.timeout
+            )
+            if response.status_code == 404:
+                raise SegmentNotFoundError(f"Segment {segment_id} not found")
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to update segment: {str(e)}")
+
+    @timed("rest")
+    def delete_segment(self, segment_id: str) -> Dict[str, str]:
+        """
+        Delete a segment and its members.
+
+        Args:
+            segment_id: Segment identifier
+
+        Returns:
+            Deletion confirmation
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If deletion fails
+        """
+        try:
+            response = self.session.delete(f"{self.base_url}/segments/{segment_id}", timeout=self.timeout)
+            if response.status_code == 404:
+                raise SegmentNotFoundError(f"Segment {segment_id} not found")
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to delete segment: {str(e)}")
+
+    @timed("rest")
+    def download_segment_members(
+        self, segment_id: str, page_size: int = 10000, known_version: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Download every member of a segment.
+
+        Pages are fetched in member ID order. If the members change during
+        the download, it starts over, so the result is a consistent version.
+
+        Args:
+            segment_id: Segment identifier
+            page_size: Members per request (at most 10000)
+            known_version: Version already held; if it is still current,
+                           nothing is downloaded
+
+        Returns:
+            Dictionary with the membership ``version`` and the ``members``
+            list, or None if ``known_version`` is current
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If the request fails or the members keep changing
+        """
+        for _ in range(_SEGMENT_DOWNLOAD_ATTEMPTS):
+            version, members, cursor = None, [], None
+            while True:
+                # A known version is checked with a one-member first page
+                limit = 1 if known_version and version is None else page_size
+                page = self._get_segment_page(segment_id, cursor, limit)
+                if version is not None and page["version"] != version:
+                    break
+                if known_version is not None and page["version"] == known_version:
+                    return None
+                version = page["version"]
+                members.extend(page["members"])
+                cursor = page["nextCursor"]
+                if cursor is None:
+                    return {"version": version, "members": members}
+        raise FeatureFlagError(f"Segment {segment_id} changed during every download attempt")
+
+    @timed("rest")
+    def upload_segment_members(
+        self,
+        segment_id: str,
+        members: Iterable[str],
+        replace: bool = True,
+        chunk_size: int = 50000,
+    ) -> int:
+        """
+        Upload segment members in bulk.
+
+        Args:
+            segment_id: Segment identifier
+            members: Member (user) IDs
+            replace: Replace the current members in one atomic request;
+                     otherwise add to them in requests of ``chunk_size``
+            chunk_size: Members per request when adding
+
+        Returns:
+            Number of members stored (replace) or newly added
+
+        Raises:
+            SegmentNotFoundError: If segment doesn't exist
+            FeatureFlagError: If the upload fails
+        """
+        members = list(members)
+        if replace:
+            return self._send_segment_members("PUT", segment_id, members)["total"]
+        return sum(
+            self._send_segment_members("POST", segment_id, members[i:i + chunk_size])["added"]
+            for i in range(0, len(members), chunk_size)
+        )
+
+    @timed("rest")
+    def remove_segment_members(self, segment_id: str, members: Iterable[str], chunk_size: int = 50000) -> int:
+        """
+        Remove members from a segment.
+
+        Args:
+            segment_id: Segment identifier
+            members: Member (user) IDs
+            chunk_size: Members per request
+
+        Returns:
+            Number of members removed
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        members = list(members)
+        return sum(
+            self._send_segment_members("DELETE", segment_id, members[i:i + chunk_size])["removed"]
+            for i in range(0, len(members), chunk_size)
+        )
+
+    def _get_segment_page(self, segment_id: str, cursor: Optional[str], page_size: int) -> Dict[str, Any]:
+        params = {"limit": page_size}
+        if cursor is not None:
+            params["cursor"] = cursor
+        try:
+            response = self.session.get(
+                f"{self.base_url}/segments/{segment_id}/members", params=params, timeout=self.timeout
+            )
+            if response.status_code == 404:
+                raise SegmentNotFoundError(f"Segment {segment_id} not found")
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to download segment members: {str(e)}")
+
+    def _send_segment_members(self, method: str, segment_id: str, members: List[str]) -> Dict[str, Any]:
+        try:
+            response = self.session.request(
+                method,
+                f"{self.base_url}/segments/{segment_id}/members",
+                json={"members": members},
+                timeout=self.timeout,
+            )
+            if response.status_code == 404:
+                raise SegmentNotFoundError(f"Segment {segment_id} not found")
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to upload segment members: {str(e)}")
+
+    @timed("rest")
+    def get_audit_log_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 500,
+        flag_id: Optional[str] = None,
+        action: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of audit logs, newest first.
+
+        Args:
+            cursor: ``nextCursor`` of the previous page; None for the first page
+            limit: Entries per page (at most 5000)
+            flag_id: Only entries of this flag
+            action: Only entries with this action (CREATE, UPDATE, ...)
+            user_id: Only entries by this user
+            start: Only entries at or after this time (datetime or ISO 8601 string)
+            end: Only entries before this time
+
+        Returns:
+            Dictionary with the ``items`` and the ``nextCursor``, which is
+            None on the last page
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        params = _audit_params(flag_id, action, user_id, start, end)
+        params["limit"] = limit
+        if cursor is not None:
+            params["cursor"] = cursor
+        try:
+            response = self.session.get(f"{self.base_url}/audit/page", params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise FeatureFlagError(f"Failed to get audit logs: {str(e)}")
 
-    def get_analytics(self, flag_id: str, time_range: str = "24h") -> Dict[str, Any]:
+    def iter_audit_logs(
+        self,
+        flag_id: Optional[str] = None,
+        action: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+        page_size: int = 1000,
+        prefetch: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every matching audit log entry, newest first.
+
+        Pages are fetched lazily, so at most two pages are held in memory.
+        With ``prefetch``, the next page is requested in the background
+        while the current one is consumed.
+
+        Args:
+            flag_id: Only entries of this flag
+            action: Only entries with this action
+            user_id: Only entries by this user
+            start: Only entries at or after this time
+            end: Only entries before this time
+            page_size: Entries per request (at most 5000)
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Audit log entries
+
+        Raises:
+            FeatureFlagError: If a request fails
+        """
+        def fetch(cursor: Optional[str]) -> Dict[str, Any]:
+            return self.get_audit_log_page(cursor, page_size, flag_id, action, user_id, start, end)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = fetch(None)
+            while True:
+                cursor = page["nextCursor"]
+                upcoming = executor.submit(fetch, cursor) if cursor is not None and prefetch else None
+                yield from page["items"]
+                if cursor is None:
+                    return
+                page = upcoming.result() if upcoming is not None else fetch(cursor)
+
+    @timed("rest")
+    def get_analytics(
+        self,
+        flag_id: str,
+        time_range: str = "24h",
+        start: Optional[Union[datetime, str]] = None,
+        end: Optional[Union[datetime, str]] = None,
+        bucket: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Get analytics for a specific flag.
 
         Args:
             flag_id: Flag identifier
-            time_range: Time range (1h, 24h, 7d, 30d)
+            time_range: Time range (1h, 24h, 7d, 30d), used when start is not set
+            start: Start of a custom range (datetime or ISO 8601 string)
+            end: End of a custom range (defaults to now)
+            bucket: Timeline bucket size (1m, 5m, 15m, 1h, 6h, 1d; default 1h)
 
         Returns:
-            Analytics data with stats and timeline
+            Analytics data with stats and timeline. unique_users is an
+            approximate distinct count.
 
         Raises:
             FeatureFlagError: If request fails
@@ -269,7 +920,7 @@ class FeatureFlagClient:
         try:
             response = self.session.get(
                 f"{self.base_url}/analytics/flags/{flag_id}",
-                params={"timeRange": time_range},
+                params=_analytics_params(time_range, start, end, bucket),
                 timeout=self.timeout,
             )
             response.raise_for_status()
@@ -277,6 +928,7 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to get analytics: {str(e)}")
 
+    @timed("rest")
     def get_system_metrics(self) -> Dict[str, int]:
         """
         Get system-wide metrics.
@@ -296,8 +948,72 @@ class FeatureFlagClient:
         except requests.RequestException as e:
             raise FeatureFlagError(f"Failed to get system metrics: {str(e)}")
 
+    def load_snapshot(self) -> Optional[FlagSnapshot]:
+        """
+        Get the persisted flag snapshot, memory-mapping it on first use.
+
+        Returns:
+            The snapshot, or None if no valid snapshot file exists
+        """
+        snapshot = self._snapshot
+        if snapshot is None and self.snapshot_path:
+            with self._snapshot_lock:
+                if self._snapshot is None:
+                    try:
+                        self._snapshot = FlagSnapshot.open(self.snapshot_path)
+                    except SnapshotError:
+                        return None
+                snapshot = self._snapshot
+        return snapshot
+
+    def _save_snapshot(self, flags: List[Dict[str, Any]], environment: str):
+        """Persist a successful get_all_flags result in the background."""
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.submit(flags, environment)
+
+    def _release_snapshot(self):
+        """Drop the mapped snapshot after the file was replaced; the next use maps the new one."""
+        # Other threads may still be reading the old mapping, so it is not
+        # closed; it is released once the last of them drops it.
+        with self._snapshot_lock:
+            self._snapshot = None
+
+    def _snapshot_file_age(self) -> Optional[float]:
+        """Seconds since the snapshot file was written, or None if there is none."""
+        try:
+            return time.time() - os.path.getmtime(self.snapshot_path)
+        except OSError:
+            return None
+
+    def _evaluate_from_snapshot(
+        self, flag_id: str, context: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Evaluate a flag locally from the snapshot when the API is unreachable."""
+        snapshot = self.load_snapshot()
+        flag = snapshot.get(flag_id) if snapshot is not None else None
+        if flag is None:
+            return None
+        return self.engine.evaluate(flag, context)
+
+    def _fallback(
+        self, flag_id: str, context: Optional[Dict[str, Any]], default: Optional[bool]
+    ) -> Optional[Dict[str, Any]]:
+        """Answer an evaluation the API cannot serve: from the snapshot, else with the default."""
+        result = self._evaluate_from_snapshot(flag_id, context)
+        if result is None and default is not None:
+            result = {"enabled": default, "reason": "Default value (API unavailable)"}
+        return result
+
     def close(self):
-        """Close the HTTP session."""
+        """Flush pending batched evaluations and close the HTTP session."""
+        if self._batcher is not None:
+            self._batcher.close()
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+        with self._snapshot_lock:
+            self._snapshot = None
+        if self.metrics is not None and self.snapshot_path:
+            self.metrics.remove_gauge("snapshot_age_seconds", source="file", path=self.snapshot_path)
         self.session.close()
 
     def __enter__(self):
@@ -306,4 +1022,42 @@ class FeatureFlagClient:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+def _is_unavailable(error: Optional[BaseException]) -> bool:
+    """Check if a request failed because the API could not serve it at all."""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, requests.RequestException)
+
+
+def _audit_params(
+    flag_id: Optional[str],
+    action: Optional[str],
+    user_id: Optional[str],
+    start: Optional[Union[datetime, str]],
+    end: Optional[Union[datetime, str]],
+) -> Dict[str, str]:
+    """Build the filter parameters of an audit log request."""
+    params = {}
+    for name, value in (("flagId", flag_id), ("action", action), ("userId", user_id), ("from", start), ("to", end)):
+        if value is not None:
+            params[name] = value.isoformat() if isinstance(value, datetime) else value
+    return params
+
+
+def _analytics_params(
+    time_range: str,
+    start: Optional[Union[datetime, str]],
+    end: Optional[Union[datetime, str]],
+    bucket: Optional[str],
+) -> Dict[str, str]:
+    """Build the query parameters of an analytics request."""
+    params = {"timeRange": time_range}
+    for name, value in (("from", start), ("to", end)):
+        if value is not None:
+            params[name] = value.isoformat() if isinstance(value, datetime) else value
+    if bucket is not None:
+        params["bucket"] = bucket
+    return params
@@ -23,4 +23,14 @@ class ConnectionError(FeatureFlagError):
 
 class ValidationError(FeatureFlagError):
     """Exception raised when input validation fails."""
-    pass
\ No newline at end of file
+    pass
+
+
+class SnapshotError(FeatureFlagError):
+    """Exception raised when a flag snapshot file is missing or corrupt."""
+    pass
+
+
+class SegmentNotFoundError(FeatureFlagError):
+    """Exception raised when a segment is not found."""
+    pass
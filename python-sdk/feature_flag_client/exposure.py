@@ -0,0 +1,202 @@
+"""Background batching of client-side evaluation (exposure) events."""
+
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .exceptions import FeatureFlagError
+
+logger = logging.getLogger(__name__)
+
+EventSender = Callable[[List[Dict[str, Any]]], Any]
+
+_STOP = object()
+
+
+class ExposureReporter:
+    """
+    Reports locally evaluated flags to ``/evaluate/events`` in batches.
+
+    ``record`` never blocks and never performs I/O: events go onto a bounded
+    queue drained by a background thread, which sends them when
+    ``batch_size`` events are waiting or ``flush_interval`` seconds have
+    passed. When the queue is full, new events are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        send_events: EventSender,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_queue_size: int = 10000,
+        sample_rate: float = 1.0,
+    ):
+        """
+        Initialize the reporter.
+
+        Args:
+            send_events: Function sending a list of events, usually
+                         ``FeatureFlagClient.send_evaluation_events``
+            batch_size: Maximum number of events per request
+            flush_interval: Maximum time in seconds an event waits to be sent
+            max_queue_size: Number of queued events beyond which new events
+                            are dropped
+            sample_rate: Fraction of events recorded (1.0 records every event)
+        """
+        self.send_events = send_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._stats = {"recorded": 0, "sampled_out": 0, "dropped": 0, "sent": 0, "failed": 0}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Orders flush markers before the stop signal, so none is left behind
+        # on the queue once the thread has exited
+        self._stop_lock = threading.Lock()
+
+    def record(
+        self,
+        flag_id: str,
+        enabled: bool,
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Queue an evaluation event.
+
+        Args:
+            flag_id: Flag identifier
+            enabled: Evaluation result
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            True if the event was queued, False if it was sampled out or dropped
+        """
+        if self._closed:
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._count("sampled_out")
+            return False
+
+        event = {
+            "flagId": flag_id,
+            "userId": user_id,
+            "enabled": bool(enabled),
+            "context": context or {},
+            "timestamp": int(time.time() * 1000),
+        }
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("recorded")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Send every event queued so far.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the queued events were handed to ``send_events`` in time
+        """
+        thread = self._thread
+        if thread is None:
+            return True
+        done = threading.Event()
+        with self._stop_lock:
+            if self._closed or not thread.is_alive():
+                # close() already sent, or is sending, what was queued
+                return not thread.is_alive()
+            self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Send the remaining events and stop the background thread."""
+        with self._stop_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Get event counters and the current queue depth."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        """Drain the queue, sending full batches or whatever is due."""
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            # A full batch, an expired deadline, a flush marker or the stop
+            # signal: send what has been collected so far.
+            if batch:
+                self._send(batch)
+                batch, deadline = [], None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _send(self, batch: List[Dict[str, Any]]):
+        try:
+            self.send_events(batch)
+        except FeatureFlagError as e:
+            self._count("failed", len(batch))
+            logger.warning("Failed to report %d evaluation events: %s", len(batch), e)
+            return
+        except Exception:
+            # Any other error must not end the worker: nothing would drain
+            # the queue afterwards and flush() would wait forever.
+            self._count("failed", len(batch))
+            logger.exception("Failed to report %d evaluation events", len(batch))
+            return
+        self._count("sent", len(batch))
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
@@ -0,0 +1,387 @@
+"""In-memory flag store kept current by WebSocket pushes or polling."""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .client import FeatureFlagClient
+from .exceptions import FeatureFlagError, SnapshotError
+from .exposure import ExposureReporter
+from .metrics import SDKMetrics
+from .rule_engine import RuleEngine
+from .snapshot import FlagSnapshot, SnapshotWriter
+from .websocket_client import WebSocketClient
+
+logger = logging.getLogger(__name__)
+
+
+class FlagStore:
+    """
+    Local copy of an environment's flags for in-process evaluation.
+
+    The store loads a full snapshot with ``get_all_flags`` and then applies the
+    ``flag_update`` events broadcast by the backend. Every (re)connection of the
+    WebSocket triggers a fresh snapshot, so updates missed while disconnected
+    are never lost.
+
+    Services that cannot hold a WebSocket open set ``poll_interval`` instead:
+    the store then polls ``/flags`` with the last seen flag set version, so an
+    unchanged environment costs a 304 and a changed one only the changed flags.
+    """
+
+    def __init__(
+        self,
+        client: FeatureFlagClient,
+        environment: str = "development",
+        ws_url: str = "ws://localhost:3001/ws",
+        engine: Optional[RuleEngine] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        snapshot_path: Optional[str] = None,
+        exposure_reporter: Optional[ExposureReporter] = None,
+        poll_interval: Optional[float] = None,
+        poll_jitter: float = 0.1,
+        metrics: Optional[SDKMetrics] = None,
+    ):
+        """
+        Initialize the flag store.
+
+        Args:
+            client: REST client used to load snapshots
+            environment: Environment whose flags are kept in memory
+            ws_url: WebSocket server URL
+            engine: Rule engine used for local evaluation
+            reconnect_delay: Initial WebSocket reconnect delay in seconds
+            max_reconnect_delay: Upper bound for the reconnect backoff
+            snapshot_path: File the store is persisted to after changes, in
+                           the background, and warm-started from before the
+                           network is up
+            exposure_reporter: If set, every local evaluation of a known flag
+                               is reported through it
+            poll_interval: If set, poll for changes every this many seconds
+                           instead of listening on the WebSocket
+            poll_jitter: Fraction by which each poll interval is randomly
+                         stretched or shrunk, so that instances started
+                         together do not poll in lockstep
+            metrics: Registry recording local evaluation latency, the age
+                     of the flags and WebSocket reconnects. Each environment
+                     can have one running store per registry
+        """
+        self.client = client
+        self.environment = environment
+        self.engine = engine or RuleEngine()
+        self.snapshot_path = snapshot_path
+        self._snapshot_writer: Optional[SnapshotWriter] = None
+        if snapshot_path:
+            # Share the client's writer for the same file, so a refresh that
+            # the client already persisted is not written a second time.
+            shared = client.snapshot_writer
+            if shared is not None and os.path.abspath(shared.path) == os.path.abspath(snapshot_path):
+                self._snapshot_writer = shared
+            else:
+                self._snapshot_writer = SnapshotWriter(snapshot_path)
+        self.exposure_reporter = exposure_reporter
+        self.poll_interval = poll_interval
+        self.poll_jitter = poll_jitter
+        self.last_synced: Optional[float] = None
+        self.version: Optional[str] = None
+        self._flags: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._stopped = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        self._evaluations = None
+        self.metrics = metrics
+        if metrics is not None:
+            self._evaluations = metrics.histogram("evaluation_duration_seconds", source="store")
+            metrics.gauge("snapshot_age_seconds", self._age, source="store", environment=environment)
+
+        self.ws_client: Optional[WebSocketClient] = None
+        if not poll_interval:
+            self.ws_client = WebSocketClient(
+                ws_url,
+                reconnect=True,
+                reconnect_delay=reconnect_delay,
+                max_reconnect_delay=max_reconnect_delay,
+                environments=[environment],
+                metrics=metrics,
+            )
+            self.ws_client.on_connect(self._on_connect)
+            self.ws_client.on_flag_update(self._on_flag_update)
+
+    def start(self):
+        """
+        Load the initial snapshot and start receiving updates.
+
+        A failed initial load is not fatal: the store keeps retrying through
+        the WebSocket reconnect loop, or the next poll, until a snapshot
+        succeeds. Meanwhile it serves the on-disk snapshot, if one is
+        configured.
+        """
+        self.load_snapshot()
+        if self.poll_interval:
+            try:
+                self.sync()
+            except FeatureFlagError as e:
+                logger.warning("Initial flag snapshot failed: %s", e)
+            self._stopped.clear()
+            self._poller = threading.Thread(target=self._poll, daemon=True)
+            self._poller.start()
+            return
+
+        try:
+            self.refresh()
+        except FeatureFlagError as e:
+            logger.warning("Initial flag snapshot failed: %s", e)
+        self.ws_client.connect()
+
+    def stop(self):
+        """Stop receiving updates and send any pending exposure events."""
+        if self._poller is not None:
+            self._stopped.set()
+            self._poller.join()
+            self._poller = None
+        if self.ws_client is not None:
+            self.ws_client.disconnect()
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.flush()
+        if self.exposure_reporter is not None:
+            self.exposure_reporter.close()
+        if self.metrics is not None:
+            self.metrics.remove_gauge("snapshot_age_seconds", source="store", environment=self.environment)
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the first snapshot has been loaded.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the store is ready
+        """
+        return self._ready.wait(timeout)
+
+    def is_ready(self) -> bool:
+        """Check if a snapshot has been loaded."""
+        return self._ready.is_set()
+
+    def load_snapshot(self) -> bool:
+        """
+        Warm-start the store from the on-disk snapshot.
+
+        Returns:
+            True if a snapshot for this environment was loaded
+        """
+        if not self.snapshot_path:
+            return False
+        try:
+            with FlagSnapshot.open(self.snapshot_path) as snapshot:
+                if snapshot.environment != self.environment:
+                    return False
+                flags = snapshot.flags()
+                created_at = snapshot.created_at
+        except SnapshotError:
+            return False
+
+        self._snapshot_writer.mark_written(flags, self.environment)
+        with self._lock:
+            self._flags = {flag["id"]: flag for flag in flags}
+            self.last_synced = created_at
+        self._ready.set()
+        return True
+
+    def refresh(self):
+        """
+        Replace the in-memory flags with a fresh snapshot.
+
+        Raises:
+            FeatureFlagError: If the snapshot request fails
+        """
+        flags = self.client.get_all_flags(environment=self.environment)
+        with self._lock:
+            self._flags = {flag["id"]: flag for flag in flags}
+            self.last_synced = time.time()
+        self._ready.set()
+        self._persist()
+        self._notify("snapshot", {})
+
+    def sync(self) -> bool:
+        """
+        Apply the flag changes since the last sync.
+
+        The first sync, and any sync the server's change log cannot answer
+        with a delta, loads the full flag set.
+
+        Returns:
+            True if the flags changed
+
+        Raises:
+            FeatureFlagError: If the request fails
+        """
+        changes = self.client.get_flag_changes(environment=self.environment, since=self.version)
+        if changes is None:
+            self.last_synced = time.time()
+            return False
+
+        with self._lock:
+            if changes["full"]:
+                self._flags = {flag["id"]: flag for flag in changes["flags"]}
+            else:
+                for flag in changes["flags"]:
+                    self._flags[flag["id"]] = flag
+                for flag_id in changes["deleted"]:
+                    self._flags.pop(flag_id, None)
+            self.version = changes["version"]
+            self.last_synced = time.time()
+        self._ready.set()
+        self._persist()
+
+        if changes["full"]:
+            self._notify("snapshot", {})
+        else:
+            for flag in changes["flags"]:
+                self._notify("update", flag)
+            for flag_id in changes["deleted"]:
+                self._notify("delete", {"id": flag_id, "environment": self.environment})
+        return True
+
+    def on_change(self, callback: Callable[[str, Dict[str, Any]], None]):
+        """
+        Register callback for changes applied to the store.
+
+        Args:
+            callback: Function receiving the action ('snapshot', 'create',
+                      'update', 'delete', 'toggle', 'killswitch') and the flag
+        """
+        self._listeners.append(callback)
+
+    def get_flag(self, flag_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a flag from memory.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Flag details, or None if the flag is unknown
+        """
+        return self._flags.get(flag_id)
+
+    def all_flags(self) -> List[Dict[str, Any]]:
+        """Get every flag currently in memory."""
+        return list(self._flags.values())
+
+    def evaluate(self, flag_id: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Evaluate a flag locally.
+
+        Args:
+            flag_id: Flag identifier
+            context: Evaluation context
+
+        Returns:
+            Evaluation result with enabled status and reason
+        """
+        flag = self._flags.get(flag_id)
+        if flag is None:
+            return {"enabled": False, "reason": "Flag not found"}
+        if self._evaluations is None:
+            result = self.engine.evaluate(flag, context)
+        else:
+            start = time.perf_counter()
+            result = self.engine.evaluate(flag, context)
+            self._evaluations.observe(time.perf_counter() - start)
+        if self.exposure_reporter is not None:
+            user_id = context.get("userId") if context else None
+            self.exposure_reporter.record(flag_id, result["enabled"], user_id, context)
+        return result
+
+    def is_enabled(self, flag_id: str, context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Check if a flag is enabled for a context.
+
+        Args:
+            flag_id: Flag identifier
+            context: Evaluation context
+
+        Returns:
+            True if the flag evaluates to enabled
+        """
+        return self.evaluate(flag_id, context)["enabled"]
+
+    def _poll(self):
+        """Sync at jittered intervals until stopped."""
+        while True:
+            jitter = random.uniform(-self.poll_jitter, self.poll_jitter)
+            if self._stopped.wait(self.poll_interval * (1 + jitter)):
+                return
+            try:
+                self.sync()
+            except FeatureFlagError as e:
+                logger.warning("Flag poll failed: %s", e)
+
+    def _on_connect(self):
+        """Resync after every (re)connection so no update is missed."""
+        try:
+            self.refresh()
+        except FeatureFlagError as e:
+            logger.warning("Flag snapshot failed, reconnecting: %s", e)
+            # Dropping the socket sends us back through the reconnect backoff.
+            self.ws_client.ws.close()
+
+    def _on_flag_update(self, data: Dict[str, Any]):
+        """Apply a ``flag_update`` event from ``broadcastFlagUpdate``."""
+        action = data.get("action")
+        flag = data.get("flag") or {}
+        flag_id = flag.get("id")
+        if not flag_id or flag.get("environment") != self.environment:
+            return
+
+        with self._lock:
+            if action == "delete":
+                if self._flags.pop(flag_id, None) is None:
+                    return
+            else:
+                current = self._flags.get(flag_id)
+                if current and _is_older(flag, current):
+                    return
+                if action == "killswitch":
+                    flag = {k: v for k, v in flag.items() if k != "reason"}
+                self._flags[flag_id] = flag
+
+        self._persist()
+        self._notify(action, flag)
+
+    def _persist(self):
+        """Schedule a write of the current flags to the snapshot file."""
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.submit(self.all_flags, self.environment)
+
+    def _age(self) -> Optional[float]:
+        """Seconds since the flags were last synced, or None before the first sync."""
+        last_synced = self.last_synced
+        return None if last_synced is None else time.time() - last_synced
+
+    def _notify(self, action: str, flag: Dict[str, Any]):
+        for callback in self._listeners:
+            callback(action, flag)
+
+    def __enter__(self):
+        """Context manager entry."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
+
+
+def _is_older(flag: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    """Check if an event carries an older flag version than the one stored."""
+    new_version, current_version = flag.get("updated_at"), current.get("updated_at")
+    return bool(new_version and current_version and new_version < current_version)
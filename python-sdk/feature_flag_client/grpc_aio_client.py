@@ -0,0 +1,375 @@
+"""Asyncio gRPC client for Feature Flag Management System, built on grpc.aio."""
+
+import asyncio
+import itertools
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import grpc
+
+from .cache import ETagMemo, context_digest
+from .exceptions import FeatureFlagError, FlagNotFoundError
+from .grpc_client import (
+    DEFAULT_MAX_MESSAGE_SIZE,
+    _build_context,
+    _flag_to_dict,
+    channel_options,
+    feature_flag_pb2,
+    feature_flag_pb2_grpc,
+)
+from .metrics import SDKMetrics, timed_async
+
+_EVALUATE_FLAG = "/featureflag.FeatureFlagService/EvaluateFlag"
+
+
+class AsyncGrpcFeatureFlagClient:
+    """
+    Asyncio client for the Feature Flag gRPC service.
+
+    Calls are spread round-robin over a small pool of channels, each with its
+    own HTTP/2 connection, and many calls are multiplexed on each one.
+    ``evaluate_many`` pipelines one ``EvaluateFlag`` call per flag: the user
+    and context are encoded once and shared by every request.
+
+    Channels bind to the event loop they are created on, so ``connect`` (or
+    the first call) must run on the loop that uses the client.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 50051,
+        pool_size: int = 4,
+        max_in_flight: int = 400,
+        timeout: Optional[float] = None,
+        keepalive_time: float = 30.0,
+        keepalive_timeout: float = 10.0,
+        max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE,
+        options: Optional[List[Tuple[str, Any]]] = None,
+        metrics: Optional[SDKMetrics] = None,
+    ):
+        """
+        Initialize the async gRPC Feature Flag client.
+
+        Args:
+            host: gRPC server host
+            port: gRPC server port
+            pool_size: Number of channels (HTTP/2 connections)
+            max_in_flight: Maximum concurrent calls across the pool; keep it
+                           below pool_size times the server's stream limit
+                           (usually 100) so calls never queue on a connection
+            timeout: Per-call deadline in seconds
+            keepalive_time: Seconds between keepalive pings while calls are active
+            keepalive_timeout: Seconds to wait for a ping ack
+            max_message_size: Largest message sent or received, in bytes
+            options: Extra channel options, applied after the ones above
+            metrics: Registry recording call latency and errors
+        """
+        if feature_flag_pb2 is None or feature_flag_pb2_grpc is None:
+            raise ImportError(
+                "gRPC protobuf files not found. Generate them using:\n"
+                "python -m grpc_tools.protoc -I. --python_out=. --grpc_python_out=. feature_flag.proto"
+            )
+
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.options = (
+            channel_options(keepalive_time, keepalive_timeout, max_message_size)
+            # Without this, channels with equal options share one connection
+            + [("grpc.use_local_subchannel_pool", 1)]
+            + list(options or [])
+        )
+        self.metrics = metrics
+        self._channels: List["grpc.aio.Channel"] = []
+        self._stubs: List[Any] = []
+        self._evaluators: List[Any] = []
+        self._next = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._bootstraps = ETagMemo()
+
+    async def connect(self):
+        """Open the channel pool; does nothing if it is already open."""
+        if self._channels:
+            return
+        target = f"{self.host}:{self.port}"
+        self._channels = [grpc.aio.insecure_channel(target, options=self.options) for _ in range(self.pool_size)]
+        self._stubs = [feature_flag_pb2_grpc.FeatureFlagServiceStub(channel) for channel in self._channels]
+        # Takes pre-encoded request bytes, see _evaluate_payload
+        self._evaluators = [
+            channel.unary_unary(
+                _EVALUATE_FLAG,
+                request_serializer=None,
+                response_deserializer=feature_flag_pb2.EvaluateResponse.FromString,
+            )
+            for channel in self._channels
+        ]
+        self._next = itertools.cycle(range(self.pool_size))
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self):
+        """Close every channel of the pool."""
+        channels, self._channels = self._channels, []
+        self._stubs, self._evaluators = [], []
+        await asyncio.gather(*(channel.close() for channel in channels))
+
+    @timed_async("grpc")
+    async def evaluate_flag(
+        self,
+        flag_id: str,
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a feature flag via gRPC.
+
+        Args:
+            flag_id: Flag identifier
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary with 'enabled' and 'reason' keys
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If evaluation fails
+        """
+        await self.connect()
+        return await self._evaluate(flag_id, _evaluate_payload(user_id, context))
+
+    @timed_async("grpc")
+    async def evaluate_many(
+        self,
+        flag_ids: List[str],
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate several flags with concurrent ``EvaluateFlag`` calls.
+
+        Unlike ``bulk_evaluate``, results do not wait for the slowest flag of
+        a single server-side batch, and calls spread over every channel.
+
+        Args:
+            flag_ids: List of flag identifiers
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results; unknown flags
+            evaluate to disabled with reason 'Flag not found'
+
+        Raises:
+            FeatureFlagError: If evaluation fails
+        """
+        await self.connect()
+        payload = _evaluate_payload(user_id, context)
+        results = await asyncio.gather(
+            *(self._evaluate(flag_id, payload) for flag_id in flag_ids),
+            return_exceptions=True,
+        )
+
+        evaluated = {}
+        for flag_id, result in zip(flag_ids, results):
+            if isinstance(result, FlagNotFoundError):
+                result = {"enabled": False, "reason": "Flag not found"}
+            elif isinstance(result, BaseException):
+                raise result
+            evaluated[flag_id] = result
+        return evaluated
+
+    @timed_async("grpc")
+    async def get_flag(self, flag_id: str) -> Dict[str, Any]:
+        """
+        Get flag details via gRPC.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Flag details dictionary
+
+        Raises:
+            FlagNotFoundError: If flag doesn't exist
+            FeatureFlagError: If request fails
+        """
+        await self.connect()
+        try:
+            response = await self._stub().GetFlag(
+                feature_flag_pb2.GetFlagRequest(flag_id=flag_id), timeout=self.timeout
+            )
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                raise FlagNotFoundError(f"Flag {flag_id} not found")
+            raise FeatureFlagError(f"gRPC request failed: {str(e)}")
+        return _flag_to_dict(response)
+
+    @timed_async("grpc")
+    async def bulk_evaluate(
+        self,
+        flag_ids: List[str],
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate multiple flags in one gRPC call.
+
+        Args:
+            flag_ids: List of flag identifiers
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            FeatureFlagError: If evaluation fails
+        """
+        await self.connect()
+        request = feature_flag_pb2.BulkEvaluateRequest(
+            flag_ids=flag_ids,
+            user_id=user_id or "",
+            ctx=_build_context(context),
+        )
+        try:
+            response = await self._stub().BulkEvaluate(request, timeout=self.timeout)
+        except grpc.RpcError as e:
+            raise FeatureFlagError(f"gRPC bulk evaluation failed: {str(e)}")
+        return {
+            flag_id: {"enabled": result.enabled, "reason": result.reason}
+            for flag_id, result in response.results.items()
+        }
+
+    @timed_async("grpc")
+    async def evaluate_all(
+        self,
+        environment: str = "development",
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate every flag of an environment for one user via gRPC.
+
+        The last response per (environment, user, context) is remembered with
+        its ETag; an unchanged flag set is answered from memory.
+
+        Args:
+            environment: Environment name (development, staging, production)
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            FeatureFlagError: If evaluation fails
+        """
+        await self.connect()
+        key = (environment, context_digest(user_id, context))
+        remembered = self._bootstraps.get(key)
+
+        request = feature_flag_pb2.EvaluateAllRequest(
+            environment=environment,
+            user_id=user_id or "",
+            ctx=_build_context(context),
+            etag=remembered[0] if remembered else "",
+        )
+        try:
+            response = await self._stub().EvaluateAll(request, timeout=self.timeout)
+        except grpc.RpcError as e:
+            raise FeatureFlagError(f"gRPC evaluate-all failed: {str(e)}")
+
+        if response.not_modified and remembered:
+            return dict(remembered[1])
+
+        results = {
+            flag_id: {"enabled": result.enabled, "reason": result.reason}
+            for flag_id, result in response.results.items()
+        }
+        if response.etag:
+            self._bootstraps.set(key, response.etag, results)
+        return dict(results)
+
+    async def watch_flags(
+        self,
+        environments: Optional[List[str]] = None,
+        flag_ids: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream flag changes over one of the pooled channels.
+
+        Args:
+            environments: Only watch these environments (default: all)
+            flag_ids: Only watch these flags (default: all)
+
+        Yields:
+            Dictionaries with 'action', 'flag', 'timestamp' and 'reason' keys,
+            shaped like WebSocket ``flag_update`` events
+
+        Raises:
+            FeatureFlagError: If the stream fails
+        """
+        await self.connect()
+        request = feature_flag_pb2.WatchFlagsRequest(
+            environments=environments or [],
+            flag_ids=flag_ids or [],
+        )
+        call = self._stub().WatchFlags(request)
+
+        try:
+            async for update in call:
+                yield {
+                    "action": update.action,
+                    "flag": _flag_to_dict(update.flag),
+                    "timestamp": update.timestamp,
+                    "reason": update.reason,
+                }
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.CANCELLED:
+                raise FeatureFlagError(f"gRPC watch failed: {str(e)}")
+        finally:
+            call.cancel()
+
+    def _stub(self):
+        """Next stub of the pool, round-robin."""
+        return self._stubs[next(self._next)]
+
+    async def _evaluate(self, flag_id: str, payload: bytes) -> Dict[str, Any]:
+        """Send one EvaluateFlag call with a pre-encoded user and context."""
+        async with self._slots:
+            evaluator = self._evaluators[next(self._next)]
+            try:
+                response = await evaluator(_flag_id_field(flag_id) + payload, timeout=self.timeout)
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.NOT_FOUND:
+                    raise FlagNotFoundError(f"Flag {flag_id} not found")
+                raise FeatureFlagError(f"gRPC evaluation failed: {str(e)}")
+        return {"enabled": response.enabled, "reason": response.reason}
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+
+
+def _evaluate_payload(user_id: Optional[str], context: Optional[Dict[str, Any]]) -> bytes:
+    """
+    Encode the user and context fields of an EvaluateRequest.
+
+    Protobuf messages may be split into fields encoded separately, so one
+    payload serves every flag: a request is ``_flag_id_field(flag_id) + payload``.
+    """
+    return feature_flag_pb2.EvaluateRequest(user_id=user_id or "", ctx=_build_context(context)).SerializeToString()
+
+
+@lru_cache(maxsize=4096)
+def _flag_id_field(flag_id: str) -> bytes:
+    """Encode the flag_id field of an EvaluateRequest."""
+    return feature_flag_pb2.EvaluateRequest(flag_id=flag_id).SerializeToString()
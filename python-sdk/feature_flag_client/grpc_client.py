@@ -1,8 +1,11 @@
 """gRPC client for Feature Flag Management System."""
 
+import json
 import grpc
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from .cache import ETagMemo, context_digest
 from .exceptions import FeatureFlagError, FlagNotFoundError, ConnectionError
+from .metrics import SDKMetrics, timed
 
 try:
     from . import feature_flag_pb2
@@ -12,17 +15,60 @@ except ImportError:
     feature_flag_pb2 = None
     feature_flag_pb2_grpc = None
 
+DEFAULT_MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
+
+def channel_options(
+    keepalive_time: float = 30.0,
+    keepalive_timeout: float = 10.0,
+    max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE,
+) -> List[Tuple[str, Any]]:
+    """
+    Build gRPC channel options for talking to the flag service.
+
+    Args:
+        keepalive_time: Seconds between HTTP/2 keepalive pings while calls are active
+        keepalive_timeout: Seconds to wait for a ping ack before dropping the connection
+        max_message_size: Largest message sent or received, in bytes
+
+    Returns:
+        Options for ``grpc.insecure_channel`` / ``grpc.aio.insecure_channel``
+    """
+    return [
+        ("grpc.keepalive_time_ms", int(keepalive_time * 1000)),
+        ("grpc.keepalive_timeout_ms", int(keepalive_timeout * 1000)),
+        # Servers answer pings on idle connections with GOAWAY by default
+        ("grpc.keepalive_permit_without_calls", 0),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.max_send_message_length", max_message_size),
+        ("grpc.max_receive_message_length", max_message_size),
+    ]
+
 
 class GrpcFeatureFlagClient:
     """Client for interacting with Feature Flag Management System via gRPC."""
 
-    def __init__(self, host: str = "localhost", port: int = 50051):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 50051,
+        metrics: Optional[SDKMetrics] = None,
+        keepalive_time: float = 30.0,
+        keepalive_timeout: float = 10.0,
+        max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE,
+        options: Optional[List[Tuple[str, Any]]] = None,
+    ):
         """
         Initialize the gRPC Feature Flag client.
 
         Args:
             host: gRPC server host
             port: gRPC server port
+            metrics: Registry recording call latency and errors
+            keepalive_time: Seconds between keepalive pings while calls are active
+            keepalive_timeout: Seconds to wait for a ping ack
+            max_message_size: Largest message sent or received, in bytes
+            options: Extra channel options, applied after the ones above
         """
         if feature_flag_pb2 is None or feature_flag_pb2_grpc is None:
             raise ImportError(
@@ -32,13 +78,16 @@ class GrpcFeatureFlagClient:
 
         self.host = host
         self.port = port
+        self.options = channel_options(keepalive_time, keepalive_timeout, max_message_size) + list(options or [])
         self.channel = None
         self.stub = None
+        self._bootstraps = ETagMemo()
+        self.metrics = metrics
 
     def connect(self):
         """Establish connection to gRPC server."""
         try:
-            self.channel = grpc.insecure_channel(f"{self.host}:{self.port}")
+            self.channel = grpc.insecure_channel(f"{self.host}:{self.port}", options=self.options)
             self.stub = feature_flag_pb2_grpc.FeatureFlagServiceStub(self.channel)
         except Exception as e:
             raise ConnectionError(f"Failed to connect to gRPC server: {str(e)}")
@@ -48,6 +97,7 @@ class GrpcFeatureFlagClient:
         if self.channel:
             self.channel.close()
 
+    @timed("grpc")
     def evaluate_flag(
         self,
         flag_id: str,
@@ -73,12 +123,10 @@ class GrpcFeatureFlagClient:
             self.connect()
 
         try:
-            import json
-
             request = feature_flag_pb2.EvaluateRequest(
                 flag_id=flag_id,
                 user_id=user_id or "",
-                context=json.dumps(context or {}),
+                ctx=_build_context(context),
             )
 
             response = self.stub.EvaluateFlag(request)
@@ -90,6 +138,7 @@ class GrpcFeatureFlagClient:
                 raise FlagNotFoundError(f"Flag {flag_id} not found")
             raise FeatureFlagError(f"gRPC evaluation failed: {str(e)}")
 
+    @timed("grpc")
     def get_flag(self, flag_id: str) -> Dict[str, Any]:
         """
         Get flag details via gRPC.
@@ -108,25 +157,153 @@ class GrpcFeatureFlagClient:
             self.connect()
 
         try:
-            import json
-
             request = feature_flag_pb2.GetFlagRequest(flag_id=flag_id)
             response = self.stub.GetFlag(request)
 
-            return {
-                "id": response.id,
-                "name": response.name,
-                "description": response.description,
-                "enabled": response.enabled,
-                "environment": response.environment,
-                "rules": json.loads(response.rules) if response.rules else [],
-            }
+            return _flag_to_dict(response)
 
         except grpc.RpcError as e:
             if e.code() == grpc.StatusCode.NOT_FOUND:
                 raise FlagNotFoundError(f"Flag {flag_id} not found")
             raise FeatureFlagError(f"gRPC request failed: {str(e)}")
 
+    @timed("grpc")
+    def bulk_evaluate(
+        self,
+        flag_ids: List[str],
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate multiple flags in one gRPC call.
+
+        Args:
+            flag_ids: List of flag identifiers
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            FeatureFlagError: If evaluation fails
+        """
+        if not self.stub:
+            self.connect()
+
+        try:
+            request = feature_flag_pb2.BulkEvaluateRequest(
+                flag_ids=flag_ids,
+                user_id=user_id or "",
+                ctx=_build_context(context),
+            )
+            response = self.stub.BulkEvaluate(request)
+
+            return {
+                flag_id: {"enabled": result.enabled, "reason": result.reason}
+                for flag_id, result in response.results.items()
+            }
+
+        except grpc.RpcError as e:
+            raise FeatureFlagError(f"gRPC bulk evaluation failed: {str(e)}")
+
+    @timed("grpc")
+    def evaluate_all(
+        self,
+        environment: str = "development",
+        user_id: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluate every flag of an environment for one user via gRPC.
+
+        The last response per (environment, user, context) is remembered with
+        its ETag; an unchanged flag set is answered from memory.
+
+        Args:
+            environment: Environment name (development, staging, production)
+            user_id: User identifier
+            context: Evaluation context
+
+        Returns:
+            Dictionary mapping flag IDs to evaluation results
+
+        Raises:
+            FeatureFlagError: If evaluation fails
+        """
+        if not self.stub:
+            self.connect()
+
+        key = (environment, context_digest(user_id, context))
+        remembered = self._bootstraps.get(key)
+
+        try:
+            request = feature_flag_pb2.EvaluateAllRequest(
+                environment=environment,
+                user_id=user_id or "",
+                ctx=_build_context(context),
+                etag=remembered[0] if remembered else "",
+            )
+            response = self.stub.EvaluateAll(request)
+        except grpc.RpcError as e:
+            raise FeatureFlagError(f"gRPC evaluate-all failed: {str(e)}")
+
+        if response.not_modified and remembered:
+            return dict(remembered[1])
+
+        results = {
+            flag_id: {"enabled": result.enabled, "reason": result.reason}
+            for flag_id, result in response.results.items()
+        }
+        if response.etag:
+            self._bootstraps.set(key, response.etag, results)
+        return dict(results)
+
+    def watch_flags(
+        self,
+        environments: Optional[List[str]] = None,
+        flag_ids: Optional[List[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream flag changes over the shared gRPC channel.
+
+        The stream stays open until the iterator is closed or the client
+        disconnects.
+
+        Args:
+            environments: Only watch these environments (default: all)
+            flag_ids: Only watch these flags (default: all)
+
+        Yields:
+            Dictionaries with 'action', 'flag', 'timestamp' and 'reason' keys,
+            shaped like WebSocket ``flag_update`` events
+
+        Raises:
+            FeatureFlagError: If the stream fails
+        """
+        if not self.stub:
+            self.connect()
+
+        request = feature_flag_pb2.WatchFlagsRequest(
+            environments=environments or [],
+            flag_ids=flag_ids or [],
+        )
+        call = self.stub.WatchFlags(request)
+
+        try:
+            for update in call:
+                yield {
+                    "action": update.action,
+                    "flag": _flag_to_dict(update.flag),
+                    "timestamp": update.timestamp,
+                    "reason": update.reason,
+                }
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.CANCELLED:
+                raise FeatureFlagError(f"gRPC watch failed: {str(e)}")
+        finally:
+            call.cancel()
+
     def __enter__(self):
         """Context manager entry."""
         self.connect()
@@ -134,4 +311,52 @@ class GrpcFeatureFlagClient:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.disconnect()
\ No newline at end of file
+        self.disconnect()
+
+
+def _to_context_value(value: Any):
+    """Convert a JSON value to a ContextValue message."""
+    if value is None:
+        return feature_flag_pb2.ContextValue(null_value=True)
+    if isinstance(value, bool):
+        return feature_flag_pb2.ContextValue(bool_value=value)
+    if isinstance(value, (int, float)):
+        return feature_flag_pb2.ContextValue(number_value=value)
+    if isinstance(value, str):
+        return feature_flag_pb2.ContextValue(string_value=value)
+    return feature_flag_pb2.ContextValue(json_value=json.dumps(value))
+
+
+# Context keys with a dedicated EvaluationContext field
+_TYPED_CONTEXT_FIELDS = {
+    "userId": "user_id",
+    "sessionId": "session_id",
+    "ip": "ip",
+    "userAgent": "user_agent",
+}
+
+
+def _build_context(context: Optional[Dict[str, Any]]):
+    """Convert an evaluation context dict to an EvaluationContext message."""
+    message = feature_flag_pb2.EvaluationContext()
+    for key, value in (context or {}).items():
+        field = _TYPED_CONTEXT_FIELDS.get(key)
+        # Empty or non-string values keep their exact JSON type as attributes
+        if field and isinstance(value, str) and value:
+            setattr(message, field, value)
+        else:
+            message.attributes[key].CopyFrom(_to_context_value(value))
+    return message
+
+
+def _flag_to_dict(flag) -> Dict[str, Any]:
+    """Convert a FlagResponse message to a dictionary."""
+    return {
+        "id": flag.id,
+        "name": flag.name,
+        "description": flag.description,
+        "enabled": flag.enabled,
+        "environment": flag.environment,
+        "rules": json.loads(flag.rules) if flag.rules else [],
+        "updated_at": flag.updated_at or None,
+    }
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""
+Performance metrics for the SDK, with a Prometheus text-format exporter.
+
+Pass one ``SDKMetrics`` to the clients and stores (``metrics=...``) to record:
+
+- ``feature_flag_request_duration_seconds{transport, method}``: latency of
+  each client method, including cache hits and fallbacks
+- ``feature_flag_request_errors_total{transport, method}``: methods that raised
+- ``feature_flag_retries_total{transport}``: HTTP requests retried
+- ``feature_flag_cache_requests_total{result}``: evaluation cache hits and misses
+- ``feature_flag_evaluation_duration_seconds{source}``: local evaluations
+- ``feature_flag_websocket_reconnects_total``: WebSocket reconnection attempts
+- ``feature_flag_snapshot_age_seconds{source, environment | path}``: seconds
+  since a store's flags were last synced (``source="store"``, labelled with
+  its environment) or a snapshot file was written (``source="file"``,
+  labelled with its path)
+
+Hooks added with ``add_hook`` receive every observation, for forwarding to
+StatsD, OpenTelemetry or a custom sink.
+"""
+
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Local evaluations take microseconds, API calls milliseconds to seconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Receives (kind, name, value, labels); kind is "histogram" or "counter"
+MetricsHook = Callable[[str, str, float, Dict[str, str]], None]
+
+_METRICS = {
+    "request_duration_seconds": ("histogram", "Latency of SDK client methods in seconds."),
+    "request_errors_total": ("counter", "SDK client methods that raised an error."),
+    "retries_total": ("counter", "HTTP requests retried by the transport."),
+    "cache_requests_total": ("counter", "Evaluation cache lookups by result."),
+    "evaluation_duration_seconds": ("histogram", "Latency of local flag evaluations in seconds."),
+    "websocket_reconnects_total": ("counter", "WebSocket reconnection attempts."),
+    "snapshot_age_seconds": ("gauge", "Seconds since the flag data was last refreshed."),
+}
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """Monotonic counter for one label set."""
+
+    def __init__(self, name: str, labels: Dict[str, str], hooks: List[MetricsHook]):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+        self._hooks = hooks
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        """Increase the counter."""
+        with self._lock:
+            self.value += amount
+        if self._hooks:
+            _call_hooks(self._hooks, "counter", self.name, amount, self.labels)
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set."""
+
+    def __init__(self, name: str, labels: Dict[str, str], hooks: List[MetricsHook], buckets: Tuple[float, ...]):
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets
+        # One extra slot for observations above the largest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._hooks = hooks
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Record one observation."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+        if self._hooks:
+            _call_hooks(self._hooks, "histogram", self.name, value, self.labels)
+
+
+class SDKMetrics:
+    """Registry of SDK metrics."""
+
+    def __init__(self, namespace: str = "feature_flag", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize the registry.
+
+        Args:
+            namespace: Prefix of every exported metric name
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._hooks: List[MetricsHook] = []
+        self._metrics: Dict[Tuple[str, _LabelKey], Any] = {}
+        self._gauges: Dict[Tuple[str, _LabelKey], Callable[[], Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: MetricsHook):
+        """
+        Register a hook called with every counter increment and histogram observation.
+
+        Hooks run on the caller's thread and must be fast; errors are ignored.
+
+        Args:
+            hook: Function receiving (kind, name, value, labels)
+        """
+        self._hooks.append(hook)
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        """Get the counter for a metric and label set, creating it on first use."""
+        return self._child(name, labels, lambda: Counter(name, labels, self._hooks))
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Get the histogram for a metric and label set, creating it on first use."""
+        return self._child(name, labels, lambda: Histogram(name, labels, self._hooks, self.buckets))
+
+    def gauge(self, name: str, read: Callable[[], Optional[float]], **labels: str):
+        """
+        Register a gauge read at export time.
+
+        Args:
+            name: Metric name
+            read: Function returning the current value, or None to omit it
+            **labels: Label values
+
+        Raises:
+            ValueError: If another function is registered for the same name
+                        and labels; remove it with ``remove_gauge`` first
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            current = self._gauges.get(key)
+            if current is not None and current != read:
+                raise ValueError(f"Gauge {name} with labels {labels} is already registered")
+            self._gauges[key] = read
+
+    def remove_gauge(self, name: str, **labels: str):
+        """Unregister a gauge; does nothing if it is not registered."""
+        with self._lock:
+            self._gauges.pop((name, _label_key(labels)), None)
+
+    def export_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.items())
+            gauges = list(self._gauges.items())
+
+        samples: Dict[str, List[str]] = {}
+        for (name, key), metric in sorted(metrics, key=lambda item: item[0]):
+            full_name = f"{self.namespace}_{name}"
+            lines = samples.setdefault(name, [])
+            if isinstance(metric, Histogram):
+                with metric._lock:
+                    counts, total, count = list(metric.counts), metric.sum, metric.count
+                cumulative = 0
+                for bound, bucket_count in zip((*metric.buckets, math.inf), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(f"{full_name}_bucket{_format_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{full_name}_count{_format_labels(key)} {count}")
+            else:
+                lines.append(f"{full_name}{_format_labels(key)} {_format_value(metric.value)}")
+        for (name, key), read in sorted(gauges, key=lambda item: item[0]):
+            try:
+                value = read()
+            except Exception:
+                value = None
+            if value is not None:
+                samples.setdefault(name, []).append(
+                    f"{self.namespace}_{name}{_format_labels(key)} {_format_value(value)}"
+                )
+
+        output = []
+        for name, lines in samples.items():
+            kind, help_text = _METRICS.get(name, ("untyped", name))
+            output.append(f"# HELP {self.namespace}_{name} {help_text}")
+            output.append(f"# TYPE {self.namespace}_{name} {kind}")
+            output.extend(lines)
+        return "\n".join(output) + "\n" if output else ""
+
+    def _child(self, name: str, labels: Dict[str, str], create: Callable[[], Any]) -> Any:
+        key = (name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, create())
+        return metric
+
+
+def timed(transport: str):
+    """
+    Decorate a client method to record its latency and errors in ``self.metrics``.
+
+    Args:
+        transport: Value of the ``transport`` label (rest, grpc)
+    """
+    def decorate(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            _, duration, errors = _method_metrics(self, metrics, transport, name)
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def timed_async(transport: str):
+    """Coroutine counterpart of ``timed``."""
+    def decorate(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return await method(self, *args, **kwargs)
+            _, duration, errors = _method_metrics(self, metrics, transport, name)
+            start = time.perf_counter()
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def _method_metrics(
+    client: Any, metrics: SDKMetrics, transport: str, name: str
+) -> Tuple[SDKMetrics, Histogram, Counter]:
+    """Latency histogram and error counter of a client method, bound once per client."""
+    try:
+        bound = client._method_metrics
+    except AttributeError:
+        bound = client._method_metrics = {}
+    children = bound.get(name)
+    # Rebind if the client was given another registry since
+    if children is None or children[0] is not metrics:
+        children = (
+            metrics,
+            metrics.histogram("request_duration_seconds", transport=transport, method=name),
+            metrics.counter("request_errors_total", transport=transport, method=name),
+        )
+        bound[name] = children
+    return children
+
+
+def start_http_server(metrics: SDKMetrics, port: int = 9464, addr: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve ``/metrics`` in the Prometheus text format from a daemon thread.
+
+    Args:
+        metrics: Registry to export
+        port: Port to listen on
+        addr: Address to bind
+
+    Returns:
+        The running server; call ``shutdown()`` to stop it
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.export_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _call_hooks(hooks: List[MetricsHook], kind: str, name: str, value: float, labels: Dict[str, str]):
+    for hook in hooks:
+        try:
+            hook(kind, name, value, labels)
+        except Exception:
+            pass
+
+
+def _label_key(labels: Dict[str, str]) -> _LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: _LabelKey) -> str:
+    if not key:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in key)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
@@ -0,0 +1,666 @@
+"""Local rule evaluation engine for Feature Flag Management System.
+
+Mirrors ``backend/services/rule-engine.service.js`` so flags returned by
+``FeatureFlagClient.get_all_flags`` can be evaluated in-process with the same
+results as the server's ``/evaluate`` endpoint.
+"""
+
+import functools
+import hashlib
+import json
+import math
+import re
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Tuple
+
+# Resolves an IP address to an ISO country code (geoip-lite ``geo.country``).
+GeoLookup = Callable[[str], Optional[str]]
+
+# Resolves a user agent to (device type, OS name, browser name) using the
+# ua-parser-js naming, e.g. ("mobile", "iOS", "Mobile Safari").
+DeviceParser = Callable[[str], Tuple[Optional[str], Optional[str], Optional[str]]]
+
+# Returns the member IDs of a segment, or None if the segment is unknown.
+SegmentLookup = Callable[[str], Optional[AbstractSet[str]]]
+
+# Evaluates a context against compiled rules, returning {"enabled", "reason"}.
+RulePlan = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+_Predicate = Callable[[Dict[str, Any], "_ResolvedContext"], Tuple[bool, str]]
+
+_MISSING = object()
+_UNMATCHABLE = object()
+
+_UNKNOWN_OPERATOR = (True, "Unknown operator")
+
+# Relative cost of each rule type; compiled plans run the cheap ones first.
+_RULE_COSTS = {"user": 0, "segment": 0, "custom": 0, "percentage": 1, "geo": 2, "device": 3}
+
+_PLAN_CACHE_LIMIT = 10000
+
+# Longer user agents are parsed but not cached, bounding the cache's memory
+_MAX_CACHED_USER_AGENT_LENGTH = 512
+
+_DEVICE_FIELDS = ("deviceType", "os", "browser")
+
+_JS_DECIMAL = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+_JS_INFINITY = re.compile(r"^[+-]?Infinity$")
+_JS_RADIX = re.compile(r"^0([xX][0-9a-fA-F]+|[oO][0-7]+|[bB][01]+)$")
+
+
+def simple_hash(value: Any) -> int:
+    """
+    Port of the backend ``simpleHash`` used for percentage bucketing.
+
+    Hashes the UTF-16 code units of ``value`` with 32-bit signed overflow and
+    returns the absolute value, exactly like the JavaScript implementation.
+
+    Args:
+        value: String to hash (non-strings hash to 0, as in JavaScript)
+
+    Returns:
+        Non-negative hash value
+    """
+    if not isinstance(value, str):
+        return 0
+
+    data = value.encode("utf-16-le", "surrogatepass")
+    hash_value = 0
+    for i in range(0, len(data), 2):
+        hash_value = (hash_value * 31 + (data[i] | (data[i + 1] << 8))) & 0xFFFFFFFF
+    if hash_value & 0x80000000:
+        hash_value -= 0x100000000
+    return abs(hash_value)
+
+
+def percentage_bucket(value: Any) -> int:
+    """Return the 1-100 rollout bucket the backend assigns to ``value``."""
+    return (simple_hash(value) % 100) + 1
+
+
+class RuleEngine:
+    """Evaluates flag rules locally with the same semantics as the backend."""
+
+    def __init__(
+        self,
+        geo_lookup: Optional[GeoLookup] = None,
+        device_parser: Optional[DeviceParser] = None,
+        segment_lookup: Optional[SegmentLookup] = None,
+        geo_cache_size: int = 50000,
+        user_agent_cache_size: int = 10000,
+    ):
+        """
+        Initialize the rule engine.
+
+        Args:
+            geo_lookup: Function resolving an IP to a country code. Without it,
+                        ``geo`` rules fail with "Could not determine location".
+            device_parser: Function resolving a user agent to
+                           (device type, OS name, browser name). Without it,
+                           every user agent is treated as a desktop with an
+                           unknown OS and browser.
+            segment_lookup: Function returning a segment's member IDs, e.g.
+                            ``SegmentIndex.members``. Without it, every
+                            segment is empty.
+            geo_cache_size: IPs whose country is kept in an LRU cache
+                            (0 disables caching)
+            user_agent_cache_size: User agents whose parsed names are kept
+                                   in an LRU cache (0 disables caching)
+        """
+        self.geo_lookup = _cached(geo_lookup, geo_cache_size)
+        self.device_parser = _cached(device_parser, user_agent_cache_size, _MAX_CACHED_USER_AGENT_LENGTH)
+        self.segment_lookup = segment_lookup
+        self._plans: Dict[Any, Tuple[Any, RulePlan]] = {}
+
+    def evaluate(self, flag: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Evaluate a flag (as returned by the API) for a context.
+
+        The flag's rules are compiled once per flag version (``id`` and
+        ``updated_at``, or a digest of the rules when the flag has no
+        ``updated_at``) and the plan is reused until the flag changes.
+
+        Args:
+            flag: Flag definition with 'enabled' and 'rules'
+            context: Evaluation context (userId, ip, userAgent, resolved,
+                     custom fields)
+
+        Returns:
+            Evaluation result with enabled status and reason
+        """
+        if not flag.get("enabled"):
+            return {"enabled": False, "reason": "Flag is disabled"}
+        return self.plan_for(flag)(context or {})
+
+    def evaluate_rules(
+        self, rules: Optional[List[Dict[str, Any]]], context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a list of rules; every rule must pass for the flag to be enabled.
+
+        Args:
+            rules: List of rule definitions
+            context: Evaluation context
+
+        Returns:
+            Evaluation result with enabled status and reason
+        """
+        return self.compile_rules(rules)(context or {})
+
+    def evaluate_rule(self, rule: Dict[str, Any], context: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        Evaluate a single rule.
+
+        Args:
+            rule: Rule definition with 'type', 'operator' and 'value'
+            context: Evaluation context
+
+        Returns:
+            Tuple of (passed, reason)
+        """
+        return self.compile_rule(rule)(context)
+
+    def resolve_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resolve a context's IP and user agent into ``context["resolved"]``.
+
+        The result is a copy with ``resolved`` holding ``country``,
+        ``deviceType``, ``os`` and ``browser``, and without the raw ``ip``,
+        ``userIp`` and ``userAgent`` that were resolved, so it can be sent to
+        the server (or evaluated locally) without looking them up again.
+        Fields this engine has no resolver for, or could not resolve, are
+        left in place for the server to look up.
+
+        Args:
+            context: Evaluation context
+
+        Returns:
+            Copy of the context with ``resolved`` set
+        """
+        resolved = dict(context.get("resolved") or {})
+        result = {key: value for key, value in context.items() if key != "resolved"}
+        profile = _ResolvedContext(self, context)
+
+        country = profile.country()
+        if country is not None:
+            resolved["country"] = country
+            result.pop("ip", None)
+            result.pop("userIp", None)
+
+        # Without a parser every user agent would resolve to a bare "desktop"
+        if self.device_parser is not None or any(isinstance(resolved.get(f), str) for f in _DEVICE_FIELDS):
+            if profile.device_names() is not None:
+                resolved.update(profile.device_fields())
+                result.pop("userAgent", None)
+
+        if resolved:
+            result["resolved"] = resolved
+        return result
+
+    def plan_for(self, flag: Dict[str, Any]) -> RulePlan:
+        """
+        Get the compiled plan for a flag's rules, compiling it if the flag is
+        new or has changed since it was last compiled.
+
+        Args:
+            flag: Flag definition with 'id', 'updated_at' and 'rules'
+
+        Returns:
+            Function evaluating a context against the flag's rules
+        """
+        flag_id = flag.get("id")
+        if flag_id is None:
+            return self.compile_rules(flag.get("rules"))
+
+        version = flag.get("updated_at")
+        if version is None:
+            # Without a timestamp, edited rules must still miss the cache
+            version = _rules_digest(flag.get("rules"))
+        cached = self._plans.get(flag_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        plan = self.compile_rules(flag.get("rules"))
+        self._plans.pop(flag_id, None)
+        if len(self._plans) >= _PLAN_CACHE_LIMIT:
+            self._plans.pop(next(iter(self._plans)), None)
+        self._plans[flag_id] = (version, plan)
+        return plan
+
+    def compile_rules(self, rules: Optional[List[Dict[str, Any]]]) -> RulePlan:
+        """
+        Compile rules into a plan evaluating a context.
+
+        Rules of unknown type always pass and are dropped. The others run
+        cheapest first (user and custom checks, then hashing, then geo and
+        user agent lookups), so a failing result reports the first failing
+        rule in that order, exactly as the backend does.
+
+        Args:
+            rules: List of rule definitions
+
+        Returns:
+            Function evaluating a context against the rules
+        """
+        if not rules:
+            return lambda context: {"enabled": True, "reason": "No rules defined"}
+
+        ordered = sorted((rule for rule in rules if _rule_cost(rule) is not None), key=_rule_cost)
+        predicates = [self._compile_rule(rule) for rule in ordered]
+
+        def plan(context: Dict[str, Any]) -> Dict[str, Any]:
+            resolved = _ResolvedContext(self, context)
+            for predicate in predicates:
+                passed, reason = predicate(context, resolved)
+                if not passed:
+                    return {"enabled": False, "reason": reason}
+            return {"enabled": True, "reason": "All rules passed"}
+
+        return plan
+
+    def compile_rule(self, rule: Dict[str, Any]) -> Callable[[Dict[str, Any]], Tuple[bool, str]]:
+        """
+        Compile a single rule.
+
+        Args:
+            rule: Rule definition with 'type', 'operator' and 'value'
+
+        Returns:
+            Function returning (passed, reason) for a context
+        """
+        if _rule_cost(rule) is None:
+            return lambda context: (True, "Unknown rule type")
+        predicate = self._compile_rule(rule)
+        return lambda context: predicate(context, _ResolvedContext(self, context))
+
+    def _compile_rule(self, rule: Dict[str, Any]) -> _Predicate:
+        rule_type = rule.get("type")
+        operator = rule.get("operator")
+        value = rule.get("value")
+
+        if rule_type == "geo":
+            return self._compile_geo_rule(operator, value)
+        if rule_type == "device":
+            return self._compile_device_rule(operator, value)
+        if rule_type == "percentage":
+            return self._compile_percentage_rule(operator, value)
+        if rule_type == "user":
+            return self._compile_user_rule(operator, value)
+        if rule_type == "segment":
+            return self._compile_segment_rule(operator, value)
+        return self._compile_custom_rule(rule)
+
+    def _compile_geo_rule(self, operator, value) -> _Predicate:
+        countries = _key_set(value)
+
+        if operator == "in":
+            def check(country):
+                if countries is not None and _set_key(country) in countries:
+                    return True, f"Country {country} is in allowed list"
+                return False, f"Country {country} not in allowed list"
+        elif operator == "not_in":
+            def check(country):
+                if countries is not None and _set_key(country) not in countries:
+                    return True, f"Country {country} is not in blocked list"
+                return False, f"Country {country} is in blocked list"
+        else:
+            def check(country):
+                return _UNKNOWN_OPERATOR
+
+        def predicate(context, resolved):
+            country = resolved.country()
+            if country is not None:
+                return check(country)
+            if not (context.get("ip") or context.get("userIp")):
+                return False, "No IP address provided"
+            return False, "Could not determine location"
+
+        return predicate
+
+    def _compile_device_rule(self, operator, value) -> _Predicate:
+        if operator == "is":
+            matches = (True, f"Device/OS/Browser matches {_js_string(value)}")
+            differs = (False, f"Device/OS/Browser does not match {_js_string(value)}")
+
+            def check(names):
+                return matches if any(_strict_equals(name, value) for name in names) else differs
+        elif operator == "is_not":
+            differs = (True, f"Device/OS/Browser is not {_js_string(value)}")
+            matches = (False, f"Device/OS/Browser is {_js_string(value)}")
+
+            def check(names):
+                return matches if any(_strict_equals(name, value) for name in names) else differs
+        elif operator == "in":
+            allowed = _key_set(value)
+            in_list = (True, "Device/OS/Browser in allowed list")
+            not_in_list = (False, "Device/OS/Browser not in allowed list")
+
+            def check(names):
+                if allowed is not None and any(_set_key(name) in allowed for name in names):
+                    return in_list
+                return not_in_list
+        else:
+            def check(names):
+                return _UNKNOWN_OPERATOR
+
+        def predicate(context, resolved):
+            names = resolved.device_names()
+            if names is None:
+                return False, "No user agent provided"
+            return check(names)
+
+        return predicate
+
+    def _compile_percentage_rule(self, operator, value) -> _Predicate:
+        if operator == "less_than":
+            in_rollout = (True, f"User in {_js_string(value)}% rollout")
+            out_of_rollout = (False, f"User not in {_js_string(value)}% rollout")
+
+            def check(percentage):
+                return in_rollout if _js_compare(percentage, value, "<=") else out_of_rollout
+        elif operator == "greater_than":
+            def check(percentage):
+                if _js_compare(percentage, value, ">"):
+                    return True, f"User percentage {percentage} > {_js_string(value)}"
+                return False, f"User percentage {percentage} <= {_js_string(value)}"
+        else:
+            def check(percentage):
+                return _UNKNOWN_OPERATOR
+
+        def predicate(context, resolved):
+            user_id = context.get("userId") or context.get("sessionId")
+            if not user_id:
+                return False, "No user/session ID provided"
+            return check(percentage_bucket(user_id))
+
+        return predicate
+
+    def _compile_user_rule(self, operator, value) -> _Predicate:
+        users = _key_set(value)
+
+        if operator == "in":
+            def check(user_id):
+                if users is not None and _set_key(user_id) in users:
+                    return True, "User in whitelist"
+                return False, "User not in whitelist"
+        elif operator == "not_in":
+            def check(user_id):
+                if users is not None and _set_key(user_id) not in users:
+                    return True, "User not in blacklist"
+                return False, "User in blacklist"
+        else:
+            def check(user_id):
+                return _UNKNOWN_OPERATOR
+
+        def predicate(context, resolved):
+            user_id = context.get("userId")
+            if not user_id:
+                return False, "No user ID provided"
+            return check(user_id)
+
+        return predicate
+
+    def _compile_segment_rule(self, operator, value) -> _Predicate:
+        segment_ids = [segment_id for segment_id in (value if isinstance(value, list) else [value])
+                       if isinstance(segment_id, str)]
+
+        def in_segment(user_id):
+            lookup = self.segment_lookup
+            if lookup is None or not isinstance(user_id, str):
+                return False
+            for segment_id in segment_ids:
+                members = lookup(segment_id)
+                if members is not None and user_id in members:
+                    return True
+            return False
+
+        if operator == "in":
+            def check(user_id):
+                return (True, "User in segment") if in_segment(user_id) else (False, "User not in segment")
+        elif operator == "not_in":
+            def check(user_id):
+                return (False, "User in segment") if in_segment(user_id) else (True, "User not in segment")
+        else:
+            def check(user_id):
+                return _UNKNOWN_OPERATOR
+
+        def predicate(context, resolved):
+            user_id = context.get("userId")
+            if not user_id:
+                return False, "No user ID provided"
+            return check(user_id)
+
+        return predicate
+
+    def _compile_custom_rule(self, rule) -> _Predicate:
+        # JavaScript reads context[field] with the field converted to a
+        # property name, "undefined" when the rule has no field at all
+        field = _js_string(rule["field"]) if "field" in rule else "undefined"
+        operator = rule.get("operator")
+        value = rule.get("value")
+        missing = (False, f"Field {field} not found in context")
+
+        if operator == "equals":
+            def check(context_value):
+                passed = _strict_equals(context_value, value)
+                return passed, "Values match" if passed else "Values do not match"
+        elif operator == "not_equals":
+            def check(context_value):
+                passed = not _strict_equals(context_value, value)
+                return passed, "Values differ" if passed else "Values are equal"
+        elif operator == "contains":
+            needle = _js_string(value)
+
+            def check(context_value):
+                passed = needle in _js_string(context_value)
+                return passed, "Contains value" if passed else "Does not contain value"
+        elif operator == "greater_than":
+            def check(context_value):
+                passed = _js_compare(context_value, value, ">")
+                return passed, "Greater than" if passed else "Not greater than"
+        elif operator == "less_than":
+            def check(context_value):
+                passed = _js_compare(context_value, value, "<")
+                return passed, "Less than" if passed else "Not less than"
+        else:
+            def check(context_value):
+                return _UNKNOWN_OPERATOR
+
+        def predicate(context, resolved):
+            context_value = context.get(field, _MISSING)
+            if context_value is _MISSING:
+                return missing
+            return check(context_value)
+
+        return predicate
+
+
+class _ResolvedContext:
+    """
+    Geo and user agent lookups shared by every rule evaluated for one context.
+
+    Fields the caller resolved already (``context["resolved"]``) are used as
+    they are; the others are looked up from ``ip`` and ``userAgent`` on
+    first use.
+    """
+
+    __slots__ = ("_engine", "_context", "_provided", "_country", "_device")
+
+    def __init__(self, engine: RuleEngine, context: Dict[str, Any]):
+        self._engine = engine
+        self._context = context
+        provided = context.get("resolved")
+        self._provided = provided if isinstance(provided, dict) else {}
+        self._country = _MISSING
+        self._device = _MISSING
+
+    def country(self) -> Optional[str]:
+        if self._country is _MISSING:
+            country = self._provided.get("country")
+            if not isinstance(country, str):
+                ip = self._context.get("ip") or self._context.get("userIp")
+                lookup = self._engine.geo_lookup
+                country = (lookup(ip) if ip and lookup else None) or None
+            self._country = country
+        return self._country
+
+    def device_fields(self) -> Dict[str, str]:
+        """The resolved device type, OS and browser; unknown names are omitted."""
+        self.device_names()
+        return {} if self._device is None else self._device[1]
+
+    def device_names(self) -> Optional[List[str]]:
+        if self._device is _MISSING:
+            if any(isinstance(self._provided.get(f), str) for f in _DEVICE_FIELDS):
+                device_type, os_name, browser_name = (
+                    _string_or_none(self._provided.get(f)) for f in _DEVICE_FIELDS
+                )
+            else:
+                user_agent = self._context.get("userAgent")
+                if not user_agent:
+                    self._device = None
+                    return None
+                parser = self._engine.device_parser
+                device_type, os_name, browser_name = parser(user_agent) if parser else (None, None, None)
+            # ua-parser-js leaves unknown OS/browser names undefined, which never
+            # equals a JSON value, so only known names take part in matching.
+            fields = {"deviceType": device_type or "desktop"}
+            if os_name is not None:
+                fields["os"] = os_name
+            if browser_name is not None:
+                fields["browser"] = browser_name
+            self._device = (list(fields.values()), fields)
+        return None if self._device is None else self._device[0]
+
+
+def _cached(function: Optional[Callable[[Any], Any]], maxsize: int, max_key_length: Optional[int] = None):
+    """Wrap a resolver in an LRU cache; keys that are not strings, or too long, bypass it."""
+    if function is None or maxsize <= 0:
+        return function
+    cached = functools.lru_cache(maxsize=maxsize)(function)
+
+    def lookup(key):
+        if isinstance(key, str) and (max_key_length is None or len(key) <= max_key_length):
+            return cached(key)
+        return function(key)
+
+    lookup.cache_info = cached.cache_info
+    lookup.cache_clear = cached.cache_clear
+    return lookup
+
+
+def _string_or_none(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def _rule_cost(rule: Dict[str, Any]) -> Optional[int]:
+    rule_type = rule.get("type")
+    return _RULE_COSTS.get(rule_type) if isinstance(rule_type, str) else None
+
+
+def _rules_digest(rules: Any) -> str:
+    """Digest identifying a flag's rules, for flags that carry no ``updated_at``."""
+    encoded = json.dumps(rules, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _strict_equals(a: Any, b: Any) -> bool:
+    """JavaScript ``===`` for JSON values (objects and arrays never compare equal)."""
+    if _is_number(a) and _is_number(b):
+        return a == b
+    if isinstance(a, (dict, list)) or isinstance(b, (dict, list)):
+        return False
+    return type(a) is type(b) and a == b
+
+
+def _set_key(value: Any) -> Any:
+    """
+    Hashable key under which JSON values are SameValueZero-equal exactly when
+    their keys are equal (1 and 1.0 match, True and 1 do not, NaN matches NaN).
+    """
+    if isinstance(value, bool):
+        return (bool, value)
+    if _is_number(value):
+        return (float, "NaN") if math.isnan(value) else (float, value)
+    if isinstance(value, (dict, list)):
+        return _UNMATCHABLE
+    return value
+
+
+def _key_set(values: Any) -> Optional[frozenset]:
+    """JavaScript ``Array.prototype.includes`` lookups as a hash set."""
+    if not isinstance(values, list):
+        return None
+    return frozenset(key for key in map(_set_key, values) if key is not _UNMATCHABLE)
+
+
+def _js_number(value: Any) -> float:
+    """JavaScript ``Number(value)`` coercion for JSON values."""
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    if _is_number(value):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0.0
+        if _JS_DECIMAL.match(text):
+            return float(text)
+        if _JS_INFINITY.match(text):
+            return -math.inf if text.startswith("-") else math.inf
+        if _JS_RADIX.match(text):
+            return float(int(text, 0))
+        return math.nan
+    if isinstance(value, list):
+        if not value:
+            return 0.0
+        if len(value) == 1:
+            return _js_number(_js_string(value[0]))
+    return math.nan
+
+
+def _js_compare(a: Any, b: Any, operator: str) -> bool:
+    """JavaScript relational comparison (``<``, ``<=``, ``>``) for JSON values."""
+    if isinstance(a, (list, dict)):
+        a = _js_string(a)
+    if isinstance(b, (list, dict)):
+        b = _js_string(b)
+
+    if isinstance(a, str) and isinstance(b, str):
+        left, right = a.encode("utf-16-be", "surrogatepass"), b.encode("utf-16-be", "surrogatepass")
+    else:
+        left, right = _js_number(a), _js_number(b)
+        if math.isnan(left) or math.isnan(right):
+            return False
+
+    if operator == "<":
+        return left < right
+    if operator == "<=":
+        return left <= right
+    return left > right
+
+
+def _js_string(value: Any) -> str:
+    """JavaScript ``String(value)`` for JSON values."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        if value.is_integer() and abs(value) < 1e21:
+            return str(int(value))
+        return repr(value)
+    if isinstance(value, list):
+        return ",".join("" if v is None else _js_string(v) for v in value)
+    if isinstance(value, dict):
+        return "[object Object]"
+    return str(value)
@@ -0,0 +1,131 @@
+"""Local segment membership index for ``segment`` rules."""
+
+import logging
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .client import FeatureFlagClient
+from .exceptions import FeatureFlagError
+from .flag_store import FlagStore
+
+logger = logging.getLogger(__name__)
+
+
+def referenced_segments(flags: Iterable[Dict[str, Any]]) -> List[str]:
+    """
+    Get the IDs of the segments referenced by the rules of some flags.
+
+    Args:
+        flags: Flag definitions
+
+    Returns:
+        Segment IDs, in first-seen order
+    """
+    segment_ids: Dict[str, None] = {}
+    for flag in flags:
+        for rule in flag.get("rules") or []:
+            if rule.get("type") != "segment":
+                continue
+            value = rule.get("value")
+            for segment_id in value if isinstance(value, list) else [value]:
+                if isinstance(segment_id, str):
+                    segment_ids[segment_id] = None
+    return list(segment_ids)
+
+
+class SegmentIndex:
+    """
+    Member IDs of segments, downloaded once and shared by every flag that
+    targets them.
+
+    Pass ``members`` to ``RuleEngine(segment_lookup=...)``. ``watch`` keeps the
+    index in step with a ``FlagStore``: when a segment's members change, the
+    backend re-announces every flag targeting it, and the index re-downloads
+    the flag's segments whose version moved.
+    """
+
+    def __init__(self, client: FeatureFlagClient, page_size: int = 10000):
+        """
+        Initialize the segment index.
+
+        Args:
+            client: REST client used to download segment members
+            page_size: Members per download request
+        """
+        self.client = client
+        self.page_size = page_size
+        self._segments: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+
+    def members(self, segment_id: str) -> Optional[FrozenSet[str]]:
+        """
+        Get the member IDs of a loaded segment.
+
+        Args:
+            segment_id: Segment identifier
+
+        Returns:
+            Member IDs, or None if the segment is not loaded
+        """
+        entry = self._segments.get(segment_id)
+        return entry[1] if entry is not None else None
+
+    def load(self, segment_ids: Iterable[str]) -> List[str]:
+        """
+        Download segments that are new or whose members changed.
+
+        Args:
+            segment_ids: Segment identifiers
+
+        Returns:
+            IDs of the segments downloaded
+
+        Raises:
+            FeatureFlagError: If a download fails
+        """
+        downloaded = []
+        with self._lock:
+            for segment_id in segment_ids:
+                known = self._segments.get(segment_id)
+                download = self.client.download_segment_members(
+                    segment_id, self.page_size, known_version=known[0] if known else None
+                )
+                if download is not None:
+                    self._segments[segment_id] = (download["version"], frozenset(download["members"]))
+                    downloaded.append(segment_id)
+        return downloaded
+
+    def refresh(self) -> List[str]:
+        """
+        Re-download every loaded segment whose members changed.
+
+        Returns:
+            IDs of the segments downloaded
+
+        Raises:
+            FeatureFlagError: If a download fails
+        """
+        return self.load(list(self._segments))
+
+    def watch(self, store: FlagStore):
+        """
+        Load the segments referenced by a store's flags and follow its changes.
+
+        Args:
+            store: Flag store whose flags' segments are kept loaded
+        """
+        def on_change(action: str, flag: Dict[str, Any]):
+            flags = store.all_flags() if action == "snapshot" else [flag]
+            try:
+                self.load(referenced_segments(flags))
+            except FeatureFlagError as e:
+                logger.warning("Failed to load segments: %s", e)
+
+        store.on_change(on_change)
+        if store.is_ready():
+            on_change("snapshot", {})
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of segments and members loaded."""
+        segments = list(self._segments.values())
+        return {"segments": len(segments), "members": sum(len(members) for _, members in segments)}
@@ -0,0 +1,477 @@
+"""Flag store shared by the processes of one host through shared memory.
+
+Prefork servers (gunicorn, uWSGI) run many workers per host. Instead of each
+worker holding its own connection and copy of the flags, one process, the
+leader, keeps a ``FlagStore`` current and publishes every change into a
+memory-mapped file that all the others read.
+
+File layout (little-endian)::
+
+    header   magic "FFSHM\\0\\0\\0", format version (u16), reserved (u16),
+             slot capacity (u32), sequence (u64), slot lengths (2 x u32),
+             zero padding to 64 bytes
+    slots    two slots of ``capacity`` bytes, each holding an encoded
+             snapshot (see ``snapshot.py``)
+
+Generation ``n`` of the flag set lives in slot ``n % 2``. The writer fills
+the slot readers are not using and then publishes it by bumping the
+sequence, so readers never wait, and a writer dying mid-write leaves the last
+generation intact. A reader re-checks the sequence after reading and retries
+if it moved: the writer publishes generation ``n + 1`` before it starts
+overwriting slot ``n % 2``, so an unchanged sequence means the slot was not
+touched (a seqlock with a second slot). Files are
+created on demand; /dev/shm keeps them in memory on Linux.
+
+Leader election uses ``fcntl.flock`` and is therefore POSIX only.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .client import FeatureFlagClient
+from .exceptions import SnapshotError
+from .exposure import ExposureReporter
+from .flag_store import FlagStore
+from .metrics import SDKMetrics
+from .rule_engine import RuleEngine
+from .snapshot import FlagSnapshot, encode_snapshot
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FFSHM\0\0\0"
+FORMAT_VERSION = 1
+DEFAULT_CAPACITY = 8 * 1024 * 1024
+
+_HEADER = struct.Struct("<8sHHIQII")
+_HEADER_SIZE = 64
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = 16
+_SLOT_LENGTH = struct.Struct("<I")
+_SLOT_LENGTH_OFFSET = 24
+
+# (sequence, snapshot, flags parsed so far) of the generation being read
+_Generation = Tuple[int, Optional[FlagSnapshot], Dict[str, Optional[Dict[str, Any]]]]
+
+
+def _open_region(path: str, capacity: int, writable: bool) -> Tuple[mmap.mmap, int]:
+    """Map a shared flag store file, creating it if needed."""
+    if fcntl is None:
+        raise ImportError("The shared flag store requires a POSIX system (fcntl)")
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError as e:
+        raise SnapshotError(f"Failed to open shared flag store: {str(e)}")
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size == 0:
+                os.ftruncate(fd, _HEADER_SIZE + 2 * capacity)
+                os.pwrite(fd, _HEADER.pack(MAGIC, FORMAT_VERSION, 0, capacity, 0, 0, 0), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        size = os.fstat(fd).st_size
+        mapped = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Failed to map shared flag store: {str(e)}")
+    finally:
+        os.close(fd)
+
+    magic, version, _, capacity, _, _, _ = _HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or version != FORMAT_VERSION or size < _HEADER_SIZE + 2 * capacity:
+        mapped.close()
+        raise SnapshotError("Not a shared flag store")
+    return mapped, capacity
+
+
+class SharedFlagWriter:
+    """Publishes flag sets into a shared flag store file. Use one per file."""
+
+    def __init__(self, path: str, environment: str = "development", capacity: int = DEFAULT_CAPACITY):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Shared flag store file
+            environment: Environment the published flags belong to
+            capacity: Slot size in bytes if the file is created; an existing
+                      file keeps its own
+
+        Raises:
+            SnapshotError: If the file cannot be opened
+        """
+        self.environment = environment
+        self._mmap, self.capacity = _open_region(path, capacity, writable=True)
+        self._lock = threading.Lock()
+
+    def publish(self, flags: List[Dict[str, Any]]) -> int:
+        """
+        Publish a new generation of the flag set.
+
+        Args:
+            flags: Every flag of the environment
+
+        Returns:
+            Sequence number of the new generation
+
+        Raises:
+            SnapshotError: If the encoded flags exceed the slot capacity
+        """
+        data = encode_snapshot(flags, self.environment)
+        if len(data) > self.capacity:
+            raise SnapshotError(
+                f"Flag set of {len(data)} bytes exceeds the shared store capacity of {self.capacity} bytes"
+            )
+
+        with self._lock:
+            (sequence,) = _SEQUENCE.unpack_from(self._mmap, _SEQUENCE_OFFSET)
+            sequence += 1
+            slot = sequence % 2
+            start = _HEADER_SIZE + slot * self.capacity
+            self._mmap[start:start + len(data)] = data
+            _SLOT_LENGTH.pack_into(self._mmap, _SLOT_LENGTH_OFFSET + slot * _SLOT_LENGTH.size, len(data))
+            _SEQUENCE.pack_into(self._mmap, _SEQUENCE_OFFSET, sequence)
+        return sequence
+
+    def close(self):
+        """Release the memory mapping."""
+        self._mmap.close()
+
+
+class SharedFlagReader:
+    """
+    Lock-free reader of a shared flag store file.
+
+    Flags are parsed on first use and kept until the sequence changes, so a
+    steady-state lookup costs one sequence read and a dict lookup.
+    """
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY):
+        """
+        Initialize the reader.
+
+        Args:
+            path: Shared flag store file
+            capacity: Slot size in bytes if the file is created; an existing
+                      file keeps its own
+
+        Raises:
+            SnapshotError: If the file cannot be opened
+        """
+        self._mmap, self.capacity = _open_region(path, capacity, writable=False)
+        self._generation: _Generation = (0, None, {})
+
+    def sequence(self) -> int:
+        """Sequence number of the latest generation; 0 before the first publish."""
+        return _SEQUENCE.unpack_from(self._mmap, _SEQUENCE_OFFSET)[0]
+
+    @property
+    def environment(self) -> Optional[str]:
+        """Environment of the latest generation."""
+        snapshot = self._current()[1]
+        return snapshot.environment if snapshot is not None else None
+
+    def get_flag(self, flag_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a flag from the latest generation.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Flag details, or None if the flag is unknown
+        """
+        while True:
+            sequence, snapshot, parsed = self._current()
+            if flag_id in parsed:
+                return parsed[flag_id]
+            if snapshot is None:
+                return None
+            try:
+                flag = snapshot.get(flag_id)
+            except (ValueError, struct.error):
+                flag = None
+                if not self._lapped(sequence):
+                    raise SnapshotError("Shared flag store is corrupt")
+            if not self._lapped(sequence):
+                parsed[flag_id] = flag
+                return flag
+
+    def all_flags(self) -> List[Dict[str, Any]]:
+        """Get every flag of the latest generation."""
+        while True:
+            sequence, snapshot, _ = self._current()
+            if snapshot is None:
+                return []
+            try:
+                flags = snapshot.flags()
+            except (ValueError, struct.error):
+                flags = None
+                if not self._lapped(sequence):
+                    raise SnapshotError("Shared flag store is corrupt")
+            if not self._lapped(sequence):
+                return flags
+
+    def close(self):
+        """Release the memory mapping."""
+        self._generation = (0, None, {})
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A flag lookup in another thread still holds a view; the
+            # mapping is released once it is garbage collected.
+            pass
+
+    def _lapped(self, sequence: int) -> bool:
+        """Check if the writer may have started overwriting generation ``sequence``."""
+        return self.sequence() != sequence
+
+    def _current(self) -> _Generation:
+        """Return the latest generation, opening it if the sequence moved."""
+        generation = self._generation
+        sequence = self.sequence()
+        while sequence != generation[0]:
+            slot = sequence % 2
+            (length,) = _SLOT_LENGTH.unpack_from(self._mmap, _SLOT_LENGTH_OFFSET + slot * _SLOT_LENGTH.size)
+            start = _HEADER_SIZE + slot * self.capacity
+            try:
+                snapshot = FlagSnapshot(memoryview(self._mmap)[start:start + length])
+            except SnapshotError:
+                if not self._lapped(sequence):
+                    raise
+            else:
+                if not self._lapped(sequence):
+                    generation = (sequence, snapshot, {})
+                    self._generation = generation
+                    break
+            sequence = self.sequence()
+        return generation
+
+
+class SharedFlagStore:
+    """
+    Flag store shared by every process on a host that opens the same file.
+
+    All processes evaluate from the shared file. One of them, elected through
+    an exclusive lock on ``<path>.lock``, also runs a ``FlagStore`` (WebSocket
+    or polling, per ``store_options``) and publishes each change. If it exits
+    the lock is released, and another process takes over within
+    ``election_interval`` seconds. A sidecar process that only starts a
+    ``SharedFlagStore`` becomes the leader if it starts first.
+
+    Start the store in each worker after the fork (e.g. gunicorn's
+    ``post_fork``): a lock inherited through ``fork`` is never released.
+    """
+
+    def __init__(
+        self,
+        client: FeatureFlagClient,
+        path: str,
+        environment: str = "development",
+        engine: Optional[RuleEngine] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        election_interval: float = 5.0,
+        exposure_reporter: Optional[ExposureReporter] = None,
+        metrics: Optional[SDKMetrics] = None,
+        **store_options: Any,
+    ):
+        """
+        Initialize the shared flag store.
+
+        Args:
+            client: REST client the leader loads flags with
+            path: Shared flag store file, e.g. /dev/shm/flags-production
+            environment: Environment whose flags are shared
+            engine: Rule engine used for local evaluation
+            capacity: Slot size in bytes; must fit the encoded flag set
+            election_interval: Seconds between attempts to become the leader
+            exposure_reporter: If set, every local evaluation of a known flag
+                               is reported through it
+            metrics: Registry recording local evaluation latency; also
+                     passed to the leader's ``FlagStore``
+            **store_options: Options for the leader's ``FlagStore``
+                             (ws_url, poll_interval, snapshot_path, ...)
+        """
+        self.client = client
+        self.path = path
+        self.environment = environment
+        self.engine = engine or RuleEngine()
+        self.capacity = capacity
+        self.election_interval = election_interval
+        self.exposure_reporter = exposure_reporter
+        self.store_options = store_options
+        self.metrics = metrics
+        self._evaluations = metrics.histogram("evaluation_duration_seconds", source="shared") if metrics else None
+        self.reader: Optional[SharedFlagReader] = None
+        self._store: Optional[FlagStore] = None
+        self._writer: Optional[SharedFlagWriter] = None
+        self._lock_fd: Optional[int] = None
+        self._stopped = threading.Event()
+        self._election: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Open the shared file and start competing for leadership.
+
+        Raises:
+            SnapshotError: If the shared file cannot be opened
+        """
+        self.reader = SharedFlagReader(self.path, self.capacity)
+        self._stopped.clear()
+        if not self._try_lead():
+            self._election = threading.Thread(target=self._elect, daemon=True)
+            self._election.start()
+
+    def stop(self):
+        """Stop reading and, if leading, stop updating the shared file."""
+        self._stopped.set()
+        if self._election is not None:
+            self._election.join()
+            self._election = None
+        if self._store is not None:
+            self._store.stop()
+            self._store = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        if self.exposure_reporter is not None:
+            self.exposure_reporter.close()
+
+    def is_leader(self) -> bool:
+        """Check if this process updates the shared file."""
+        return self._store is not None
+
+    def is_ready(self) -> bool:
+        """Check if a flag set has been published."""
+        return self.reader is not None and self.reader.sequence() > 0
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the first flag set has been published.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the store is ready
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_ready():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_flag(self, flag_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a flag from shared memory.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Flag details, or None if the flag is unknown
+        """
+        return self.reader.get_flag(flag_id)
+
+    def all_flags(self) -> List[Dict[str, Any]]:
+        """Get every flag currently in shared memory."""
+        return self.reader.all_flags()
+
+    def evaluate(self, flag_id: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Evaluate a flag locally.
+
+        Args:
+            flag_id: Flag identifier
+            context: Evaluation context
+
+        Returns:
+            Evaluation result with enabled status and reason
+        """
+        flag = self.reader.get_flag(flag_id)
+        if flag is None:
+            return {"enabled": False, "reason": "Flag not found"}
+        if self._evaluations is None:
+            result = self.engine.evaluate(flag, context)
+        else:
+            start = time.perf_counter()
+            result = self.engine.evaluate(flag, context)
+            self._evaluations.observe(time.perf_counter() - start)
+        if self.exposure_reporter is not None:
+            user_id = context.get("userId") if context else None
+            self.exposure_reporter.record(flag_id, result["enabled"], user_id, context)
+        return result
+
+    def is_enabled(self, flag_id: str, context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Check if a flag is enabled for a context.
+
+        Args:
+            flag_id: Flag identifier
+            context: Evaluation context
+
+        Returns:
+            True if the flag evaluates to enabled
+        """
+        return self.evaluate(flag_id, context)["enabled"]
+
+    def _elect(self):
+        """Retry leadership until elected or stopped."""
+        while not self._stopped.wait(self.election_interval):
+            if self._try_lead():
+                return
+
+    def _try_lead(self) -> bool:
+        """Become the leader if no other process is."""
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._lock_fd = fd
+        self._writer = SharedFlagWriter(self.path, self.environment, self.capacity)
+        store = FlagStore(
+            self.client, self.environment, engine=self.engine, metrics=self.metrics, **self.store_options
+        )
+        store.on_change(lambda action, flag: self._publish(store))
+        self._store = store
+        store.start()
+        # A warm start from the store's snapshot file does not notify
+        if store.is_ready():
+            self._publish(store)
+        return True
+
+    def _publish(self, store: FlagStore):
+        try:
+            self._writer.publish(store.all_flags())
+        except SnapshotError as e:
+            logger.warning("Failed to publish shared flags: %s", e)
+
+    def __enter__(self):
+        """Context manager entry."""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.stop()
@@ -0,0 +1,331 @@
+"""Persistent on-disk flag snapshots for cold start and offline fallback.
+
+File layout (little-endian)::
+
+    header   magic "FFSNAP\\0\\0", format version (u16), reserved (u16),
+             flag count (u32), created_at (f64), body length (u32),
+             CRC-32 of the body (u32)
+    body     environment length (u16) + UTF-8 environment
+             index: one (id hash u64, offset u32, length u32) entry per flag,
+                    sorted by id hash
+             records: compact JSON of each flag
+
+The index is fixed-width and sorted, so ``FlagSnapshot.get`` binary-searches
+the memory-mapped file and parses only the record it needs.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .exceptions import SnapshotError
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FFSNAP\0\0"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHIdII")
+_ENV_LENGTH = struct.Struct("<H")
+_INDEX_ENTRY = struct.Struct("<QII")
+
+
+def _id_hash(flag_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(flag_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def encode_snapshot(
+    flags: List[Dict[str, Any]], environment: str, created_at: Optional[float] = None
+) -> bytes:
+    """
+    Serialize flags into the snapshot format.
+
+    Args:
+        flags: Flags as returned by ``get_all_flags``
+        environment: Environment the flags belong to
+        created_at: Snapshot timestamp (defaults to now)
+
+    Returns:
+        Encoded snapshot
+    """
+    env_bytes = environment.encode("utf-8")
+    records = sorted(
+        ((_id_hash(flag["id"]), json.dumps(flag, separators=(",", ":"), default=str).encode("utf-8")) for flag in flags),
+        key=lambda record: record[0],
+    )
+
+    index_start = _ENV_LENGTH.size + len(env_bytes)
+    offset = _HEADER.size + index_start + _INDEX_ENTRY.size * len(records)
+    index = bytearray()
+    for id_hash, payload in records:
+        index += _INDEX_ENTRY.pack(id_hash, offset, len(payload))
+        offset += len(payload)
+
+    body = b"".join([_ENV_LENGTH.pack(len(env_bytes)), env_bytes, bytes(index)] + [payload for _, payload in records])
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        len(records),
+        time.time() if created_at is None else created_at,
+        len(body),
+        zlib.crc32(body),
+    )
+    return header + body
+
+
+def write_snapshot(path: str, flags: List[Dict[str, Any]], environment: str):
+    """
+    Atomically write a snapshot file.
+
+    The data is written to a temporary file in the same directory and renamed
+    over ``path``, so readers never observe a partially written snapshot.
+
+    Args:
+        path: Snapshot file path
+        flags: Flags as returned by ``get_all_flags``
+        environment: Environment the flags belong to
+    """
+    data = encode_snapshot(flags, environment)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ffsnap-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class SnapshotWriter:
+    """
+    Writes snapshots to one file on a background thread.
+
+    Submissions within ``delay`` seconds of each other are coalesced into a
+    single write of the latest flag set, and a flag set identical to the one
+    last written is skipped, so frequent updates cost neither an encode nor
+    an fsync on the thread that applies them.
+    """
+
+    def __init__(self, path: str, delay: float = 1.0, on_write: Optional[Callable[[], None]] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Snapshot file path
+            delay: Seconds a submission waits for later ones before writing
+            on_write: Called after each write that replaced the file
+        """
+        self.path = path
+        self.delay = delay
+        self.on_write = on_write
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._timer: Optional[threading.Timer] = None
+        self._digest: Optional[bytes] = None
+
+    def submit(
+        self, flags: Union[List[Dict[str, Any]], Callable[[], List[Dict[str, Any]]]], environment: str
+    ):
+        """
+        Schedule a write, replacing any submission not yet written.
+
+        Args:
+            flags: Flags to write, or a function returning them at write time
+            environment: Environment the flags belong to
+        """
+        with self._lock:
+            self._pending = (flags, environment)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.start()
+
+    def mark_written(self, flags: List[Dict[str, Any]], environment: str):
+        """Record that the file already holds these flags, e.g. after loading it."""
+        with self._write_lock:
+            self._digest = _content_digest(flags, environment)
+
+    def flush(self):
+        """Write the pending submission now, if there is one."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if pending is None:
+                return
+
+            flags, environment = pending
+            if callable(flags):
+                flags = flags()
+            digest = _content_digest(flags, environment)
+            if digest == self._digest:
+                return
+            try:
+                write_snapshot(self.path, flags, environment)
+            except OSError as e:
+                logger.warning("Failed to write flag snapshot: %s", e)
+                return
+            self._digest = digest
+        if self.on_write is not None:
+            self.on_write()
+
+    def close(self):
+        """Write any pending submission."""
+        self.flush()
+
+
+def _content_digest(flags: List[Dict[str, Any]], environment: str) -> bytes:
+    digest = hashlib.blake2b(environment.encode("utf-8"), digest_size=16)
+    for flag in sorted(flags, key=lambda flag: flag["id"]):
+        digest.update(json.dumps(flag, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8"))
+    return digest.digest()
+
+
+class FlagSnapshot:
+    """Read-only view of a snapshot, parsing flag records on demand."""
+
+    def __init__(self, buffer, verify: bool = True, _mmap: Optional[mmap.mmap] = None):
+        """
+        Initialize the snapshot view.
+
+        Args:
+            buffer: Bytes-like object holding an encoded snapshot
+            verify: Check the body checksum
+
+        Raises:
+            SnapshotError: If the data is not a valid snapshot
+        """
+        self._mmap = _mmap
+        self._view = memoryview(buffer)
+        try:
+            self._parse_header(verify)
+        except SnapshotError:
+            self._view.release()
+            raise
+
+    def _parse_header(self, verify: bool):
+        if len(self._view) < _HEADER.size:
+            raise SnapshotError("Snapshot is truncated")
+
+        magic, version, _, count, created_at, body_length, checksum = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            raise SnapshotError("Not a flag snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}")
+        if len(self._view) != _HEADER.size + body_length:
+            raise SnapshotError("Snapshot is truncated")
+        if verify and zlib.crc32(self._view[_HEADER.size:]) != checksum:
+            raise SnapshotError("Snapshot checksum mismatch")
+
+        (env_length,) = _ENV_LENGTH.unpack_from(self._view, _HEADER.size)
+        env_start = _HEADER.size + _ENV_LENGTH.size
+        self.environment = bytes(self._view[env_start:env_start + env_length]).decode("utf-8")
+        self.created_at = created_at
+        self._count = count
+        self._index_start = env_start + env_length
+
+    @classmethod
+    def open(cls, path: str, verify: bool = True) -> "FlagSnapshot":
+        """
+        Memory-map a snapshot file.
+
+        Args:
+            path: Snapshot file path
+            verify: Check the body checksum
+
+        Returns:
+            Snapshot view backed by the mapped file
+
+        Raises:
+            SnapshotError: If the file is missing or not a valid snapshot
+        """
+        try:
+            with open(path, "rb") as fh:
+                mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Failed to open snapshot: {str(e)}")
+        try:
+            return cls(mapped, verify=verify, _mmap=mapped)
+        except SnapshotError:
+            mapped.close()
+            raise
+
+    def age(self) -> float:
+        """Seconds since the snapshot was written."""
+        return time.time() - self.created_at
+
+    def get(self, flag_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a single flag without parsing the others.
+
+        Args:
+            flag_id: Flag identifier
+
+        Returns:
+            Flag details, or None if the flag is not in the snapshot
+        """
+        target = _id_hash(flag_id)
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._entry(mid)[0] < target:
+                low = mid + 1
+            else:
+                high = mid
+
+        # Walk the (rare) run of entries sharing the same id hash
+        while low < self._count:
+            id_hash, offset, length = self._entry(low)
+            if id_hash != target:
+                break
+            flag = self._record(offset, length)
+            if flag.get("id") == flag_id:
+                return flag
+            low += 1
+        return None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            _, offset, length = self._entry(i)
+            yield self._record(offset, length)
+
+    def flags(self) -> List[Dict[str, Any]]:
+        """Parse and return every flag in the snapshot."""
+        return list(self)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        """Release the memory mapping."""
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+    def _entry(self, i: int):
+        return _INDEX_ENTRY.unpack_from(self._view, self._index_start + i * _INDEX_ENTRY.size)
+
+    def _record(self, offset: int, length: int) -> Dict[str, Any]:
+        return json.loads(bytes(self._view[offset:offset + length]))
@@ -0,0 +1,241 @@
+"""HTTP transport for the REST client: connection pooling, retries and a circuit breaker."""
+
+import socket
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+# Methods retried after a read error or a 502/503/504 response. POST is left
+# out: evaluations are recorded server-side and must not be counted twice.
+# Connection errors are retried for every method, since the request was
+# never sent.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Endpoints a client's circuit breaker guards by default. Admin and reporting
+# calls fail independently of evaluation and must not open the breaker for it.
+EVALUATION_PATHS = ("/evaluate", "/evaluate/bulk", "/evaluate/all")
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the API keeps failing.
+
+    After ``failure_threshold`` consecutive failures (connection errors,
+    timeouts and 5xx responses, each counted once after retries) the breaker
+    opens and requests fail without touching the network. Once
+    ``reset_timeout`` seconds have passed, a single trial request is let
+    through: success closes the breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: CLOSED, OPEN, or HALF_OPEN when a trial request is due."""
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                return self.OPEN
+            return self.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """Check if a request may be sent; claims the trial when one is due."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        """Record a request the API answered, closing the breaker."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        """Record a failed request, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+class _ObservedRetry(Retry):
+    """Retry that reports each retry it allows."""
+
+    def __init__(self, *args, on_retry: Optional[Callable[[], None]] = None, **kwargs):
+        self.on_retry = on_retry
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, *args, **kwargs):
+        # Raises MaxRetryError instead when the retries are exhausted
+        retry = super().increment(*args, **kwargs)
+        if self.on_retry is not None:
+            self.on_retry()
+        return retry
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive on pooled sockets and an optional circuit breaker."""
+
+    def __init__(
+        self,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        tcp_keepalive: Optional[int] = 60,
+        circuit_breaker_paths: Optional[Iterable[str]] = None,
+        **kwargs,
+    ):
+        """
+        Initialize the adapter.
+
+        Args:
+            circuit_breaker: Breaker consulted before, and updated after, each request
+            circuit_breaker_paths: URL path suffixes the breaker applies to;
+                                   None for every request
+            tcp_keepalive: Idle seconds before keep-alive probes are sent on a
+                           pooled connection; None keeps the system defaults
+            **kwargs: HTTPAdapter options (pool_connections, pool_maxsize,
+                      max_retries, pool_block)
+        """
+        # Set before HTTPAdapter.__init__, which builds the pool manager
+        self.circuit_breaker = circuit_breaker
+        self.circuit_breaker_paths = tuple(circuit_breaker_paths) if circuit_breaker_paths is not None else None
+        self.socket_options = _socket_options(tcp_keepalive)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        breaker = self.circuit_breaker
+        if breaker is None or not self._guards(request.url):
+            return super().send(request, **kwargs)
+
+        if not breaker.allow_request():
+            raise CircuitOpenError("Circuit breaker is open; request not sent", request=request)
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _guards(self, url: str) -> bool:
+        """Check if the circuit breaker applies to a request URL."""
+        paths = self.circuit_breaker_paths
+        return paths is None or guarded_path(urlsplit(url).path, paths)
+
+
+def guarded_path(path: str, paths: Iterable[str]) -> bool:
+    """Check if a URL path ends with one of ``paths``."""
+    path = path.rstrip("/")
+    return any(path.endswith(suffix) for suffix in paths)
+
+
+def create_session(
+    pool_size: int = 10,
+    max_retries: int = 2,
+    retry_backoff: float = 0.2,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    tcp_keepalive: Optional[int] = 60,
+    on_retry: Optional[Callable[[], None]] = None,
+    circuit_breaker_paths: Optional[Iterable[str]] = None,
+) -> requests.Session:
+    """
+    Create a requests session with pooled, retrying connections.
+
+    Args:
+        pool_size: Connections kept open per host
+        max_retries: Retries per request (see IDEMPOTENT_METHODS)
+        retry_backoff: Backoff factor between retries, in seconds
+        circuit_breaker: Optional breaker shared by every request of the session
+        tcp_keepalive: Idle seconds before TCP keep-alive probes; None for system defaults
+        on_retry: Called each time a request is retried
+        circuit_breaker_paths: URL path suffixes the breaker applies to, e.g.
+                               EVALUATION_PATHS; None for every request
+
+    Returns:
+        The configured session
+    """
+    retry = _ObservedRetry(
+        total=max_retries,
+        allowed_methods=IDEMPOTENT_METHODS,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=retry_backoff,
+        # Hand the last 5xx response back instead of raising MaxRetryError
+        raise_on_status=False,
+        on_retry=on_retry,
+    )
+    adapter = PooledHTTPAdapter(
+        circuit_breaker=circuit_breaker,
+        circuit_breaker_paths=circuit_breaker_paths,
+        tcp_keepalive=tcp_keepalive,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _socket_options(tcp_keepalive: Optional[int]) -> List[Tuple[int, int, int]]:
+    """Socket options for pooled connections."""
+    options = list(HTTPConnection.default_socket_options)
+    if tcp_keepalive is None:
+        return options
+
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Not every platform exposes the per-socket timers
+    for name, value in (
+        ("TCP_KEEPIDLE", tcp_keepalive),
+        ("TCP_KEEPINTVL", max(1, tcp_keepalive // 4)),
+        ("TCP_KEEPCNT", 4),
+    ):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
@@ -1,39 +1,72 @@
 """WebSocket client for real-time Feature Flag updates."""
 
 import json
+import logging
+import random
 import threading
-from typing import Callable, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, List
+from urllib.parse import urlencode, urlsplit, urlunsplit
 from websocket import WebSocketApp
 from .exceptions import ConnectionError
+from .metrics import SDKMetrics
+
+logger = logging.getLogger(__name__)
 
 
 class WebSocketClient:
     """Client for receiving real-time feature flag updates via WebSocket."""
 
-    def __init__(self, url: str = "ws://localhost:3001/ws"):
+    def __init__(
+        self,
+        url: str = "ws://localhost:3001/ws",
+        reconnect: bool = False,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        environments: Optional[List[str]] = None,
+        flag_ids: Optional[List[str]] = None,
+        metrics: Optional[SDKMetrics] = None,
+    ):
         """
         Initialize WebSocket client.
 
         Args:
             url: WebSocket server URL
+            reconnect: Reconnect automatically after the connection drops
+            reconnect_delay: Initial delay in seconds before reconnecting
+            max_reconnect_delay: Upper bound for the exponential backoff
+            environments: Only receive updates to flags of these environments
+            flag_ids: Only receive updates to these flags
+            metrics: Registry counting reconnection attempts
         """
         self.url = url
         self.ws = None
         self.connected = False
         self.thread = None
-        self._on_flag_update_callback = None
+        self.reconnect = reconnect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.environments = list(environments or [])
+        self.flag_ids = list(flag_ids or [])
+        self._reconnects = metrics.counter("websocket_reconnects_total") if metrics else None
+        self._stopped = threading.Event()
+        self._opened = threading.Event()
+        self._on_flag_update_callbacks: List[Callable[[Dict[str, Any]], None]] = []
         self._on_message_callback = None
         self._on_error_callback = None
+        self._on_connect_callbacks: List[Callable[[], None]] = []
+        self._on_disconnect_callbacks: List[Callable[[], None]] = []
 
     def on_flag_update(self, callback: Callable[[Dict[str, Any]], None]):
         """
         Register callback for flag update events.
 
+        Several callbacks may be registered; they are called in order.
+
         Args:
             callback: Function to call when a flag is updated
                      Receives dict with 'action', 'flag', and 'timestamp'
         """
-        self._on_flag_update_callback = callback
+        self._on_flag_update_callbacks.append(callback)
 
     def on_message(self, callback: Callable[[Dict[str, Any]], None]):
         """
@@ -53,18 +86,50 @@ class WebSocketClient:
         """
         self._on_error_callback = callback
 
+    def on_connect(self, callback: Callable[[], None]):
+        """
+        Register callback for (re)established connections.
+
+        Args:
+            callback: Function to call each time the connection opens
+        """
+        self._on_connect_callbacks.append(callback)
+
+    def on_disconnect(self, callback: Callable[[], None]):
+        """
+        Register callback for dropped connections.
+
+        Args:
+            callback: Function to call each time the connection closes
+        """
+        self._on_disconnect_callbacks.append(callback)
+
+    def subscribe(
+        self, environments: Optional[List[str]] = None, flag_ids: Optional[List[str]] = None
+    ):
+        """
+        Replace the subscription filter, also for future reconnections.
+
+        Args:
+            environments: Only receive updates to flags of these environments;
+                          None or empty for all environments
+            flag_ids: Only receive updates to these flags; None or empty for
+                      all flags
+        """
+        self.environments = list(environments or [])
+        self.flag_ids = list(flag_ids or [])
+        if self.connected:
+            self.ws.send(json.dumps({
+                "type": "subscribe",
+                "environments": self.environments,
+                "flagIds": self.flag_ids,
+            }))
+
     def connect(self):
         """Establish WebSocket connection."""
         try:
-            self.ws = WebSocketApp(
-                self.url,
-                on_open=self._on_open,
-                on_message=self._on_message,
-                on_error=self._on_error,
-                on_close=self._on_close,
-            )
-
-            self.thread = threading.Thread(target=self.ws.run_forever, daemon=True)
+            self._stopped.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
             self.thread.start()
 
         except Exception as e:
@@ -72,14 +137,57 @@ class WebSocketClient:
 
     def disconnect(self):
         """Close WebSocket connection."""
+        self._stopped.set()
         if self.ws:
             self.ws.close()
         self.connected = False
 
+    def _run(self):
+        """Run the connection, reconnecting with jittered exponential backoff."""
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            self.ws = WebSocketApp(
+                self._subscription_url(),
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            self._opened.clear()
+            self.ws.run_forever()
+
+            if not self.reconnect or self._stopped.is_set():
+                break
+            if self._opened.is_set():
+                delay = self.reconnect_delay
+            if self._stopped.wait(delay * random.uniform(0.5, 1.5)):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+            logger.info("Reconnecting WebSocket to %s", self.url)
+            if self._reconnects is not None:
+                self._reconnects.inc()
+
+    def _subscription_url(self) -> str:
+        """Server URL with the subscription filter in the query string."""
+        params = {}
+        if self.environments:
+            params["environments"] = ",".join(self.environments)
+        if self.flag_ids:
+            params["flagIds"] = ",".join(self.flag_ids)
+        if not params:
+            return self.url
+
+        parts = urlsplit(self.url)
+        query = "&".join(filter(None, [parts.query, urlencode(params)]))
+        return urlunsplit(parts._replace(query=query))
+
     def _on_open(self, ws):
         """Handle WebSocket connection opened."""
         self.connected = True
-        print("WebSocket connected")
+        self._opened.set()
+        logger.info("WebSocket connected to %s", self.url)
+        for callback in self._on_connect_callbacks:
+            callback()
 
     def _on_message(self, ws, message):
         """Handle incoming WebSocket message."""
@@ -91,22 +199,25 @@ class WebSocketClient:
                 self._on_message_callback(data)
 
             # Handle flag update events
-            if data.get("type") == "flag_update" and self._on_flag_update_callback:
-                self._on_flag_update_callback(data)
+            if data.get("type") == "flag_update":
+                for callback in self._on_flag_update_callbacks:
+                    callback(data)
 
         except json.JSONDecodeError as e:
-            print(f"Failed to parse WebSocket message: {e}")
+            logger.warning("Failed to parse WebSocket message: %s", e)
 
     def _on_error(self, ws, error):
         """Handle WebSocket error."""
-        print(f"WebSocket error: {error}")
+        logger.warning("WebSocket error: %s", error)
         if self._on_error_callback:
             self._on_error_callback(error)
 
     def _on_close(self, ws, close_status_code, close_msg):
         """Handle WebSocket connection closed."""
         self.connected = False
-        print(f"WebSocket disconnected: {close_status_code} - {close_msg}")
+        logger.info("WebSocket disconnected: %s - %s", close_status_code, close_msg)
+        for callback in self._on_disconnect_callbacks:
+            callback()
 
     def is_connected(self) -> bool:
         """Check if WebSocket is connected."""
@@ -15,7 +15,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/feature-flag-system",
-    packages=find_packages(exclude=["tests", "tests.*"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks", "benchmarks.*"]),
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -47,6 +47,9 @@ setup(
             "aiohttp>=3.9.1",
             "asyncio>=3.4.3",
         ],
+        "numpy": [
+            "numpy>=1.24",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,88 @@
+"""Tests for micro-batching of flag evaluations."""
+
+import threading
+
+import pytest
+
+from feature_flag_client.batching import EvaluationBatcher
+from feature_flag_client.exceptions import EvaluationError
+
+
+class _BulkSender:
+    def __init__(self, results=None, error=None):
+        self.calls = []
+        self.results = results
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self, flag_ids, user_id, context):
+        with self._lock:
+            self.calls.append((sorted(flag_ids), user_id, context))
+        if self.error is not None:
+            raise self.error
+        if self.results is not None:
+            return self.results
+        return {flag_id: {"enabled": True, "reason": f"{flag_id} for {user_id}"} for flag_id in flag_ids}
+
+
+def test_evaluations_within_the_window_share_one_request():
+    sender = _BulkSender()
+    batcher = EvaluationBatcher(sender, window=0.5)
+
+    futures = [batcher.submit(flag_id, "user-1", {"plan": "pro"}) for flag_id in ("a", "b", "a")]
+    results = [future.result(5) for future in futures]
+    batcher.close()
+
+    assert sender.calls == [(["a", "b"], "user-1", {"plan": "pro"})]
+    assert [result["reason"] for result in results] == ["a for user-1", "b for user-1", "a for user-1"]
+
+
+def test_different_users_are_sent_separately():
+    sender = _BulkSender()
+    batcher = EvaluationBatcher(sender, window=0.05)
+
+    futures = [batcher.submit("a", user_id) for user_id in ("user-1", "user-2")]
+    for future in futures:
+        future.result(5)
+    batcher.close()
+
+    assert sorted(call[1] for call in sender.calls) == ["user-1", "user-2"]
+
+
+def test_full_batch_is_sent_before_the_window_ends():
+    sender = _BulkSender()
+    batcher = EvaluationBatcher(sender, window=60, max_batch_size=2)
+
+    futures = [batcher.submit(flag_id, "user-1") for flag_id in ("a", "b")]
+    assert [future.result(5)["enabled"] for future in futures] == [True, True]
+    batcher.close()
+
+
+def test_failures_reach_every_waiter():
+    batcher = EvaluationBatcher(_BulkSender(error=ConnectionError("down")), window=0.01)
+    futures = [batcher.submit(flag_id, "user-1") for flag_id in ("a", "b")]
+
+    for future in futures:
+        with pytest.raises(EvaluationError):
+            future.result(5)
+    batcher.close()
+
+
+def test_flags_missing_from_the_response_fail():
+    sender = _BulkSender(results={"a": {"enabled": True, "reason": "ok"}, "b": {"error": "Flag not found"}})
+    batcher = EvaluationBatcher(sender, window=0.01)
+    a, b, c = (batcher.submit(flag_id, "user-1") for flag_id in ("a", "b", "c"))
+
+    assert a.result(5) == {"enabled": True, "reason": "ok"}
+    with pytest.raises(EvaluationError, match="Flag not found"):
+        b.result(5)
+    with pytest.raises(EvaluationError, match="missing from bulk response"):
+        c.result(5)
+    batcher.close()
+
+
+def test_submit_after_close_raises():
+    batcher = EvaluationBatcher(_BulkSender())
+    batcher.close()
+    with pytest.raises(EvaluationError):
+        batcher.submit("a", "user-1")
@@ -0,0 +1,30 @@
+"""Tests for vectorized bulk user evaluation."""
+
+import pytest
+
+from feature_flag_client.rule_engine import RuleEngine, simple_hash
+
+np = pytest.importorskip("numpy")
+
+from feature_flag_client.bulk_users import BulkUserEvaluator, simple_hash_array  # noqa: E402
+
+USER_IDS = ["", "user-1", "user-42", "a\x00", "\x00", "x\x00\x00", "a\x00b", "ü-user", "😀", "😀\x00", "long" * 20]
+
+
+@pytest.mark.parametrize("values", [USER_IDS, np.array(USER_IDS, dtype=object)])
+def test_simple_hash_array_matches_simple_hash(values):
+    assert simple_hash_array(values).tolist() == [simple_hash(user_id) for user_id in USER_IDS]
+
+
+def test_simple_hash_array_of_nul_only_strings():
+    assert simple_hash_array(["\x00", "\x00\x00"]).tolist() == [simple_hash("\x00"), simple_hash("\x00\x00")]
+
+
+def test_bulk_percentage_rollout_matches_rule_engine():
+    flag = {"id": "f", "enabled": True, "rules": [{"type": "percentage", "operator": "less_than", "value": 50}]}
+    engine = RuleEngine()
+    user_ids = USER_IDS + [f"user-{i}" for i in range(200)]
+
+    (chunk,) = BulkUserEvaluator(engine).evaluate(flag, user_ids)
+
+    assert chunk.enabled.tolist() == [engine.evaluate(flag, {"userId": user_id})["enabled"] for user_id in user_ids]
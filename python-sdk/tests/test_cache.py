@@ -0,0 +1,72 @@
+"""Tests for the evaluation cache."""
+
+from feature_flag_client.cache import EvaluationCache
+
+
+def test_cached_results_are_not_shared_with_callers():
+    cache = EvaluationCache()
+    key = cache.make_key("flag", "user-1", {"country": "US"})
+    result = {"enabled": True, "reason": "All rules passed", "details": {"rules": ["user"]}}
+    cache.set(key, result)
+
+    result["enabled"] = False
+    first = cache.get(key)
+    first["reason"] = "changed"
+    first["details"]["rules"].append("geo")
+
+    assert cache.get(key) == {"enabled": True, "reason": "All rules passed", "details": {"rules": ["user"]}}
+
+
+def test_key_ignores_context_order():
+    make_key = EvaluationCache.make_key
+    assert make_key("flag", "u", {"a": 1, "b": 2}) == make_key("flag", "u", {"b": 2, "a": 1})
+    assert make_key("flag", "u", {"a": 1}) != make_key("flag", "v", {"a": 1})
+
+
+def test_expired_entries_are_misses():
+    cache = EvaluationCache(ttl=0)
+    key = cache.make_key("flag", "u")
+    cache.set(key, {"enabled": True})
+
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EvaluationCache(max_size=2)
+    first, second, third = (cache.make_key("flag", user) for user in ("a", "b", "c"))
+    cache.set(first, {"enabled": True})
+    cache.set(second, {"enabled": True})
+    cache.get(first)
+    cache.set(third, {"enabled": True})
+
+    assert cache.get(second) is None
+    assert cache.get(first) is not None
+    assert cache.get(third) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_flag_drops_only_that_flag():
+    cache = EvaluationCache()
+    one, other = cache.make_key("one", "u"), cache.make_key("other", "u")
+    cache.set(one, {"enabled": True})
+    cache.set(other, {"enabled": False})
+
+    cache.invalidate_flag("one")
+
+    assert cache.get(one) is None
+    assert cache.get(other) == {"enabled": False}
+
+
+def test_result_fetched_across_an_invalidation_is_not_stored():
+    cache = EvaluationCache()
+    key = cache.make_key("flag", "u")
+    version = cache.version("flag")
+    cache.invalidate_flag("flag")
+    cache.set(key, {"enabled": True}, version)
+    assert cache.get(key) is None
+
+    version = cache.version("flag")
+    cache.clear()
+    cache.set(key, {"enabled": True}, version)
+    assert cache.get(key) is None
@@ -0,0 +1,118 @@
+"""Tests for the command line interface (offline bulk evaluation)."""
+
+import csv
+import json
+
+import pytest
+
+from feature_flag_client.cli import main
+
+FLAGS = [
+    {"id": "beta", "enabled": True, "rules": [{"type": "user", "operator": "in", "value": ["u1", "u3"]}]},
+    {"id": "off", "enabled": False, "rules": []},
+    {"id": "rollout", "enabled": True, "rules": [{"type": "percentage", "operator": "less_than", "value": 50}]},
+]
+GEO_FLAG = {"id": "us-only", "enabled": True, "rules": [{"type": "geo", "operator": "in", "value": ["US"]}]}
+SEGMENT_FLAG = {"id": "staff", "enabled": True, "rules": [{"type": "segment", "operator": "in", "value": "seg-1"}]}
+
+
+def lookup_country(ip):
+    return {"1.2.3.4": "US"}.get(ip)
+
+
+def _write_lines(path, items):
+    path.write_text("".join(json.dumps(item) + "\n" for item in items))
+    return str(path)
+
+
+def _run(tmp_path, flags, users, *options):
+    flags_file = _write_lines(tmp_path / "flags.jsonl", flags)
+    users_file = _write_lines(tmp_path / "users.jsonl", users)
+    output = tmp_path / "results.jsonl"
+    status = main(["bulk-evaluate", users_file, "--flags-file", flags_file, "-o", str(output), *options])
+    results = [json.loads(line) for line in output.read_text().splitlines()] if output.exists() else []
+    return status, results
+
+
+def test_bulk_evaluate_from_flags_file(tmp_path, capsys):
+    status, results = _run(tmp_path, FLAGS, [{"userId": "u1"}, {"userId": "u2", "plan": "pro"}])
+
+    assert status == 0
+    assert [row["userId"] for row in results] == ["u1", "u2"]
+    assert results[0]["results"]["beta"] == {"enabled": True, "reason": "All rules passed"}
+    assert results[1]["results"]["beta"] == {"enabled": False, "reason": "User not in whitelist"}
+    assert results[1]["results"]["off"] == {"enabled": False, "reason": "Flag is disabled"}
+    assert "evaluated 2 users" in capsys.readouterr().err
+
+
+def test_bulk_evaluate_writes_csv(tmp_path):
+    flags_file = _write_lines(tmp_path / "flags.jsonl", FLAGS)
+    users = tmp_path / "users.csv"
+    users.write_text("id,plan\nu3,pro\nu4,free\n")
+    output = tmp_path / "results.csv"
+
+    status = main([
+        "bulk-evaluate", str(users), "--flags-file", flags_file, "--user-field", "id", "--flags", "off,beta",
+        "-o", str(output),
+    ])
+
+    assert status == 0
+    with open(output, newline="") as f:
+        assert list(csv.reader(f)) == [["id", "off", "beta"], ["u3", "false", "true"], ["u4", "false", "false"]]
+
+
+def test_unknown_flag_is_an_error(tmp_path, capsys):
+    status, _ = _run(tmp_path, FLAGS, [{"userId": "u1"}], "--flags", "beta,missing")
+
+    assert status == 1
+    assert "missing" in capsys.readouterr().err
+
+
+def test_geo_rules_need_a_resolver(tmp_path, capsys):
+    status, _ = _run(tmp_path, [GEO_FLAG], [{"userId": "u1", "ip": "1.2.3.4"}])
+    assert status == 1
+    assert "--geo-lookup" in capsys.readouterr().err
+
+    status, results = _run(
+        tmp_path, [GEO_FLAG], [{"userId": "u1", "ip": "1.2.3.4"}], "--geo-lookup", "test_cli:lookup_country"
+    )
+    assert status == 0
+    assert results[0]["results"]["us-only"]["enabled"] is True
+
+
+def test_unresolved_rules_can_be_allowed(tmp_path, capsys):
+    users = [{"userId": "u1", "resolved": {"country": "US"}}]
+    status, results = _run(tmp_path, [GEO_FLAG], users, "--allow-unresolved")
+
+    assert status == 0
+    assert results[0]["results"]["us-only"]["enabled"] is True
+    assert "warning" in capsys.readouterr().err
+
+
+def test_segment_rules_use_the_segments_file(tmp_path, capsys):
+    status, _ = _run(tmp_path, [SEGMENT_FLAG], [{"userId": "u1"}])
+    assert status == 1
+    assert "seg-1" in capsys.readouterr().err
+
+    segments_file = _write_lines(tmp_path / "segments.jsonl", [{"id": "seg-1", "members": ["u1"]}])
+    users = [{"userId": "u1"}, {"userId": "u2"}]
+    status, results = _run(tmp_path, [SEGMENT_FLAG], users, "--segments-file", segments_file)
+    assert status == 0
+    assert [row["results"]["staff"]["enabled"] for row in results] == [True, False]
+
+
+def test_invalid_resolver_is_rejected(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        _run(tmp_path, [GEO_FLAG], [], "--geo-lookup", "no_such_module:lookup")
+    assert "cannot import" in capsys.readouterr().err
+
+
+def test_invalid_json_line_is_reported(tmp_path, capsys):
+    flags_file = _write_lines(tmp_path / "flags.jsonl", FLAGS)
+    users = tmp_path / "users.jsonl"
+    users.write_text('{"userId": "u1"}\nnot json\n')
+
+    status = main(["bulk-evaluate", str(users), "--flags-file", flags_file, "-o", str(tmp_path / "out.jsonl")])
+
+    assert status == 1
+    assert "line 2" in capsys.readouterr().err
@@ -0,0 +1,32 @@
+"""Tests for the background exposure reporter."""
+
+import threading
+
+from feature_flag_client.exposure import ExposureReporter
+
+
+def test_flush_sends_queued_events():
+    batches = []
+    reporter = ExposureReporter(batches.append, flush_interval=60)
+    reporter.record("flag", True, "user-1")
+    reporter.record("flag", False, "user-2")
+
+    assert reporter.flush(timeout=5)
+    assert [event["userId"] for event in batches[0]] == ["user-1", "user-2"]
+    reporter.close()
+
+
+def test_flush_after_close_returns_at_once():
+    batches = []
+    reporter = ExposureReporter(batches.append, flush_interval=60)
+    reporter.record("flag", True, "user-1")
+    reporter.close(timeout=5)
+
+    flushed = []
+    caller = threading.Thread(target=lambda: flushed.append(reporter.flush()), daemon=True)
+    caller.start()
+    caller.join(5)
+
+    assert not caller.is_alive()
+    assert flushed == [True]
+    assert len(batches) == 1
@@ -0,0 +1,96 @@
+"""Tests for SDK metrics."""
+
+import pytest
+
+from feature_flag_client.metrics import SDKMetrics, timed
+
+
+def test_gauges_with_distinct_labels_are_exported_separately():
+    metrics = SDKMetrics()
+    metrics.gauge("snapshot_age_seconds", lambda: 1.0, source="store", environment="staging")
+    metrics.gauge("snapshot_age_seconds", lambda: 2.0, source="store", environment="production")
+
+    output = metrics.export_prometheus()
+
+    assert 'feature_flag_snapshot_age_seconds{environment="production",source="store"} 2' in output
+    assert 'feature_flag_snapshot_age_seconds{environment="staging",source="store"} 1' in output
+
+
+def test_duplicate_gauge_is_rejected_until_removed():
+    metrics = SDKMetrics()
+    metrics.gauge("snapshot_age_seconds", lambda: 1.0, source="store", environment="production")
+
+    with pytest.raises(ValueError):
+        metrics.gauge("snapshot_age_seconds", lambda: 2.0, source="store", environment="production")
+
+    metrics.remove_gauge("snapshot_age_seconds", source="store", environment="production")
+    metrics.gauge("snapshot_age_seconds", lambda: 2.0, source="store", environment="production")
+    assert 'source="store"} 2' in metrics.export_prometheus()
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = SDKMetrics(buckets=(0.1, 1.0))
+    histogram = metrics.histogram("request_duration_seconds", transport="rest", method="get_flag")
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    output = metrics.export_prometheus()
+
+    labels = 'method="get_flag",transport="rest"'
+    assert f'feature_flag_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in output
+    assert f'feature_flag_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in output
+    assert f'feature_flag_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in output
+    assert f"feature_flag_request_duration_seconds_count{{{labels}}} 3" in output
+    assert "# TYPE feature_flag_request_duration_seconds histogram" in output
+
+
+def test_counters_are_shared_per_label_set_and_reach_hooks():
+    metrics = SDKMetrics()
+    seen = []
+    metrics.add_hook(lambda *observation: seen.append(observation))
+
+    hits = metrics.counter("cache_requests_total", result="hit")
+    assert metrics.counter("cache_requests_total", result="hit") is hits
+    hits.inc()
+    metrics.counter("cache_requests_total", result="miss").inc(2)
+
+    output = metrics.export_prometheus()
+    assert 'feature_flag_cache_requests_total{result="hit"} 1' in output
+    assert 'feature_flag_cache_requests_total{result="miss"} 2' in output
+    assert seen == [
+        ("counter", "cache_requests_total", 1.0, {"result": "hit"}),
+        ("counter", "cache_requests_total", 2, {"result": "miss"}),
+    ]
+
+
+def test_failing_hooks_and_gauges_are_ignored():
+    metrics = SDKMetrics()
+    metrics.add_hook(lambda *observation: 1 / 0)
+    metrics.gauge("snapshot_age_seconds", lambda: 1 / 0, source="file", path="/tmp/flags.snap")
+
+    metrics.counter("retries_total", transport="rest").inc()
+
+    assert "snapshot_age_seconds" not in metrics.export_prometheus()
+
+
+def test_timed_records_latency_and_errors():
+    class Client:
+        def __init__(self, metrics):
+            self.metrics = metrics
+
+        @timed("rest")
+        def get_flag(self, fail):
+            if fail:
+                raise ValueError("failed")
+            return "flag"
+
+    metrics = SDKMetrics()
+    client = Client(metrics)
+    assert client.get_flag(False) == "flag"
+    with pytest.raises(ValueError):
+        client.get_flag(True)
+
+    output = metrics.export_prometheus()
+    assert 'feature_flag_request_duration_seconds_count{method="get_flag",transport="rest"} 2' in output
+    assert 'feature_flag_request_errors_total{method="get_flag",transport="rest"} 1' in output
+    assert Client(None).get_flag(False) == "flag"
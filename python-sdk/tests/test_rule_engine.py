@@ -0,0 +1,29 @@
+"""Tests for the local rule engine."""
+
+from feature_flag_client.rule_engine import RuleEngine
+
+
+def _user_rule(*user_ids):
+    return {"type": "user", "operator": "in", "value": list(user_ids)}
+
+
+def test_plan_is_reused_until_updated_at_changes():
+    engine = RuleEngine()
+    flag = {"id": "f", "enabled": True, "updated_at": "2024-01-01T00:00:00Z", "rules": [_user_rule("a")]}
+
+    plan = engine.plan_for(flag)
+    assert engine.plan_for(dict(flag)) is plan
+    assert engine.plan_for({**flag, "updated_at": "2024-01-02T00:00:00Z"}) is not plan
+
+
+def test_plan_without_updated_at_follows_rule_changes():
+    engine = RuleEngine()
+    flag = {"id": "f", "enabled": True, "rules": [_user_rule("a")]}
+
+    assert engine.evaluate(flag, {"userId": "a"})["enabled"] is True
+    plan = engine.plan_for(flag)
+    assert engine.plan_for({**flag, "rules": [_user_rule("a")]}) is plan
+
+    edited = {**flag, "rules": [_user_rule("b")]}
+    assert engine.evaluate(edited, {"userId": "a"})["enabled"] is False
+    assert engine.evaluate(edited, {"userId": "b"})["enabled"] is True
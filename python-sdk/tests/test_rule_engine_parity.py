@@ -0,0 +1,539 @@
+"""
+Parity tests for the local rule engine against the backend evaluator.
+
+Expected results were produced by running ``backend/services/rule-engine.service.js``
+on the same rules and contexts, with geoip-lite, ua-parser-js and the segment
+store answering from the GEO, AGENTS and SEGMENTS tables below. Regenerate
+them the same way when the backend's rule semantics change.
+"""
+
+import pytest
+
+from feature_flag_client.rule_engine import RuleEngine, percentage_bucket, simple_hash
+
+GEO = {"1.2.3.4": "US", "5.6.7.8": "DE"}
+AGENTS = {
+    "iphone-ua": ("mobile", "iOS", "Mobile Safari"),
+    "chrome-ua": (None, "Windows", "Chrome"),
+    "tablet-ua": ("tablet", "Android", None),
+}
+SEGMENTS = {"beta": frozenset({"user-1", "user-2"}), "staff": frozenset({"user-3"})}
+
+# A context without the custom rule's field
+MISSING = object()
+
+# (operator, value, context, enabled, reason) for one rule of the table's type;
+# CUSTOM cases give the value of the rule's "plan" field instead of a context.
+GEO_CASES = [
+    ("in", ["US", "FR"], {"ip": "1.2.3.4"}, True, "All rules passed"),
+    ("in", ["US", "FR"], {"userIp": "5.6.7.8"}, False, "Country DE not in allowed list"),
+    ("in", ["US", "FR"], {"ip": "9.9.9.9"}, False, "Could not determine location"),
+    ("in", ["US", "FR"], {}, False, "No IP address provided"),
+    ("in", ["US", "FR"], {"ip": None}, False, "No IP address provided"),
+    ("not_in", ["US", "FR"], {"ip": "1.2.3.4"}, False, "Country US is in blocked list"),
+    ("not_in", ["US", "FR"], {"userIp": "5.6.7.8"}, True, "All rules passed"),
+    ("not_in", ["US", "FR"], {"ip": "9.9.9.9"}, False, "Could not determine location"),
+    ("not_in", ["US", "FR"], {}, False, "No IP address provided"),
+    ("not_in", ["US", "FR"], {"ip": None}, False, "No IP address provided"),
+    ("near", ["US", "FR"], {"ip": "1.2.3.4"}, True, "All rules passed"),
+    ("near", ["US", "FR"], {"userIp": "5.6.7.8"}, True, "All rules passed"),
+    ("near", ["US", "FR"], {"ip": "9.9.9.9"}, False, "Could not determine location"),
+    ("near", ["US", "FR"], {}, False, "No IP address provided"),
+    ("near", ["US", "FR"], {"ip": None}, False, "No IP address provided"),
+    ("in", ["US"], {"ip": "1.2.3.4", "resolved": {"country": "DE"}}, False, "Country DE not in allowed list"),
+    ("in", ["US"], {"ip": "1.2.3.4", "resolved": {"country": 5}}, True, "All rules passed"),
+    ("in", "US", {"ip": "1.2.3.4"}, False, "Country US not in allowed list"),
+    ("not_in", "US", {"ip": "1.2.3.4"}, False, "Country US is in blocked list"),
+]
+
+DEVICE_CASES = [
+    ("is", "mobile", {"userAgent": "iphone-ua"}, True, "All rules passed"),
+    ("is", "mobile", {"userAgent": "chrome-ua"}, False, "Device/OS/Browser does not match mobile"),
+    ("is", "mobile", {"userAgent": "unknown-ua"}, False, "Device/OS/Browser does not match mobile"),
+    ("is", "mobile", {}, False, "No user agent provided"),
+    ("is", "Chrome", {"userAgent": "iphone-ua"}, False, "Device/OS/Browser does not match Chrome"),
+    ("is", "Chrome", {"userAgent": "chrome-ua"}, True, "All rules passed"),
+    ("is", "Chrome", {"userAgent": "unknown-ua"}, False, "Device/OS/Browser does not match Chrome"),
+    ("is", "Chrome", {}, False, "No user agent provided"),
+    ("is", "desktop", {"userAgent": "iphone-ua"}, False, "Device/OS/Browser does not match desktop"),
+    ("is", "desktop", {"userAgent": "chrome-ua"}, True, "All rules passed"),
+    ("is", "desktop", {"userAgent": "unknown-ua"}, True, "All rules passed"),
+    ("is", "desktop", {}, False, "No user agent provided"),
+    ("is_not", "mobile", {"userAgent": "iphone-ua"}, False, "Device/OS/Browser is mobile"),
+    ("is_not", "mobile", {"userAgent": "chrome-ua"}, True, "All rules passed"),
+    ("is_not", "mobile", {"userAgent": "unknown-ua"}, True, "All rules passed"),
+    ("is_not", "mobile", {}, False, "No user agent provided"),
+    ("is_not", "Windows", {"userAgent": "iphone-ua"}, True, "All rules passed"),
+    ("is_not", "Windows", {"userAgent": "chrome-ua"}, False, "Device/OS/Browser is Windows"),
+    ("is_not", "Windows", {"userAgent": "unknown-ua"}, True, "All rules passed"),
+    ("is_not", "Windows", {}, False, "No user agent provided"),
+    ("in", ["tablet", "Chrome"], {"userAgent": "iphone-ua"}, False, "Device/OS/Browser not in allowed list"),
+    ("in", ["tablet", "Chrome"], {"userAgent": "chrome-ua"}, True, "All rules passed"),
+    ("in", ["tablet", "Chrome"], {"userAgent": "unknown-ua"}, False, "Device/OS/Browser not in allowed list"),
+    ("in", ["tablet", "Chrome"], {}, False, "No user agent provided"),
+    ("in", "mobile", {"userAgent": "iphone-ua"}, False, "Device/OS/Browser not in allowed list"),
+    ("in", "mobile", {"userAgent": "chrome-ua"}, False, "Device/OS/Browser not in allowed list"),
+    ("in", "mobile", {"userAgent": "unknown-ua"}, False, "Device/OS/Browser not in allowed list"),
+    ("in", "mobile", {}, False, "No user agent provided"),
+    ("is", None, {"userAgent": "iphone-ua"}, False, "Device/OS/Browser does not match null"),
+    ("is", None, {"userAgent": "chrome-ua"}, False, "Device/OS/Browser does not match null"),
+    ("is", None, {"userAgent": "unknown-ua"}, False, "Device/OS/Browser does not match null"),
+    ("is", None, {}, False, "No user agent provided"),
+    ("matches", "mobile", {"userAgent": "iphone-ua"}, True, "All rules passed"),
+    ("matches", "mobile", {"userAgent": "chrome-ua"}, True, "All rules passed"),
+    ("matches", "mobile", {"userAgent": "unknown-ua"}, True, "All rules passed"),
+    ("matches", "mobile", {}, False, "No user agent provided"),
+    ("is", "desktop", {"resolved": {"os": "iOS"}}, True, "All rules passed"),
+    (
+        "is",
+        "Chrome",
+        {"userAgent": "chrome-ua", "resolved": {"deviceType": "mobile", "browser": 3}},
+        False,
+        "Device/OS/Browser does not match Chrome",
+    ),
+    ("is", "tablet", {"userAgent": "tablet-ua"}, True, "All rules passed"),
+    ("in", [None], {"userAgent": "tablet-ua"}, False, "Device/OS/Browser not in allowed list"),
+    ("is_not", None, {"userAgent": "tablet-ua"}, True, "All rules passed"),
+]
+
+PERCENTAGE_CASES = [
+    ("less_than", 50, {"userId": "user-1"}, True, "All rules passed"),
+    ("less_than", 50, {"userId": "alice"}, True, "All rules passed"),
+    ("less_than", 50, {"sessionId": "session-9"}, True, "All rules passed"),
+    ("less_than", 50, {"userId": "", "sessionId": "s-1"}, False, "User not in 50% rollout"),
+    ("less_than", 50, {}, False, "No user/session ID provided"),
+    ("less_than", 50, {"userId": 12345}, True, "All rules passed"),
+    ("greater_than", 50, {"userId": "user-1"}, False, "User percentage 26 <= 50"),
+    ("greater_than", 50, {"userId": "alice"}, False, "User percentage 41 <= 50"),
+    ("greater_than", 50, {"sessionId": "session-9"}, False, "User percentage 7 <= 50"),
+    ("greater_than", 50, {"userId": "", "sessionId": "s-1"}, True, "All rules passed"),
+    ("greater_than", 50, {}, False, "No user/session ID provided"),
+    ("greater_than", 50, {"userId": 12345}, False, "User percentage 1 <= 50"),
+    ("less_than", "50", {"userId": "user-1"}, True, "All rules passed"),
+    ("less_than", "50", {"userId": "alice"}, True, "All rules passed"),
+    ("less_than", "50", {"sessionId": "session-9"}, True, "All rules passed"),
+    ("less_than", "50", {"userId": "", "sessionId": "s-1"}, False, "User not in 50% rollout"),
+    ("less_than", "50", {}, False, "No user/session ID provided"),
+    ("less_than", "50", {"userId": 12345}, True, "All rules passed"),
+    ("less_than", 33.5, {"userId": "user-1"}, True, "All rules passed"),
+    ("less_than", 33.5, {"userId": "alice"}, False, "User not in 33.5% rollout"),
+    ("less_than", 33.5, {"sessionId": "session-9"}, True, "All rules passed"),
+    ("less_than", 33.5, {"userId": "", "sessionId": "s-1"}, False, "User not in 33.5% rollout"),
+    ("less_than", 33.5, {}, False, "No user/session ID provided"),
+    ("less_than", 33.5, {"userId": 12345}, True, "All rules passed"),
+    ("between", 50, {"userId": "user-1"}, True, "All rules passed"),
+    ("between", 50, {"userId": "alice"}, True, "All rules passed"),
+    ("between", 50, {"sessionId": "session-9"}, True, "All rules passed"),
+    ("between", 50, {"userId": "", "sessionId": "s-1"}, True, "All rules passed"),
+    ("between", 50, {}, False, "No user/session ID provided"),
+    ("between", 50, {"userId": 12345}, True, "All rules passed"),
+    ("less_than", 0, {"userId": "user-1"}, False, "User not in 0% rollout"),
+    ("less_than", 100, {"userId": "user-1"}, True, "All rules passed"),
+    ("greater_than", "30", {"userId": "bob@example.com"}, True, "All rules passed"),
+    ("less_than", 50, {"userId": 0, "sessionId": "s-2"}, False, "User not in 50% rollout"),
+]
+
+USER_CASES = [
+    ("in", ["user-1", "user-2"], {"userId": "user-1"}, True, "All rules passed"),
+    ("in", ["user-1", "user-2"], {"userId": "user-3"}, False, "User not in whitelist"),
+    ("in", ["user-1", "user-2"], {"userId": 5}, False, "User not in whitelist"),
+    ("in", ["user-1", "user-2"], {"userId": ""}, False, "No user ID provided"),
+    ("in", ["user-1", "user-2"], {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("in", [5, "5"], {"userId": "user-1"}, False, "User not in whitelist"),
+    ("in", [5, "5"], {"userId": "user-3"}, False, "User not in whitelist"),
+    ("in", [5, "5"], {"userId": 5}, True, "All rules passed"),
+    ("in", [5, "5"], {"userId": ""}, False, "No user ID provided"),
+    ("in", [5, "5"], {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("in", "user-1", {"userId": "user-1"}, False, "User not in whitelist"),
+    ("in", "user-1", {"userId": "user-3"}, False, "User not in whitelist"),
+    ("in", "user-1", {"userId": 5}, False, "User not in whitelist"),
+    ("in", "user-1", {"userId": ""}, False, "No user ID provided"),
+    ("in", "user-1", {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("not_in", ["user-1", "user-2"], {"userId": "user-1"}, False, "User in blacklist"),
+    ("not_in", ["user-1", "user-2"], {"userId": "user-3"}, True, "All rules passed"),
+    ("not_in", ["user-1", "user-2"], {"userId": 5}, True, "All rules passed"),
+    ("not_in", ["user-1", "user-2"], {"userId": ""}, False, "No user ID provided"),
+    ("not_in", ["user-1", "user-2"], {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("not_in", [5, "5"], {"userId": "user-1"}, True, "All rules passed"),
+    ("not_in", [5, "5"], {"userId": "user-3"}, True, "All rules passed"),
+    ("not_in", [5, "5"], {"userId": 5}, False, "User in blacklist"),
+    ("not_in", [5, "5"], {"userId": ""}, False, "No user ID provided"),
+    ("not_in", [5, "5"], {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("not_in", "user-1", {"userId": "user-1"}, False, "User in blacklist"),
+    ("not_in", "user-1", {"userId": "user-3"}, False, "User in blacklist"),
+    ("not_in", "user-1", {"userId": 5}, False, "User in blacklist"),
+    ("not_in", "user-1", {"userId": ""}, False, "No user ID provided"),
+    ("not_in", "user-1", {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("is", ["user-1", "user-2"], {"userId": "user-1"}, True, "All rules passed"),
+    ("is", ["user-1", "user-2"], {"userId": "user-3"}, True, "All rules passed"),
+    ("is", ["user-1", "user-2"], {"userId": 5}, True, "All rules passed"),
+    ("is", ["user-1", "user-2"], {"userId": ""}, False, "No user ID provided"),
+    ("is", ["user-1", "user-2"], {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("is", [5, "5"], {"userId": "user-1"}, True, "All rules passed"),
+    ("is", [5, "5"], {"userId": "user-3"}, True, "All rules passed"),
+    ("is", [5, "5"], {"userId": 5}, True, "All rules passed"),
+    ("is", [5, "5"], {"userId": ""}, False, "No user ID provided"),
+    ("is", [5, "5"], {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("is", "user-1", {"userId": "user-1"}, True, "All rules passed"),
+    ("is", "user-1", {"userId": "user-3"}, True, "All rules passed"),
+    ("is", "user-1", {"userId": 5}, True, "All rules passed"),
+    ("is", "user-1", {"userId": ""}, False, "No user ID provided"),
+    ("is", "user-1", {"sessionId": "user-1"}, False, "No user ID provided"),
+    ("in", None, {"userId": "user-1"}, False, "User not in whitelist"),
+    ("not_in", None, {"userId": "user-1"}, False, "User in blacklist"),
+    ("in", [5], {"userId": 5.0}, True, "All rules passed"),
+]
+
+SEGMENT_CASES = [
+    ("in", "beta", {"userId": "user-1"}, True, "All rules passed"),
+    ("in", "beta", {"userId": "user-3"}, False, "User not in segment"),
+    ("in", "beta", {}, False, "No user ID provided"),
+    ("in", ["staff", "beta"], {"userId": "user-1"}, True, "All rules passed"),
+    ("in", ["staff", "beta"], {"userId": "user-3"}, True, "All rules passed"),
+    ("in", ["staff", "beta"], {}, False, "No user ID provided"),
+    ("in", "missing", {"userId": "user-1"}, False, "User not in segment"),
+    ("in", "missing", {"userId": "user-3"}, False, "User not in segment"),
+    ("in", "missing", {}, False, "No user ID provided"),
+    ("not_in", "beta", {"userId": "user-1"}, False, "User in segment"),
+    ("not_in", "beta", {"userId": "user-3"}, True, "All rules passed"),
+    ("not_in", "beta", {}, False, "No user ID provided"),
+    ("not_in", ["staff", "beta"], {"userId": "user-1"}, False, "User in segment"),
+    ("not_in", ["staff", "beta"], {"userId": "user-3"}, False, "User in segment"),
+    ("not_in", ["staff", "beta"], {}, False, "No user ID provided"),
+    ("not_in", "missing", {"userId": "user-1"}, True, "All rules passed"),
+    ("not_in", "missing", {"userId": "user-3"}, True, "All rules passed"),
+    ("not_in", "missing", {}, False, "No user ID provided"),
+    ("is", "beta", {"userId": "user-1"}, True, "All rules passed"),
+    ("is", "beta", {"userId": "user-3"}, True, "All rules passed"),
+    ("is", "beta", {}, False, "No user ID provided"),
+    ("is", ["staff", "beta"], {"userId": "user-1"}, True, "All rules passed"),
+    ("is", ["staff", "beta"], {"userId": "user-3"}, True, "All rules passed"),
+    ("is", ["staff", "beta"], {}, False, "No user ID provided"),
+    ("is", "missing", {"userId": "user-1"}, True, "All rules passed"),
+    ("is", "missing", {"userId": "user-3"}, True, "All rules passed"),
+    ("is", "missing", {}, False, "No user ID provided"),
+    ("in", [], {"userId": "user-1"}, False, "User not in segment"),
+    ("not_in", None, {"userId": "user-1"}, True, "All rules passed"),
+]
+
+CUSTOM_CASES = [
+    ("equals", "pro", "pro", True, "All rules passed"),
+    ("equals", "pro", "Pro", False, "Values do not match"),
+    ("equals", "pro", None, False, "Values do not match"),
+    ("equals", "pro", ["pro"], False, "Values do not match"),
+    ("equals", "pro", MISSING, False, "Field plan not found in context"),
+    ("equals", 10, 10, True, "All rules passed"),
+    ("equals", 10, 10.0, True, "All rules passed"),
+    ("equals", 10, "10", False, "Values do not match"),
+    ("equals", 10, True, False, "Values do not match"),
+    ("equals", 10, MISSING, False, "Field plan not found in context"),
+    ("equals", None, None, True, "All rules passed"),
+    ("equals", None, 0, False, "Values do not match"),
+    ("equals", None, "", False, "Values do not match"),
+    ("equals", None, MISSING, False, "Field plan not found in context"),
+    ("equals", True, True, True, "All rules passed"),
+    ("equals", True, 1, False, "Values do not match"),
+    ("equals", True, "true", False, "Values do not match"),
+    ("equals", True, MISSING, False, "Field plan not found in context"),
+    ("not_equals", "pro", "pro", False, "Values are equal"),
+    ("not_equals", "pro", "basic", True, "All rules passed"),
+    ("not_equals", "pro", None, True, "All rules passed"),
+    ("not_equals", "pro", MISSING, False, "Field plan not found in context"),
+    ("not_equals", 10, 10, False, "Values are equal"),
+    ("not_equals", 10, "10", True, "All rules passed"),
+    ("not_equals", 10, MISSING, False, "Field plan not found in context"),
+    ("contains", "pro", "pro plan", True, "All rules passed"),
+    ("contains", "pro", "Pro", False, "Does not contain value"),
+    ("contains", "pro", None, False, "Does not contain value"),
+    ("contains", "pro", ["a", "pro"], True, "All rules passed"),
+    ("contains", "pro", {"a": "pro"}, False, "Does not contain value"),
+    ("contains", "pro", MISSING, False, "Field plan not found in context"),
+    ("contains", 10, "x10y", True, "All rules passed"),
+    ("contains", 10, 10, True, "All rules passed"),
+    ("contains", 10, 110.5, True, "All rules passed"),
+    ("contains", 10, [1, 0], False, "Does not contain value"),
+    ("contains", 10, MISSING, False, "Field plan not found in context"),
+    ("contains", None, None, True, "All rules passed"),
+    ("contains", None, "nullable", True, "All rules passed"),
+    ("contains", None, "none", False, "Does not contain value"),
+    ("contains", None, MISSING, False, "Field plan not found in context"),
+    ("contains", True, True, True, "All rules passed"),
+    ("contains", True, "untrue", True, "All rules passed"),
+    ("contains", True, 1, False, "Does not contain value"),
+    ("contains", True, MISSING, False, "Field plan not found in context"),
+    ("contains", "", "", True, "All rules passed"),
+    ("contains", "", None, True, "All rules passed"),
+    ("contains", "", MISSING, False, "Field plan not found in context"),
+    ("contains", "Object", {"a": 1}, True, "All rules passed"),
+    ("contains", "Object", MISSING, False, "Field plan not found in context"),
+    ("contains", "1,2", [1, 2], True, "All rules passed"),
+    ("contains", "1,2", [1, None, 2], False, "Does not contain value"),
+    ("contains", "1,2", MISSING, False, "Field plan not found in context"),
+    ("greater_than", 10, 11, True, "All rules passed"),
+    ("greater_than", 10, 10, False, "Not greater than"),
+    ("greater_than", 10, "11", True, "All rules passed"),
+    ("greater_than", 10, "9", False, "Not greater than"),
+    ("greater_than", 10, "abc", False, "Not greater than"),
+    ("greater_than", 10, True, False, "Not greater than"),
+    ("greater_than", 10, None, False, "Not greater than"),
+    ("greater_than", 10, [11], True, "All rules passed"),
+    ("greater_than", 10, [1, 2], False, "Not greater than"),
+    ("greater_than", 10, "", False, "Not greater than"),
+    ("greater_than", 10, 10.5, True, "All rules passed"),
+    ("greater_than", 10, "1e2", True, "All rules passed"),
+    ("greater_than", 10, MISSING, False, "Field plan not found in context"),
+    ("greater_than", "10", 9, False, "Not greater than"),
+    ("greater_than", "10", "9", True, "All rules passed"),
+    ("greater_than", "10", "100", True, "All rules passed"),
+    ("greater_than", "10", "abc", True, "All rules passed"),
+    ("greater_than", "10", None, False, "Not greater than"),
+    ("greater_than", "10", MISSING, False, "Field plan not found in context"),
+    ("greater_than", 0, None, False, "Not greater than"),
+    ("greater_than", 0, False, False, "Not greater than"),
+    ("greater_than", 0, True, True, "All rules passed"),
+    ("greater_than", 0, -1, False, "Not greater than"),
+    ("greater_than", 0, [], False, "Not greater than"),
+    ("greater_than", 0, {"a": 1}, False, "Not greater than"),
+    ("greater_than", 0, MISSING, False, "Field plan not found in context"),
+    ("greater_than", None, 1, True, "All rules passed"),
+    ("greater_than", None, -1, False, "Not greater than"),
+    ("greater_than", None, 0, False, "Not greater than"),
+    ("greater_than", None, MISSING, False, "Field plan not found in context"),
+    ("less_than", 10, 9, True, "All rules passed"),
+    ("less_than", 10, 10, False, "Not less than"),
+    ("less_than", 10, "9", True, "All rules passed"),
+    ("less_than", 10, "abc", False, "Not less than"),
+    ("less_than", 10, None, True, "All rules passed"),
+    ("less_than", 10, False, True, "All rules passed"),
+    ("less_than", 10, [9], True, "All rules passed"),
+    ("less_than", 10, "", True, "All rules passed"),
+    ("less_than", 10, MISSING, False, "Field plan not found in context"),
+    ("less_than", "b", "a", True, "All rules passed"),
+    ("less_than", "b", "c", False, "Not less than"),
+    ("less_than", "b", "B", True, "All rules passed"),
+    ("less_than", "b", 1, False, "Not less than"),
+    ("less_than", "b", MISSING, False, "Field plan not found in context"),
+    ("less_than", True, 0, True, "All rules passed"),
+    ("less_than", True, 1, False, "Not less than"),
+    ("less_than", True, False, True, "All rules passed"),
+    ("less_than", True, MISSING, False, "Field plan not found in context"),
+    ("regex", "pro", "pro", True, "All rules passed"),
+    ("regex", "pro", MISSING, False, "Field plan not found in context"),
+]
+
+# (rule, context, enabled, reason) for custom rules naming no field, or a non-string one
+CUSTOM_FIELD_CASES = [
+    ({"type": "custom", "operator": "equals", "value": 1}, {}, False, "Field undefined not found in context"),
+    ({"type": "custom", "operator": "equals", "value": 1}, {"undefined": 1}, True, "All rules passed"),
+    ({"type": "custom", "operator": "equals", "value": 1, "field": None}, {"null": 1}, True, "All rules passed"),
+    ({"type": "custom", "operator": "equals", "value": 1, "field": 5}, {"5": 1}, True, "All rules passed"),
+    ({"type": "custom", "operator": "equals", "value": 1, "field": ["a", "b"]}, {"a,b": 1}, True, "All rules passed"),
+]
+
+# (rules, context, enabled, reason) for whole plans
+PLAN_CASES = [
+    ([], {}, True, "No rules defined"),
+    (None, {}, True, "No rules defined"),
+    ([{"type": "time", "operator": "after", "value": 1}], {}, True, "All rules passed"),
+    ([{"operator": "in", "value": []}], {}, True, "All rules passed"),
+    (
+        [{"type": "geo", "operator": "in", "value": ["FR"]}, {"type": "user", "operator": "in", "value": ["x"]}],
+        {"userId": "y", "ip": "1.2.3.4"},
+        False,
+        "User not in whitelist",
+    ),
+    (
+        [
+            {"type": "device", "operator": "is", "value": "mobile"},
+            {"type": "percentage", "operator": "less_than", "value": 0},
+        ],
+        {"userId": "u", "userAgent": "chrome-ua"},
+        False,
+        "User not in 0% rollout",
+    ),
+    (
+        [{"type": "device", "operator": "is", "value": "mobile"}, {"type": "geo", "operator": "in", "value": ["FR"]}],
+        {"userAgent": "chrome-ua", "ip": "1.2.3.4"},
+        False,
+        "Country US not in allowed list",
+    ),
+    (
+        [
+            {"type": "percentage", "operator": "less_than", "value": 0},
+            {"type": "custom", "operator": "equals", "value": 1, "field": "a"},
+        ],
+        {"userId": "u", "a": 2},
+        False,
+        "Values do not match",
+    ),
+    (
+        [
+            {"type": "custom", "operator": "equals", "value": 1, "field": "a"},
+            {"type": "user", "operator": "in", "value": ["x"]},
+            {"type": "segment", "operator": "in", "value": "beta"},
+        ],
+        {"userId": "y", "a": 2},
+        False,
+        "Values do not match",
+    ),
+    (
+        [
+            {"type": "segment", "operator": "in", "value": "beta"},
+            {"type": "custom", "operator": "equals", "value": 1, "field": "a"},
+            {"type": "user", "operator": "in", "value": ["x"]},
+        ],
+        {"userId": "y", "a": 2},
+        False,
+        "User not in segment",
+    ),
+    (
+        [{"type": "time", "operator": "after", "value": 1}, {"type": "user", "operator": "in", "value": ["x"]}],
+        {"userId": "y"},
+        False,
+        "User not in whitelist",
+    ),
+    (
+        [
+            {"type": "device", "operator": "is", "value": "mobile"},
+            {"type": "geo", "operator": "in", "value": ["US"]},
+            {"type": "percentage", "operator": "less_than", "value": 100},
+            {"type": "user", "operator": "not_in", "value": []},
+        ],
+        {"userId": "u", "ip": "1.2.3.4", "userAgent": "iphone-ua"},
+        True,
+        "All rules passed",
+    ),
+]
+
+RESOLVED_CASES = [
+    ([{"type": "geo", "operator": "in", "value": ["DE"]}], {"resolved": {"country": "DE"}}, True, "All rules passed"),
+    (
+        [{"type": "geo", "operator": "in", "value": ["DE"]}],
+        {"ip": "1.2.3.4", "resolved": {"country": "DE"}},
+        True,
+        "All rules passed",
+    ),
+    (
+        [{"type": "geo", "operator": "in", "value": ["US"]}],
+        {"ip": "1.2.3.4", "resolved": {"country": None}},
+        True,
+        "All rules passed",
+    ),
+    (
+        [{"type": "geo", "operator": "in", "value": ["US"]}],
+        {"ip": "1.2.3.4", "resolved": "DE"},
+        True,
+        "All rules passed",
+    ),
+    ([{"type": "geo", "operator": "in", "value": ["US"]}], {"resolved": {}}, False, "No IP address provided"),
+    (
+        [{"type": "device", "operator": "is", "value": "desktop"}],
+        {"resolved": {"os": "Linux"}},
+        True,
+        "All rules passed",
+    ),
+    (
+        [{"type": "device", "operator": "is", "value": "Linux"}],
+        {"userAgent": "iphone-ua", "resolved": {"os": "Linux"}},
+        True,
+        "All rules passed",
+    ),
+    (
+        [{"type": "device", "operator": "is", "value": "iOS"}],
+        {"userAgent": "iphone-ua", "resolved": {"os": "Linux"}},
+        False,
+        "Device/OS/Browser does not match iOS",
+    ),
+    (
+        [{"type": "device", "operator": "is", "value": "iOS"}],
+        {"userAgent": "iphone-ua", "resolved": {"country": "US"}},
+        True,
+        "All rules passed",
+    ),
+    (
+        [{"type": "device", "operator": "is", "value": "mobile"}],
+        {"resolved": {"deviceType": "mobile"}},
+        True,
+        "All rules passed",
+    ),
+    (
+        [{"type": "device", "operator": "is", "value": "Chrome"}],
+        {"userAgent": "chrome-ua", "resolved": {"deviceType": "mobile", "browser": 3}},
+        False,
+        "Device/OS/Browser does not match Chrome",
+    ),
+    (
+        [
+            {"type": "device", "operator": "in", "value": ["desktop"]},
+            {"type": "geo", "operator": "not_in", "value": ["US"]},
+        ],
+        {"userId": "u", "resolved": {"country": "DE", "os": "Linux"}},
+        True,
+        "All rules passed",
+    ),
+]
+
+HASH_CASES = [
+    ("", 0, 1),
+    ("user-1", 836031825, 26),
+    ("user-42", 147182656, 57),
+    ("alice", 92903040, 41),
+    ("bob@example.com", 467379442, 43),
+    ("ü", 252, 53),
+    ("日本語", 25921943, 44),
+    ("😀", 1772899, 100),
+    ("a\x00", 3007, 8),
+    ("x" * 64, 922607616, 17),
+    ("0", 48, 49),
+    ("user-2147483648", 628627311, 12),
+]
+
+
+def _evaluate(rules, context):
+    engine = RuleEngine(
+        geo_lookup=GEO.get,
+        device_parser=lambda user_agent: AGENTS.get(user_agent, (None, None, None)),
+        segment_lookup=SEGMENTS.get,
+    )
+    return engine.evaluate({"enabled": True, "rules": rules}, context)
+
+
+@pytest.mark.parametrize(
+    "rule_type, operator, value, context, enabled, reason",
+    [("geo", *case) for case in GEO_CASES]
+    + [("device", *case) for case in DEVICE_CASES]
+    + [("percentage", *case) for case in PERCENTAGE_CASES]
+    + [("user", *case) for case in USER_CASES]
+    + [("segment", *case) for case in SEGMENT_CASES],
+)
+def test_rule_matches_backend(rule_type, operator, value, context, enabled, reason):
+    rule = {"type": rule_type, "operator": operator, "value": value}
+    assert _evaluate([rule], context) == {"enabled": enabled, "reason": reason}
+
+
+@pytest.mark.parametrize("operator, value, plan, enabled, reason", CUSTOM_CASES)
+def test_custom_rule_matches_backend(operator, value, plan, enabled, reason):
+    rule = {"type": "custom", "field": "plan", "operator": operator, "value": value}
+    context = {} if plan is MISSING else {"plan": plan}
+    assert _evaluate([rule], context) == {"enabled": enabled, "reason": reason}
+
+
+@pytest.mark.parametrize("rule, context, enabled, reason", CUSTOM_FIELD_CASES)
+def test_custom_rule_field_name_matches_backend(rule, context, enabled, reason):
+    assert _evaluate([rule], context) == {"enabled": enabled, "reason": reason}
+
+
+@pytest.mark.parametrize("rules, context, enabled, reason", PLAN_CASES)
+def test_plan_reports_first_failing_rule_in_cost_order(rules, context, enabled, reason):
+    assert _evaluate(rules, context) == {"enabled": enabled, "reason": reason}
+
+
+@pytest.mark.parametrize("rules, context, enabled, reason", RESOLVED_CASES)
+def test_resolved_context_matches_backend(rules, context, enabled, reason):
+    assert _evaluate(rules, context) == {"enabled": enabled, "reason": reason}
+
+
+@pytest.mark.parametrize("user_id, hash_value, bucket", HASH_CASES)
+def test_hash_bucket_matches_backend(user_id, hash_value, bucket):
+    assert simple_hash(user_id) == hash_value
+    assert percentage_bucket(user_id) == bucket
@@ -0,0 +1,66 @@
+"""Tests for the shared-memory flag store."""
+
+import multiprocessing
+
+import pytest
+
+from feature_flag_client import shared_store
+from feature_flag_client.shared_store import SharedFlagReader, SharedFlagWriter
+from feature_flag_client.snapshot import FlagSnapshot, encode_snapshot
+
+pytestmark = pytest.mark.skipif(shared_store.fcntl is None, reason="requires fcntl")
+
+CAPACITY = 64 * 1024
+
+
+def _flags(generation):
+    # Record sizes change with every generation, so a half-written slot's
+    # index no longer lines up with the records it held before.
+    return [
+        {"id": f"flag-{i}", "enabled": True, "rules": [], "description": str(generation) * (generation * 10)}
+        for i in range(50)
+    ]
+
+
+def _publish_and_start_next(path):
+    """Publish generation 2, then stop halfway through writing generation 3."""
+    writer = SharedFlagWriter(path, "test", CAPACITY)
+    writer.publish(_flags(2))
+    data = encode_snapshot(_flags(3), "test")
+    start = shared_store._HEADER_SIZE + 3 % 2 * CAPACITY
+    writer._mmap[start:start + len(data) // 2] = data[:len(data) // 2]
+    writer.close()
+
+
+def test_reader_retries_when_its_slot_is_being_overwritten(tmp_path, monkeypatch):
+    path = str(tmp_path / "flags")
+    writer = SharedFlagWriter(path, "test", CAPACITY)
+    writer.publish(_flags(1))
+    writer.close()
+
+    reader = SharedFlagReader(path)
+    assert reader.get_flag("flag-0")["description"] == "1" * 10
+
+    # Let another process publish and start overwriting the reader's slot
+    # between the reader opening generation 1 and parsing a record from it.
+    get = FlagSnapshot.get
+    interleaved = []
+
+    def get_after_writer(snapshot, flag_id):
+        if not interleaved:
+            interleaved.append(flag_id)
+            process = multiprocessing.get_context("spawn").Process(target=_publish_and_start_next, args=(path,))
+            process.start()
+            process.join(30)
+            assert process.exitcode == 0
+        return get(snapshot, flag_id)
+
+    monkeypatch.setattr(FlagSnapshot, "get", get_after_writer)
+    flag = reader.get_flag("flag-30")
+
+    assert interleaved == ["flag-30"]
+    assert reader.sequence() == 2
+    assert flag is not None
+    assert flag["id"] == "flag-30"
+    assert flag["description"] == "2" * 20
+    reader.close()
@@ -0,0 +1,83 @@
+"""Tests for on-disk flag snapshots."""
+
+import pytest
+
+from feature_flag_client.exceptions import SnapshotError
+from feature_flag_client.snapshot import FlagSnapshot, SnapshotWriter, encode_snapshot, write_snapshot
+
+FLAGS = [
+    {"id": f"flag-{i}", "enabled": i % 2 == 0, "rules": [{"type": "user", "operator": "in", "value": [f"u{i}"]}]}
+    for i in range(20)
+] + [{"id": "ünïcode", "enabled": True, "rules": []}]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "flags.snap")
+    write_snapshot(path, FLAGS, "production")
+
+    with FlagSnapshot.open(path) as snapshot:
+        assert snapshot.environment == "production"
+        assert len(snapshot) == len(FLAGS)
+        assert snapshot.get("flag-7") == FLAGS[7]
+        assert snapshot.get("ünïcode") == FLAGS[-1]
+        assert snapshot.get("missing") is None
+        assert sorted(flag["id"] for flag in snapshot.flags()) == sorted(flag["id"] for flag in FLAGS)
+
+
+def test_empty_snapshot():
+    snapshot = FlagSnapshot(encode_snapshot([], "development"))
+    assert len(snapshot) == 0
+    assert snapshot.get("anything") is None
+
+
+@pytest.mark.parametrize(
+    "corrupt, message",
+    [
+        (lambda data: data[:10], "truncated"),
+        (lambda data: data[:-1], "truncated"),
+        (lambda data: b"NOTSNAP!" + data[8:], "Not a flag snapshot"),
+        (lambda data: data[:8] + b"\x02\x00" + data[10:], "Unsupported snapshot version"),
+        (lambda data: data[:-1] + bytes([data[-1] ^ 1]), "checksum"),
+    ],
+)
+def test_invalid_data_is_rejected(corrupt, message):
+    with pytest.raises(SnapshotError, match=message):
+        FlagSnapshot(corrupt(encode_snapshot(FLAGS, "production")))
+
+
+def test_missing_file_is_rejected(tmp_path):
+    with pytest.raises(SnapshotError):
+        FlagSnapshot.open(str(tmp_path / "missing.snap"))
+
+
+def test_writer_coalesces_submissions_and_skips_unchanged_flags(tmp_path):
+    path = str(tmp_path / "flags.snap")
+    writes = []
+    writer = SnapshotWriter(path, delay=60, on_write=lambda: writes.append(1))
+
+    writer.submit(FLAGS[:1], "production")
+    writer.submit(FLAGS[:2], "production")
+    writer.flush()
+    writer.submit(lambda: FLAGS[:2], "production")
+    writer.close()
+
+    assert writes == [1]
+    with FlagSnapshot.open(path) as snapshot:
+        assert len(snapshot) == 2
+        assert snapshot.get("flag-1") == FLAGS[1]
+
+
+def test_writer_skips_flags_marked_as_written(tmp_path):
+    path = str(tmp_path / "flags.snap")
+    writes = []
+    writer = SnapshotWriter(path, delay=60, on_write=lambda: writes.append(1))
+    writer.mark_written(FLAGS, "production")
+
+    writer.submit(list(reversed(FLAGS)), "production")
+    writer.close()
+    writer.submit(FLAGS, "staging")
+    writer.close()
+
+    assert writes == [1]
+    with FlagSnapshot.open(path) as snapshot:
+        assert snapshot.environment == "staging"
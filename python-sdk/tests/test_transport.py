@@ -0,0 +1,184 @@
+"""Tests for the HTTP transport and circuit breaker."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from feature_flag_client import transport
+from feature_flag_client.client import FeatureFlagClient
+from feature_flag_client.transport import (
+    EVALUATION_PATHS,
+    CircuitBreaker,
+    CircuitOpenError,
+    create_session,
+    guarded_path,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(transport.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def unavailable_api():
+    """An API answering every request with a 503, counting requests per path."""
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            path = self.path.split("?")[0]
+            hits[path] = hits.get(path, 0) + 1
+            body = json.dumps({"error": "unavailable"}).encode()
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/api", hits
+    server.shutdown()
+    server.server_close()
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_breaker_lets_one_trial_through_after_the_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize(
+    "path, guarded",
+    [
+        ("/api/evaluate", True),
+        ("/api/evaluate/", True),
+        ("/api/evaluate/bulk", True),
+        ("/api/evaluate/all", True),
+        ("/api/evaluate/events", False),
+        ("/api/flags", False),
+        ("/api/flags/abc", False),
+    ],
+)
+def test_guarded_path(path, guarded):
+    assert guarded_path(path, EVALUATION_PATHS) is guarded
+
+
+def test_session_breaker_only_counts_guarded_paths(unavailable_api):
+    base_url, hits = unavailable_api
+    breaker = CircuitBreaker(failure_threshold=2)
+    session = create_session(max_retries=0, circuit_breaker=breaker, circuit_breaker_paths=EVALUATION_PATHS)
+
+    for _ in range(3):
+        assert session.get(f"{base_url}/flags").status_code == 503
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    for _ in range(2):
+        assert session.post(f"{base_url}/evaluate", json={}).status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        session.post(f"{base_url}/evaluate", json={})
+    assert session.get(f"{base_url}/flags").status_code == 503
+    assert hits == {"/api/flags": 4, "/api/evaluate": 2}
+
+
+def test_client_falls_back_to_defaults_while_unavailable(unavailable_api):
+    base_url, hits = unavailable_api
+    client = FeatureFlagClient(
+        base_url,
+        max_retries=0,
+        circuit_breaker=CircuitBreaker(failure_threshold=1),
+        default_values={"checkout": True},
+    )
+
+    for _ in range(2):
+        result = client.evaluate_flag("checkout", "user-1")
+        assert result == {"enabled": True, "reason": "Default value (API unavailable)"}
+    assert client.evaluate_flag("other", "user-1", default=False)["enabled"] is False
+    assert hits == {"/api/evaluate": 1}
+    client.close()
+
+
+def test_breaker_can_be_disabled():
+    client = FeatureFlagClient("http://127.0.0.1:9/api", circuit_breaker=False)
+    assert client.circuit_breaker is None
+    client.close()
+
+
+def test_async_client_falls_back_to_defaults_while_unavailable(unavailable_api):
+    aiohttp = pytest.importorskip("aiohttp")
+    from feature_flag_client.async_client import AsyncFeatureFlagClient
+    from feature_flag_client.exceptions import EvaluationError
+
+    base_url, hits = unavailable_api
+
+    async def evaluate():
+        client = AsyncFeatureFlagClient(
+            base_url, circuit_breaker=CircuitBreaker(failure_threshold=1), default_values={"checkout": True}
+        )
+        try:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client._request("GET", "/flags")
+            assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+            results = [await client.evaluate_flag("checkout", "user-1") for _ in range(2)]
+            with pytest.raises(EvaluationError):
+                await client.evaluate_flag("other", "user-1")
+            return results
+        finally:
+            await client.close()
+
+    results = asyncio.run(evaluate())
+    assert results == [{"enabled": True, "reason": "Default value (API unavailable)"}] * 2
+    assert hits == {"/api/flags": 1, "/api/evaluate": 1}
+
+
+def test_circuit_open_error_is_a_connection_error():
+    assert issubclass(CircuitOpenError, requests.ConnectionError)
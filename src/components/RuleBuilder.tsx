@@ -22,6 +22,7 @@ const RuleBuilder: React.FC<RuleBuilderProps> = ({ rules, onSave, editing }) =>
     { value: 'device', label: 'Device Type' },
     { value: 'percentage', label: 'Percentage Rollout' },
     { value: 'user', label: 'User ID' },
+    { value: 'segment', label: 'Segment' },
     { value: 'custom', label: 'Custom Field' }
   ];
 
@@ -43,6 +44,10 @@ const RuleBuilder: React.FC<RuleBuilderProps> = ({ rules, onSave, editing }) =>
       { value: 'in', label: 'In List' },
       { value: 'not_in', label: 'Not In List' }
     ],
+    segment: [
+      { value: 'in', label: 'In Segment' },
+      { value: 'not_in', label: 'Not In Segment' }
+    ],
     custom: [
       { value: 'equals', label: 'Equals' },
       { value: 'not_equals', label: 'Not Equals' },